@@ -0,0 +1,372 @@
+"""
+Archive locale pour le Clonage de Chaînes Telegram
+Format d'archive sur disque : segments de messages compressés, index binaire
+ID → position (mmap-able) et médias stockés par contenu.
+
+Structure d'un dossier d'archive :
+
+    manifest.json           métadonnées (format, source, dernier ID, compteurs)
+    index.bin               entrées fixes de 24 octets, triées par ID croissant :
+                            struct '<qIQI' = (message_id, segment, offset, longueur)
+    segments/seg-000000.dat trames successives : longueur (uint32 LE) + JSON compressé zlib
+    media/ab/abcdef....ext  fichiers médias nommés par leur SHA-256
+    media/ids/<identité>    correspondance identité Telegram → SHA-256 (évite les re-téléchargements)
+
+Chaque enregistrement JSON contient : id, date (ISO 8601), text, entities
+(liste de dictionnaires Telethon ``to_dict()``), grouped_id, type, size et
+media (sha256, path relatif, size, mime_type, file_name) ou null.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import zlib
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from records import MessageRecord
+from utils import save_json, load_json
+
+
+ARCHIVE_FORMAT = 1
+INDEX_ENTRY = struct.Struct('<qIQI')
+FRAME_HEADER = struct.Struct('<I')
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def serialize_entities(entities) -> Optional[List[Dict[str, Any]]]:
+    """Convertit les entités de mise en forme Telethon en dictionnaires JSON."""
+    if not entities:
+        return None
+    return [entity.to_dict() for entity in entities]
+
+
+def deserialize_entities(data: Optional[List[Dict[str, Any]]]) -> Optional[list]:
+    """Reconstruit les entités de mise en forme Telethon depuis l'archive."""
+    if not data:
+        return None
+
+    from telethon.tl import types
+
+    entities = []
+    for item in data:
+        fields = dict(item)
+        cls = getattr(types, fields.pop('_', ''), None)
+        if cls is None:
+            continue
+        try:
+            entities.append(cls(**fields))
+        except TypeError:
+            continue
+    return entities or None
+
+
+def hash_file(filepath: str) -> str:
+    """Calcule le SHA-256 d'un fichier par blocs."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArchiveWriter:
+    """Écriture en flux d'une archive, avec reprise après interruption."""
+
+    def __init__(self, path: str, source: str = "", segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES):
+        """
+        Initialize the archive writer.
+
+        Args:
+            path: Archive directory
+            source: Source channel identifier (informational)
+            segment_max_bytes: Size after which a new segment is started
+        """
+        self.path = path
+        self.source = source
+        self.segment_max_bytes = segment_max_bytes
+        self.manifest: Dict[str, Any] = {}
+        self.last_message_id = 0
+        self.message_count = 0
+        self.media_stored = 0
+        self.media_deduplicated = 0
+        self._segment = 0
+        self._segment_file = None
+        self._index_file = None
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, 'index.bin')
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, 'manifest.json')
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, 'segments', f"seg-{segment:06d}.dat")
+
+    def open(self):
+        """Ouvre l'archive et tronque toute écriture partielle laissée par une interruption."""
+        os.makedirs(os.path.join(self.path, 'segments'), exist_ok=True)
+        os.makedirs(os.path.join(self.path, 'media', 'ids'), exist_ok=True)
+        os.makedirs(os.path.join(self.path, 'tmp'), exist_ok=True)
+
+        self.manifest = load_json(self.manifest_path) or {
+            'format': ARCHIVE_FORMAT,
+            'source': self.source,
+            'codec': 'zlib-json',
+            'created': datetime.now().isoformat()
+        }
+        if self.manifest.get('format') != ARCHIVE_FORMAT:
+            raise ValueError(f"Format d'archive non supporté: {self.manifest.get('format')}")
+
+        # L'index fait foi : seule une entrée complète valide un enregistrement
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        index_size -= index_size % INDEX_ENTRY.size
+        self._index_file = open(self.index_path, 'a+b')
+        self._index_file.truncate(index_size)
+        self.message_count = index_size // INDEX_ENTRY.size
+
+        segment_end = 0
+        if self.message_count:
+            self._index_file.seek(index_size - INDEX_ENTRY.size)
+            message_id, segment, offset, length = INDEX_ENTRY.unpack(self._index_file.read(INDEX_ENTRY.size))
+            self.last_message_id = message_id
+            self._segment = segment
+            segment_end = offset + length
+
+        self._segment_file = open(self.segment_path(self._segment), 'a+b')
+        self._segment_file.truncate(segment_end)
+
+    def close(self):
+        """Ferme l'archive et met à jour le manifeste."""
+        if self._segment_file:
+            self._segment_file.close()
+            self._segment_file = None
+        if self._index_file:
+            self._index_file.close()
+            self._index_file = None
+        self.manifest.update({
+            'last_message_id': self.last_message_id,
+            'message_count': self.message_count,
+            'updated': datetime.now().isoformat()
+        })
+        save_json(self.manifest, self.manifest_path)
+        shutil.rmtree(os.path.join(self.path, 'tmp'), ignore_errors=True)
+
+    @property
+    def temp_dir(self) -> str:
+        """Dossier des téléchargements en cours."""
+        return os.path.join(self.path, 'tmp')
+
+    def _identity_marker(self, identity: str) -> str:
+        safe = identity.replace(':', '_').replace('/', '_')
+        return os.path.join(self.path, 'media', 'ids', safe)
+
+    def lookup_media(self, identity: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Retourne le média déjà archivé pour une identité Telegram, s'il existe."""
+        if not identity:
+            return None
+        marker = self._identity_marker(identity)
+        if not os.path.exists(marker):
+            return None
+        info = load_json(marker)
+        if info and os.path.exists(os.path.join(self.path, info['path'])):
+            self.media_deduplicated += 1
+            return info
+        return None
+
+    def store_media(self, temp_path: str, identity: Optional[str] = "", mime_type: str = "") -> Dict[str, Any]:
+        """
+        Range un fichier téléchargé dans le stockage adressé par contenu.
+
+        Args:
+            temp_path: Downloaded file (moved or removed)
+            identity: Telegram media identity, remembered to skip future downloads (None: never reused)
+            mime_type: MIME type of the media
+
+        Returns:
+            Media descriptor stored in message records
+        """
+        sha256 = hash_file(temp_path)
+        ext = os.path.splitext(temp_path)[1]
+        relative = os.path.join('media', sha256[:2], f"{sha256}{ext}")
+        destination = os.path.join(self.path, relative)
+
+        if os.path.exists(destination):
+            os.remove(temp_path)
+            self.media_deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(temp_path, destination)
+            self.media_stored += 1
+
+        info = {
+            'sha256': sha256,
+            'path': relative,
+            'size': os.path.getsize(destination),
+            'mime_type': mime_type or None,
+            'file_name': os.path.basename(temp_path)
+        }
+        if identity:
+            save_json(info, self._identity_marker(identity))
+        return info
+
+    def append(self, record: Dict[str, Any]):
+        """Ajoute un enregistrement (les IDs doivent être croissants)."""
+        if record['id'] <= self.last_message_id:
+            return
+
+        payload = zlib.compress(json.dumps(record, ensure_ascii=False, default=str).encode('utf-8'))
+        frame = FRAME_HEADER.pack(len(payload)) + payload
+
+        self._segment_file.seek(0, os.SEEK_END)
+        offset = self._segment_file.tell()
+        if offset and offset + len(frame) > self.segment_max_bytes:
+            self._segment_file.close()
+            self._segment += 1
+            # Un segment suivant peut exister, orphelin d'une interruption avant l'écriture de l'index
+            self._segment_file = open(self.segment_path(self._segment), 'w+b')
+            offset = 0
+
+        self._segment_file.write(frame)
+        self._segment_file.flush()
+        self._index_file.write(INDEX_ENTRY.pack(record['id'], self._segment, offset, len(frame)))
+        self._index_file.flush()
+
+        self.last_message_id = record['id']
+        self.message_count += 1
+
+
+class ArchivedMessage(MessageRecord):
+    """Message relu depuis une archive, compatible avec le chemin d'envoi."""
+
+    __slots__ = ()
+
+    def __init__(self, record: Dict[str, Any], archive_path: str):
+        """
+        Build a message from an archive record.
+
+        Args:
+            record: Decoded archive record
+            archive_path: Archive directory (media paths are relative to it)
+        """
+        media = record.get('media')
+        super().__init__(
+            record['id'],
+            datetime.fromisoformat(record['date']) if record.get('date') else None,
+            record.get('text') or "",
+            deserialize_entities(record.get('entities')),
+            # Le média est un chemin local : send_file l'envoie directement depuis le disque
+            os.path.join(archive_path, media['path']) if media else None,
+            record.get('grouped_id'),
+            record.get('type') or 'empty',
+            record.get('size') or 0
+        )
+
+
+class ArchiveReader:
+    """Lecture séquentielle d'une archive via mmap, sans accès à la source."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the archive reader.
+
+        Args:
+            path: Archive directory
+        """
+        self.path = path
+        self.manifest: Dict[str, Any] = {}
+        self._index = None
+        self._index_file = None
+        self._count = 0
+
+    def open(self):
+        """Ouvre l'archive et projette l'index en mémoire."""
+        manifest = load_json(os.path.join(self.path, 'manifest.json'))
+        if manifest is None:
+            raise ValueError(f"Archive introuvable ou manifeste illisible: {self.path}")
+        if manifest.get('format') != ARCHIVE_FORMAT:
+            raise ValueError(f"Format d'archive non supporté: {manifest.get('format')}")
+        self.manifest = manifest
+
+        index_path = os.path.join(self.path, 'index.bin')
+        size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        self._count = size // INDEX_ENTRY.size
+        if self._count:
+            self._index_file = open(index_path, 'rb')
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Libère les projections mémoire."""
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, position: int):
+        return INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)
+
+    def _first_position_after(self, min_id: int) -> int:
+        """Recherche dichotomique de la première entrée d'ID strictement supérieur."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] <= min_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def iter_records(self, min_id: int = 0, limit: Optional[int] = None):
+        """
+        Parcourt les enregistrements dans l'ordre des IDs.
+
+        Args:
+            min_id: Only yield records with a greater ID
+            limit: Maximum number of records
+
+        Yields:
+            Decoded record dictionaries
+        """
+        segment = None
+        segment_file = None
+        segment_map = None
+        yielded = 0
+        try:
+            for position in range(self._first_position_after(min_id), self._count):
+                if limit is not None and yielded >= limit:
+                    break
+                _, entry_segment, offset, length = self._entry(position)
+                if entry_segment != segment:
+                    if segment_map is not None:
+                        segment_map.close()
+                        segment_file.close()
+                    segment = entry_segment
+                    segment_file = open(
+                        os.path.join(self.path, 'segments', f"seg-{segment:06d}.dat"), 'rb'
+                    )
+                    segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+                (payload_length,) = FRAME_HEADER.unpack_from(segment_map, offset)
+                start = offset + FRAME_HEADER.size
+                payload = segment_map[start:start + payload_length]
+                yield json.loads(zlib.decompress(payload))
+                yielded += 1
+        finally:
+            if segment_map is not None:
+                segment_map.close()
+                segment_file.close()
+
+    def iter_messages(self, min_id: int = 0, limit: Optional[int] = None):
+        """Parcourt l'archive sous forme de messages prêts à être envoyés."""
+        for record in self.iter_records(min_id, limit):
+            yield ArchivedMessage(record, self.path)
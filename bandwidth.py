@@ -0,0 +1,173 @@
+"""
+Limitation de bande passante pour le Clonage de Chaînes Telegram
+Seaux à jetons en octets/s appliqués aux transferts de médias via les
+callbacks de progression de Telethon.
+
+Seuls les octets réellement transférés sont limités : les envois depuis un
+fichier local (médias téléchargés, transformés ou archivés). Un média renvoyé
+par référence (send_file(message.media)) ne transite pas par le client et
+n'est donc pas concerné.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from utils import format_file_size
+
+
+class ByteRateLimiter:
+    """Seau à jetons en octets par seconde, ajustable à chaud."""
+
+    def __init__(
+        self,
+        rate: float = 0,
+        burst_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        """
+        Initialize the byte rate limiter.
+
+        Args:
+            rate: Allowed throughput in bytes/s (0 for unlimited)
+            burst_seconds: Bucket capacity expressed in seconds of traffic
+            clock: Monotonic clock in seconds
+            sleep: Coroutine waiting the given number of seconds
+        """
+        self.rate = float(rate)
+        self.burst_seconds = burst_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last_refill = clock()
+        self._lock = asyncio.Lock()
+        self.bytes_total = 0
+        self._first_transfer: Optional[float] = None
+        self._last_transfer: Optional[float] = None
+
+    @property
+    def capacity(self) -> float:
+        return self.rate * self.burst_seconds
+
+    def set_rate(self, rate: float):
+        """Change le débit autorisé sans interrompre les transferts en cours."""
+        self._refill()
+        self.rate = float(rate)
+        self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self):
+        now = self._clock()
+        if self.rate > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def consume(self, nbytes: int):
+        """Consomme des octets et attend si le débit autorisé est dépassé."""
+        if nbytes <= 0:
+            return
+
+        now = self._clock()
+        if self._first_transfer is None:
+            self._first_transfer = now
+        self.bytes_total += nbytes
+
+        if self.rate > 0:
+            async with self._lock:
+                self._refill()
+                # Le seau peut passer en négatif : un bloc plus gros que la capacité
+                # est autorisé, puis remboursé par l'attente
+                self._tokens -= nbytes
+                if self._tokens < 0:
+                    await self._sleep(-self._tokens / self.rate)
+
+        self._last_transfer = self._clock()
+
+    @property
+    def achieved_rate(self) -> float:
+        """Débit moyen constaté depuis le premier transfert, en octets/s."""
+        if self._first_transfer is None or self._last_transfer is None:
+            return 0.0
+        elapsed = self._last_transfer - self._first_transfer
+        return self.bytes_total / elapsed if elapsed > 0 else 0.0
+
+
+class BandwidthShaper:
+    """Limites globales et par client pour les envois et téléchargements de médias."""
+
+    def __init__(self, upload_rate: float = 0, client_upload_rate: float = 0, download_rate: float = 0):
+        """
+        Initialize the shaper.
+
+        Args:
+            upload_rate: Global upload cap in bytes/s (0 for unlimited)
+            client_upload_rate: Per-client upload cap in bytes/s (0 for unlimited)
+            download_rate: Global download cap in bytes/s (0 for unlimited)
+        """
+        self.upload = ByteRateLimiter(upload_rate)
+        self.download = ByteRateLimiter(download_rate)
+        self.client_upload_rate = client_upload_rate
+        self.clients: Dict[str, ByteRateLimiter] = {}
+
+    def _client_limiter(self, client_name: str) -> ByteRateLimiter:
+        if client_name not in self.clients:
+            self.clients[client_name] = ByteRateLimiter(self.client_upload_rate)
+        return self.clients[client_name]
+
+    def set_upload_rate(self, rate: float):
+        """Ajuste la limite globale d'envoi."""
+        self.upload.set_rate(rate)
+
+    def set_client_upload_rate(self, rate: float):
+        """Ajuste la limite d'envoi de chaque client."""
+        self.client_upload_rate = rate
+        for limiter in self.clients.values():
+            limiter.set_rate(rate)
+
+    def set_download_rate(self, rate: float):
+        """Ajuste la limite globale de téléchargement."""
+        self.download.set_rate(rate)
+
+    def upload_callback(self, client_name: str):
+        """
+        Crée un callback de progression pour un envoi.
+
+        Telethon l'attend après chaque bloc transféré, ce qui ralentit l'envoi
+        au débit autorisé sans modifier la taille des blocs.
+        """
+        client_limiter = self._client_limiter(client_name)
+        sent = 0
+
+        async def callback(current: int, total: int):
+            nonlocal sent
+            delta = current - sent
+            sent = current
+            await client_limiter.consume(delta)
+            await self.upload.consume(delta)
+
+        return callback
+
+    def download_callback(self):
+        """Crée un callback de progression pour un téléchargement."""
+        received = 0
+
+        async def callback(current: int, total: int):
+            nonlocal received
+            delta = current - received
+            received = current
+            await self.download.consume(delta)
+
+        return callback
+
+    def log_stats(self, logger):
+        """Journalise le débit constaté face au débit configuré."""
+        limiters = [('Upload (global)', self.upload), ('Download (global)', self.download)]
+        limiters += [(f"Upload ({name})", limiter) for name, limiter in self.clients.items()]
+        for label, limiter in limiters:
+            if not limiter.bytes_total:
+                continue
+            configured = f"{format_file_size(int(limiter.rate))}/s" if limiter.rate > 0 else "unlimited"
+            logger.info(
+                f"{label}: {format_file_size(limiter.bytes_total)} transferred, "
+                f"achieved {format_file_size(int(limiter.achieved_rate))}/s, configured {configured}"
+            )
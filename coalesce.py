@@ -0,0 +1,125 @@
+"""
+Regroupement des rafales de messages texte pour le Clonage de Chaînes Telegram
+Fusionne les messages texte courts et consécutifs d'une même fenêtre de temps
+en un seul envoi, pour économiser le budget anti-flood.
+"""
+
+import copy
+from typing import Any, List, Optional
+
+from records import MessageRecord
+
+
+# Limite de Telegram pour un message texte, en unités UTF-16
+MAX_MESSAGE_LENGTH = 4096
+
+
+def utf16_length(text: str) -> int:
+    """Longueur d'un texte telle que comptée par Telegram (unités UTF-16)."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+class CoalescedMessage(MessageRecord):
+    """Message texte issu de la fusion de plusieurs messages source consécutifs."""
+
+    __slots__ = ('source_ids',)
+
+    def __init__(self, messages: List[Any], separator: str):
+        """
+        Merge consecutive text messages.
+
+        Args:
+            messages: Source messages, oldest first
+            separator: Text inserted between two merged messages
+        """
+        # L'ID du dernier message sert de point de reprise : le groupe est envoyé d'un bloc
+        self.id: int = messages[-1].id
+        self.date = messages[-1].date
+        self.media = None
+        self.grouped_id = None
+        self.type = 'text'
+        self.size = 0
+        self.source_ids: List[int] = [message.id for message in messages]
+
+        parts = []
+        entities = []
+        offset = 0
+        separator_length = utf16_length(separator)
+        for index, message in enumerate(messages):
+            if index:
+                parts.append(separator)
+                offset += separator_length
+            text = message.message
+            for entity in getattr(message, 'entities', None) or []:
+                shifted = copy.copy(entity)
+                shifted.offset += offset
+                entities.append(shifted)
+            parts.append(text)
+            offset += utf16_length(text)
+
+        self.message: str = "".join(parts)
+        self.entities = entities or None
+
+
+def _is_coalescable(message) -> bool:
+    return (
+        not getattr(message, 'media', None)
+        and bool(getattr(message, 'message', None))
+        and getattr(message, 'date', None) is not None
+        and not getattr(message, 'grouped_id', None)
+    )
+
+
+def coalesce_messages(
+    messages: List[Any],
+    max_gap: float = 60.0,
+    max_length: int = MAX_MESSAGE_LENGTH,
+    separator: str = "\n"
+) -> List[Any]:
+    """
+    Fusionne les rafales de messages texte consécutifs.
+
+    Args:
+        messages: Messages to send, oldest first
+        max_gap: Maximum delay in seconds between two merged messages
+        max_length: Maximum length of a merged message (UTF-16 units)
+        separator: Text inserted between two merged messages
+
+    Returns:
+        Messages to send: originals left untouched and CoalescedMessage groups
+    """
+    max_length = min(max_length, MAX_MESSAGE_LENGTH)
+    separator_length = utf16_length(separator)
+    result: List[Any] = []
+    run: List[Any] = []
+    run_length = 0
+
+    def flush():
+        if len(run) > 1:
+            result.append(CoalescedMessage(run, separator))
+        else:
+            result.extend(run)
+
+    for message in messages:
+        if not _is_coalescable(message):
+            flush()
+            run, run_length = [], 0
+            result.append(message)
+            continue
+
+        length = utf16_length(message.message)
+        if run:
+            gap = (message.date - run[-1].date).total_seconds()
+            if gap > max_gap or run_length + separator_length + length > max_length:
+                flush()
+                run, run_length = [], 0
+            else:
+                run.append(message)
+                run_length += separator_length + length
+                continue
+
+        run, run_length = [message], length
+
+    flush()
+    return result
+
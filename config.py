@@ -4,8 +4,10 @@ Gère les variables d'environnement et les paramètres de l'application.
 """
 
 import os
-from typing import Optional
-from dotenv import load_dotenv
+import socket
+from typing import List, Optional
+
+from selection import SELECTABLE_TYPES, parse_date, parse_types
 
 
 class Config:
@@ -19,7 +21,9 @@ class Config:
             env_file: Path to the environment file
         """
         # Load environment variables from .env file
+        self.env_file: str = env_file
         if os.path.exists(env_file):
+            from dotenv import load_dotenv
             load_dotenv(env_file)
         
         # Telegram API Configuration
@@ -36,6 +40,8 @@ class Config:
         self.batch_size: int = self._get_int_env('BATCH_SIZE', 10) or 10
         self.max_retries: int = self._get_int_env('MAX_RETRIES', 3) or 3
         self.retry_delay: float = self._get_float_env('RETRY_DELAY', 5.0)
+        self.retry_max_delay: float = self._get_float_env('RETRY_MAX_DELAY', 300.0)
+        self.retry_jitter: float = self._get_float_env('RETRY_JITTER', 0.5)
         
         # Logging Configuration
         self.log_file: str = os.getenv('LOG_FILE', 'telegram_cloner.log')
@@ -44,11 +50,89 @@ class Config:
         # Progress Tracking Configuration
         self.progress_file: str = os.getenv('PROGRESS_FILE', 'clone_progress.json')
         self.save_progress_interval: int = self._get_int_env('SAVE_PROGRESS_INTERVAL', 50) or 50
+        self.progress_log_interval: float = self._get_float_env('PROGRESS_LOG_INTERVAL', 10.0)
+        self.progress_half_life: float = self._get_float_env('PROGRESS_HALF_LIFE', 30.0)
+        self.shutdown_timeout: float = self._get_float_env('SHUTDOWN_TIMEOUT', 30.0)
+        self.dead_letter_file: str = os.getenv('DEAD_LETTER_FILE', 'messages_echoues.jsonl')
         
         # Media Configuration
         self.download_media: bool = self._get_bool_env('DOWNLOAD_MEDIA', True)
         self.media_timeout: int = self._get_int_env('MEDIA_TIMEOUT', 300) or 300
         
+        # Media Transform Configuration (strip_exif, watermark, downscale)
+        self.media_transforms: List[str] = [
+            name.strip() for name in os.getenv('MEDIA_TRANSFORMS', '').split(',') if name.strip()
+        ]
+        self.media_watermark_text: str = os.getenv('MEDIA_WATERMARK_TEXT', '')
+        self.media_max_dimension: int = self._get_int_env('MEDIA_MAX_DIMENSION', 1280) or 1280
+        self.media_transform_workers: int = self._get_int_env('MEDIA_TRANSFORM_WORKERS', 0) or 0
+        self.media_transform_queue: int = self._get_int_env('MEDIA_TRANSFORM_QUEUE', 4) or 4
+        
+        # Bandwidth Configuration (bytes/s, 0 = unlimited)
+        self.upload_rate_limit: float = self._get_float_env('UPLOAD_RATE_LIMIT', 0.0)
+        self.client_upload_rate_limit: float = self._get_float_env('CLIENT_UPLOAD_RATE_LIMIT', 0.0)
+        self.download_rate_limit: float = self._get_float_env('DOWNLOAD_RATE_LIMIT', 0.0)
+        
+        # Deduplication Configuration
+        self.dedup_enabled: bool = self._get_bool_env('DEDUP_ENABLED', False)
+        self.dedup_file: str = os.getenv('DEDUP_FILE', 'dedup_filtre.bin')
+        self.dedup_capacity: int = self._get_int_env('DEDUP_CAPACITY', 10_000_000) or 10_000_000
+        self.dedup_fp_rate: float = self._get_float_env('DEDUP_FP_RATE', 0.001)
+        
+        # Runtime Control Configuration
+        self.control_socket: Optional[str] = os.getenv('CONTROL_SOCKET') or None
+        
+        # Priority Lanes Configuration
+        self.scheduler_mode: str = os.getenv('SCHEDULER_MODE', 'off').lower()
+        self.reorder_window: int = self._get_int_env('REORDER_WINDOW', 50) or 50
+        self.small_lane_concurrency: int = self._get_int_env('SMALL_LANE_CONCURRENCY', 4) or 4
+        self.large_lane_concurrency: int = self._get_int_env('LARGE_LANE_CONCURRENCY', 1) or 1
+        self.large_media_threshold: int = self._get_int_env('LARGE_MEDIA_THRESHOLD', 20 * 1024 * 1024) or 20 * 1024 * 1024
+        
+        # Text Coalescing Configuration
+        self.coalesce_enabled: bool = self._get_bool_env('COALESCE_ENABLED', False)
+        self.coalesce_max_gap: float = self._get_float_env('COALESCE_MAX_GAP', 60.0)
+        self.coalesce_max_length: int = self._get_int_env('COALESCE_MAX_LENGTH', 4096) or 4096
+        self.coalesce_separator: str = os.getenv('COALESCE_SEPARATOR', '\n')
+        
+        # Memory Budget Configuration
+        self.memory_budget: int = (self._get_int_env('MEMORY_BUDGET_MB', 0) or 0) * 1024 * 1024
+        self.memory_chunk_size: int = self._get_int_env('MEMORY_CHUNK_SIZE', 5000) or 5000
+        self.memory_trace_interval: float = self._get_float_env('MEMORY_TRACE_INTERVAL', 0.0)
+        self.memory_trace_top: int = self._get_int_env('MEMORY_TRACE_TOP', 10) or 10
+        
+        # Multi-Node Coordination Configuration (shared SQLite file)
+        self.coordinator_db: Optional[str] = os.getenv('COORDINATOR_DB') or None
+        self.coordinator_mode: str = os.getenv('COORDINATOR_MODE', 'unordered').lower()
+        self.coordinator_chunk_size: int = self._get_int_env('COORDINATOR_CHUNK_SIZE', 1000) or 1000
+        self.coordinator_staging_dir: Optional[str] = os.getenv('COORDINATOR_STAGING_DIR') or None
+        self.lease_seconds: float = self._get_float_env('LEASE_SECONDS', 60.0)
+        self.worker_id: str = os.getenv('WORKER_ID') or f"{socket.gethostname()}-{os.getpid()}"
+        
+        # Multi-Process Sharding Configuration (one sender session per process)
+        self.sender_sessions: List[str] = [
+            name.strip() for name in os.getenv('SENDER_SESSIONS', '').split(',') if name.strip()
+        ]
+        self.shard_chunk_size: int = self._get_int_env('SHARD_CHUNK_SIZE', 1000) or 1000
+        
+        # Takeout Session Configuration (history reads at export limits)
+        self.use_takeout: bool = self._get_bool_env('USE_TAKEOUT', False)
+        self.takeout_max_wait: float = self._get_float_env('TAKEOUT_MAX_WAIT', 60.0)
+        
+        # Message Selection Configuration (applied server-side by iter_messages)
+        self.select_since: Optional[str] = os.getenv('SELECT_SINCE') or None
+        self.select_until: Optional[str] = os.getenv('SELECT_UNTIL') or None
+        self.select_min_id: int = self._get_int_env('SELECT_MIN_ID', 0) or 0
+        self.select_max_id: int = self._get_int_env('SELECT_MAX_ID', 0) or 0
+        self.select_only: List[str] = parse_types(os.getenv('SELECT_ONLY', ''))
+        self.select_search: Optional[str] = os.getenv('SELECT_SEARCH') or None
+        
+        # Reconciliation Configuration
+        self.reconcile_window: int = self._get_int_env('RECONCILE_WINDOW', 1000) or 1000
+        
+        # Filter/Transform Rules Configuration
+        self.rules_file: Optional[str] = os.getenv('RULES_FILE') or None
+        
     def _get_int_env(self, key: str, default: Optional[int] = None) -> Optional[int]:
         """Get integer environment variable."""
         value = os.getenv(key)
@@ -104,6 +188,93 @@ class Config:
         if self.retry_delay < 0:
             errors.append("RETRY_DELAY must be non-negative")
         
+        if self.retry_max_delay < self.retry_delay:
+            errors.append("RETRY_MAX_DELAY must be greater than or equal to RETRY_DELAY")
+        
+        if not 0 <= self.retry_jitter <= 1:
+            errors.append("RETRY_JITTER must be between 0 and 1")
+        
+        if self.progress_log_interval < 0 or self.progress_half_life < 0:
+            errors.append("PROGRESS_LOG_INTERVAL and PROGRESS_HALF_LIFE must be non-negative")
+        
+        if self.shutdown_timeout < 0:
+            errors.append("SHUTDOWN_TIMEOUT must be non-negative")
+        
+        if self.media_max_dimension <= 0 or self.media_transform_queue <= 0:
+            errors.append("MEDIA_MAX_DIMENSION and MEDIA_TRANSFORM_QUEUE must be positive")
+        
+        if self.media_transform_workers < 0:
+            errors.append("MEDIA_TRANSFORM_WORKERS must be non-negative")
+        
+        if min(self.upload_rate_limit, self.client_upload_rate_limit, self.download_rate_limit) < 0:
+            errors.append("UPLOAD_RATE_LIMIT, CLIENT_UPLOAD_RATE_LIMIT and DOWNLOAD_RATE_LIMIT must be non-negative")
+        
+        if self.scheduler_mode not in ('off', 'unordered', 'window'):
+            errors.append("SCHEDULER_MODE must be one of: off, unordered, window")
+        
+        if self.reorder_window <= 0:
+            errors.append("REORDER_WINDOW must be positive")
+        
+        if self.coalesce_max_gap < 0:
+            errors.append("COALESCE_MAX_GAP must be non-negative")
+        
+        if not 0 < self.coalesce_max_length <= 4096:
+            errors.append("COALESCE_MAX_LENGTH must be between 1 and 4096")
+        
+        if self.memory_budget < 0 or self.memory_trace_interval < 0:
+            errors.append("MEMORY_BUDGET_MB and MEMORY_TRACE_INTERVAL must be non-negative")
+        
+        if self.memory_chunk_size < 100:
+            errors.append("MEMORY_CHUNK_SIZE must be at least 100")
+        
+        if self.coordinator_mode not in ('unordered', 'ordered'):
+            errors.append("COORDINATOR_MODE must be one of: unordered, ordered")
+        
+        if self.coordinator_chunk_size <= 0 or self.lease_seconds <= 0:
+            errors.append("COORDINATOR_CHUNK_SIZE and LEASE_SECONDS must be positive")
+        
+        if self.shard_chunk_size <= 0:
+            errors.append("SHARD_CHUNK_SIZE must be positive")
+        
+        if len(set(self.sender_sessions)) != len(self.sender_sessions):
+            errors.append("SENDER_SESSIONS must not list the same session twice")
+        
+        if self.sender_sessions and self.use_bot_for_sending:
+            errors.append("SENDER_SESSIONS cannot be combined with USE_BOT_FOR_SENDING (every process would share one bot token)")
+        
+        if self.sender_sessions and self.control_socket:
+            errors.append("SENDER_SESSIONS cannot be combined with CONTROL_SOCKET (sender processes are not tuned at runtime)")
+        
+        if self.takeout_max_wait < 0:
+            errors.append("TAKEOUT_MAX_WAIT must be zero or positive")
+        
+        for key, value in (('SELECT_SINCE', self.select_since), ('SELECT_UNTIL', self.select_until)):
+            if value:
+                try:
+                    parse_date(value)
+                except ValueError:
+                    errors.append(f"{key} must be an ISO date (YYYY-MM-DD or YYYY-MM-DDTHH:MM)")
+        
+        if self.select_min_id < 0 or self.select_max_id < 0:
+            errors.append("SELECT_MIN_ID and SELECT_MAX_ID must be zero or positive")
+        elif self.select_min_id and self.select_max_id and self.select_min_id > self.select_max_id:
+            errors.append("SELECT_MIN_ID must not exceed SELECT_MAX_ID")
+        
+        unknown_types = [name for name in self.select_only if name not in SELECTABLE_TYPES]
+        if unknown_types:
+            errors.append(
+                f"Unknown SELECT_ONLY types: {', '.join(unknown_types)} (available: {', '.join(SELECTABLE_TYPES)})"
+            )
+        
+        if self.reconcile_window <= 0:
+            errors.append("RECONCILE_WINDOW must be positive")
+        
+        if self.dedup_capacity <= 0:
+            errors.append("DEDUP_CAPACITY must be positive")
+        
+        if not 0 < self.dedup_fp_rate < 1:
+            errors.append("DEDUP_FP_RATE must be between 0 and 1")
+        
         if errors:
             print("Erreurs de configuration:")
             for error in errors:
@@ -119,10 +290,30 @@ class Config:
   Rate Limit Delay: {self.rate_limit_delay}s
   Batch Size: {self.batch_size}
   Max Retries: {self.max_retries}
-  Retry Delay: {self.retry_delay}s
+  Retry Delay: {self.retry_delay}s (max {self.retry_max_delay}s, jitter {self.retry_jitter})
   Log File: {self.log_file}
   Log Level: {self.log_level}
   Progress File: {self.progress_file}
   Save Progress Interval: {self.save_progress_interval}
+  Progress Log Interval: {self.progress_log_interval}s (half-life {self.progress_half_life}s)
+  Shutdown Timeout: {self.shutdown_timeout}s
+  Dead Letter File: {self.dead_letter_file}
   Download Media: {self.download_media}
-  Media Timeout: {self.media_timeout}s"""
+  Media Timeout: {self.media_timeout}s
+  Media Transforms: {', '.join(self.media_transforms) or 'None'}
+  Upload Rate Limit: {self.upload_rate_limit or 'unlimited'} B/s
+  Client Upload Rate Limit: {self.client_upload_rate_limit or 'unlimited'} B/s
+  Download Rate Limit: {self.download_rate_limit or 'unlimited'} B/s
+  Dedup Enabled: {self.dedup_enabled}
+  Dedup File: {self.dedup_file} (suffixed per source/target pair)
+  Rules File: {self.rules_file or 'None'}
+  Scheduler Mode: {self.scheduler_mode}
+  Reorder Window: {self.reorder_window}
+  Coalesce Enabled: {self.coalesce_enabled}
+  Memory Budget: {self.memory_budget // (1024 * 1024) if self.memory_budget else 'unlimited'} MB
+  Memory Trace Interval: {self.memory_trace_interval or 'disabled'}
+  Coordinator: {self.coordinator_db or 'None'} ({self.coordinator_mode}, worker {self.worker_id})
+  Sender Sessions: {', '.join(self.sender_sessions) or 'None'}
+  Selection: since {self.select_since or '-'}, until {self.select_until or '-'}, IDs {self.select_min_id or '-'}..{self.select_max_id or '-'}, only {', '.join(self.select_only) or 'all'}, search {self.select_search or '-'}
+  Takeout: {self.use_takeout} (max wait {self.takeout_max_wait}s)
+  Reconcile Window: {self.reconcile_window}"""
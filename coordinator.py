@@ -0,0 +1,282 @@
+"""
+Coordination multi-nœuds pour le Clonage de Chaînes Telegram
+Découpe la plage d'IDs source en tranches attribuées par bail (lease) à des
+workers indépendants (machines, conteneurs), chacun avec son propre compte.
+L'état est partagé dans un fichier SQLite sur un stockage commun.
+
+Deux modes :
+
+    unordered   chaque worker envoie directement ses tranches : débit maximal,
+                ordre des messages non garanti dans la cible
+    ordered     phase de préparation parallèle (chaque tranche est archivée sur
+                le stockage partagé), puis phase de publication : les tranches
+                sont envoyées une à une, dans l'ordre des IDs
+
+Un bail non renouvelé (heartbeat) avant son échéance est réattribué ; le
+curseur enregistré à chaque renouvellement évite de renvoyer ce qui l'a déjà été.
+Les appels SQLite peuvent attendre le verrou jusqu'à 30 s : depuis la boucle
+asyncio, ils passent par run(), sur le fil dédié du coordinateur.
+"""
+
+import asyncio
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+MODE_UNORDERED = 'unordered'
+MODE_ORDERED = 'ordered'
+
+# États d'une tranche
+PENDING = 'pending'      # à copier (unordered) ou à préparer (ordered)
+STAGED = 'staged'        # archivée, en attente de publication (ordered)
+DONE = 'done'            # envoyée dans la cible
+
+# Phases d'un bail
+PHASE_COPY = 'copy'
+PHASE_STAGE = 'stage'
+PHASE_PUBLISH = 'publish'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    first_id INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    job TEXT NOT NULL,
+    start_id INTEGER NOT NULL,
+    end_id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    cursor INTEGER NOT NULL,
+    owner TEXT,
+    token TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job, start_id)
+);
+"""
+
+
+class LeaseLostError(Exception):
+    """Le bail a expiré et la tranche a pu être réattribuée à un autre worker."""
+
+
+class Lease:
+    """Bail d'un worker sur une tranche [start_id, end_id]."""
+
+    __slots__ = ('start_id', 'end_id', 'phase', 'cursor', 'token')
+
+    def __init__(self, start_id: int, end_id: int, phase: str, cursor: int, token: str):
+        self.start_id = start_id
+        self.end_id = end_id
+        self.phase = phase
+        self.cursor = cursor
+        self.token = token
+
+    def __repr__(self) -> str:
+        return f"Lease({self.phase} {self.start_id}-{self.end_id}, cursor {self.cursor})"
+
+
+class LeaseCoordinator:
+    """Attribution des tranches par bail, partagée entre workers via SQLite."""
+
+    def __init__(
+        self,
+        path: str,
+        job: str,
+        worker_id: str,
+        lease_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the coordinator.
+
+        Args:
+            path: SQLite file on storage shared by every worker
+            job: Job key (source/target pair)
+            worker_id: Unique name of this worker
+            lease_seconds: Lease duration, renewed by heartbeat
+            clock: Wall clock shared by the workers (injectable for tests)
+        """
+        self.path = path
+        self.job = job
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        # Autocommit : les transactions sont ouvertes explicitement (BEGIN IMMEDIATE)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        # Un seul fil : les transactions de la connexion ne s'entrelacent jamais
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='coordinator')
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._db.close()
+
+    async def run(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        """Exécute une méthode du coordinateur hors de la boucle asyncio."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+    def _transaction(self):
+        """Verrou d'écriture immédiat : un seul worker attribue des baux à la fois."""
+        return _Transaction(self._db)
+
+    @property
+    def mode(self) -> Optional[str]:
+        row = self._db.execute("SELECT mode FROM jobs WHERE job = ?", (self.job,)).fetchone()
+        return row[0] if row else None
+
+    def plan(self, first_id: int, last_id: int, chunk_size: int, mode: str = MODE_UNORDERED) -> bool:
+        """
+        Découpe la plage d'IDs en tranches, si aucun worker ne l'a déjà fait.
+
+        Returns:
+            True if this call created the plan, False if it already existed
+        """
+        with self._transaction():
+            if self._db.execute("SELECT 1 FROM jobs WHERE job = ?", (self.job,)).fetchone():
+                return False
+            self._db.execute(
+                "INSERT INTO jobs (job, mode, first_id, last_id, chunk_size) VALUES (?, ?, ?, ?, ?)",
+                (self.job, mode, first_id, last_id, chunk_size)
+            )
+            self._db.executemany(
+                "INSERT INTO chunks (job, start_id, end_id, state, cursor) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (self.job, start, min(start + chunk_size - 1, last_id), PENDING, start - 1)
+                    for start in range(first_id, last_id + 1, chunk_size)
+                ]
+            )
+            return True
+
+    def acquire(self) -> Optional[Lease]:
+        """
+        Prend le bail d'une tranche disponible (libre ou dont le bail a expiré).
+
+        En mode ordonné, la publication de la plus ancienne tranche non publiée
+        passe avant toute préparation, et une seule publication est active à la fois.
+
+        Returns:
+            The lease, or None if nothing is available right now
+        """
+        now = self.clock()
+        with self._transaction():
+            if self.mode == MODE_ORDERED:
+                row = self._db.execute(
+                    "SELECT start_id, state, owner, lease_until FROM chunks "
+                    "WHERE job = ? AND state != ? ORDER BY start_id LIMIT 1",
+                    (self.job, DONE)
+                ).fetchone()
+                if row and row[1] == STAGED and (row[2] is None or row[3] < now):
+                    return self._grant(row[0], PHASE_PUBLISH, now)
+
+            row = self._db.execute(
+                "SELECT start_id FROM chunks WHERE job = ? AND state = ? "
+                "AND (owner IS NULL OR lease_until < ?) ORDER BY start_id LIMIT 1",
+                (self.job, PENDING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._grant(row[0], PHASE_STAGE if self.mode == MODE_ORDERED else PHASE_COPY, now)
+
+    def _grant(self, start_id: int, phase: str, now: float) -> Lease:
+        token = uuid.uuid4().hex
+        self._db.execute(
+            "UPDATE chunks SET owner = ?, token = ?, lease_until = ?, attempts = attempts + 1 "
+            "WHERE job = ? AND start_id = ?",
+            (self.worker_id, token, now + self.lease_seconds, self.job, start_id)
+        )
+        end_id, cursor = self._db.execute(
+            "SELECT end_id, cursor FROM chunks WHERE job = ? AND start_id = ?", (self.job, start_id)
+        ).fetchone()
+        return Lease(start_id, end_id, phase, cursor, token)
+
+    def heartbeat(self, lease: Lease, cursor: Optional[int] = None):
+        """
+        Renouvelle le bail et enregistre le curseur atteint dans la tranche.
+
+        Raises:
+            LeaseLostError: If the lease expired and was taken over
+        """
+        if cursor is not None:
+            lease.cursor = max(lease.cursor, cursor)
+        with self._transaction():
+            updated = self._db.execute(
+                "UPDATE chunks SET lease_until = ?, cursor = ? WHERE job = ? AND start_id = ? AND token = ?",
+                (self.clock() + self.lease_seconds, lease.cursor, self.job, lease.start_id, lease.token)
+            ).rowcount
+        if not updated:
+            raise LeaseLostError(f"Bail perdu sur la tranche {lease.start_id}-{lease.end_id}")
+
+    def holds(self, lease: Lease) -> bool:
+        """Vrai si le bail est toujours le nôtre et non échu (vérifié avant chaque envoi)."""
+        return self._db.execute(
+            "SELECT 1 FROM chunks WHERE job = ? AND start_id = ? AND token = ? AND lease_until >= ?",
+            (self.job, lease.start_id, lease.token, self.clock())
+        ).fetchone() is not None
+
+    def complete(self, lease: Lease):
+        """
+        Termine la phase du bail (préparée → en attente de publication, sinon envoyée).
+
+        Raises:
+            LeaseLostError: If the lease expired and was taken over
+        """
+        state = STAGED if lease.phase == PHASE_STAGE else DONE
+        with self._transaction():
+            updated = self._db.execute(
+                "UPDATE chunks SET state = ?, cursor = ?, owner = NULL, token = NULL, lease_until = NULL "
+                "WHERE job = ? AND start_id = ? AND token = ?",
+                (state, lease.end_id if state == DONE else lease.start_id - 1,
+                 self.job, lease.start_id, lease.token)
+            ).rowcount
+        if not updated:
+            raise LeaseLostError(f"Bail perdu sur la tranche {lease.start_id}-{lease.end_id}")
+
+    def release(self, lease: Lease, cursor: Optional[int] = None) -> bool:
+        """
+        Rend la tranche sans la terminer (arrêt, erreur), pour réattribution immédiate.
+
+        Returns:
+            False if the lease had already been taken over
+        """
+        if cursor is not None:
+            lease.cursor = max(lease.cursor, cursor)
+        with self._transaction():
+            return self._db.execute(
+                "UPDATE chunks SET cursor = ?, owner = NULL, token = NULL, lease_until = NULL "
+                "WHERE job = ? AND start_id = ? AND token = ?",
+                (lease.cursor, self.job, lease.start_id, lease.token)
+            ).rowcount > 0
+
+    def counts(self) -> Dict[str, int]:
+        """Nombre de tranches par état."""
+        counts = {PENDING: 0, STAGED: 0, DONE: 0}
+        for state, count in self._db.execute(
+            "SELECT state, COUNT(*) FROM chunks WHERE job = ? GROUP BY state", (self.job,)
+        ):
+            counts[state] = count
+        return counts
+
+    def finished(self) -> bool:
+        """Vrai quand toutes les tranches ont été envoyées."""
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[STAGED] == 0
+
+
+class _Transaction:
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
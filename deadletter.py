@@ -0,0 +1,97 @@
+"""
+File des messages en échec pour le Clonage de Chaînes Telegram
+Journal JSON Lines en ajout seul : chaque message abandonné y est inscrit avec
+son erreur et son nombre de tentatives, pour être renvoyé plus tard
+(--retry-failed) sans reparcourir toute la chaîne.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+class DeadLetterQueue:
+    """Messages abandonnés, par paire source/cible, persistés à chaque ajout."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the dead-letter queue.
+
+        Args:
+            path: JSON Lines file (created on first failure)
+        """
+        self.path = path
+        self._entries: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Dernière ligne tronquée par un arrêt brutal
+                pending = self._entries.setdefault(entry['key'], {})
+                if entry.get('resolved'):
+                    pending.pop(entry['id'], None)
+                else:
+                    pending[entry['id']] = entry
+
+    def _append(self, entry: Dict[str, Any]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, key: str, message_id: int, error: Exception, attempts: int):
+        """
+        Inscrit un message abandonné (remplace une inscription précédente du même message).
+
+        Args:
+            key: Source/target pair key
+            message_id: Source message ID
+            error: Last error raised
+            attempts: Number of send attempts made
+        """
+        self._load()
+        entry = {
+            'key': key,
+            'id': message_id,
+            'error': type(error).__name__,
+            'detail': str(error)[:200],
+            'attempts': attempts,
+            'time': datetime.now().isoformat(),
+        }
+        self._append(entry)
+        self._entries.setdefault(key, {})[message_id] = entry
+
+    def resolve(self, key: str, message_id: int):
+        """Retire un message de la file (renvoyé avec succès ou disparu de la source)."""
+        self._load()
+        if self._entries.get(key, {}).pop(message_id, None) is not None:
+            self._append({'key': key, 'id': message_id, 'resolved': True})
+
+    def entries(self, key: str) -> List[Dict[str, Any]]:
+        """Messages en échec de la paire, par ID croissant."""
+        self._load()
+        return [self._entries[key][i] for i in sorted(self._entries.get(key, {}))]
+
+    def compact(self):
+        """Réécrit le journal avec les seules inscriptions encore en attente."""
+        self._load()
+        if not os.path.exists(self.path):
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for pending in self._entries.values():
+                for entry in pending.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
@@ -0,0 +1,169 @@
+"""
+Déduplication par contenu pour le Clonage de Chaînes Telegram
+Filtre de Bloom persistant à mémoire bornée et empreinte des messages.
+"""
+
+import hashlib
+import math
+import os
+import struct
+from typing import Optional
+
+from utils import clean_text
+
+
+# En-tête du fichier : magic, nombre de bits, nombre de hachages, capacité, éléments insérés
+_HEADER = struct.Struct('<8sQIQQ')
+_MAGIC = b'TCBLOOM1'
+
+
+class BloomFilter:
+    """Filtre de Bloom de taille fixe, dimensionné selon une capacité et un taux de faux positifs."""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        """
+        Initialize the Bloom filter.
+
+        Args:
+            capacity: Nombre d'éléments attendus
+            fp_rate: Taux de faux positifs visé (entre 0 et 1)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes):
+        """Calcule les positions des bits par double hachage."""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: bytes) -> bool:
+        """
+        Ajoute une clé au filtre.
+
+        Returns:
+            True si la clé était (probablement) déjà présente
+        """
+        present = True
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            mask = 1 << bit
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: bytes) -> bool:
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        """Taille mémoire du tableau de bits."""
+        return len(self.bits)
+
+    def save(self, filepath: str):
+        """Sauvegarde le filtre sur disque (écriture atomique)."""
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        temp_filepath = f"{filepath}.tmp"
+        with open(temp_filepath, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count))
+            f.write(self.bits)
+        os.replace(temp_filepath, filepath)
+
+    @classmethod
+    def load(cls, filepath: str, fp_rate: float) -> 'BloomFilter':
+        """
+        Charge un filtre depuis le disque.
+
+        Args:
+            filepath: Chemin du fichier
+            fp_rate: Taux de faux positifs (informatif, la géométrie vient du fichier)
+        """
+        with open(filepath, 'rb') as f:
+            magic, num_bits, num_hashes, capacity, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Fichier de filtre invalide: {filepath}")
+            bits = bytearray(f.read())
+
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"Fichier de filtre tronqué: {filepath}")
+
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.fp_rate = fp_rate
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bits
+        bloom.count = count
+        return bloom
+
+    @classmethod
+    def open(cls, filepath: str, capacity: int, fp_rate: float) -> 'BloomFilter':
+        """Charge le filtre s'il existe, sinon en crée un nouveau."""
+        if os.path.exists(filepath):
+            return cls.load(filepath, fp_rate)
+        return cls(capacity, fp_rate)
+
+
+def media_identity(media) -> Optional[str]:
+    """
+    Identité stable d'un média Telegram (photo ou document).
+
+    Args:
+        media: Objet média Telethon
+
+    Returns:
+        Identifiant textuel du média, vide si absent, None si le média n'a pas
+        d'identifiant propre (sondage, position, contact, aperçu de lien...)
+    """
+    if media is None:
+        return ""
+
+    if isinstance(media, str):
+        # Média d'archive : le nom de fichier est son empreinte SHA-256
+        return f"file:{os.path.basename(media)}"
+
+    photo = getattr(media, 'photo', None)
+    if photo is not None and getattr(photo, 'id', None) is not None:
+        return f"photo:{photo.id}"
+
+    document = getattr(media, 'document', None)
+    if document is not None and getattr(document, 'id', None) is not None:
+        return f"document:{document.id}"
+
+    # Sans identifiant par objet, deux médias du même type seraient confondus
+    return None
+
+
+def content_fingerprint(message) -> Optional[bytes]:
+    """
+    Calcule l'empreinte du contenu d'un message (texte normalisé + identité du média).
+
+    Args:
+        message: Message Telegram
+
+    Returns:
+        Empreinte binaire, ou None pour un message vide ou dont le média n'a pas d'identité
+    """
+    text = clean_text(getattr(message, 'message', '') or '')
+    media = media_identity(getattr(message, 'media', None))
+    if media is None or (not text and not media):
+        return None
+    return hashlib.blake2b(f"{media}\x00{text}".encode('utf-8'), digest_size=16).digest()
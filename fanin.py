@@ -0,0 +1,48 @@
+"""
+Fusion de plusieurs sources pour le Clonage de Chaînes Telegram
+Chaque source est parcourue par son propre flux (du plus ancien au plus récent) ;
+les flux sont fusionnés à la volée par date avec un tas de k éléments : un seul
+message en attente par source, quelle que soit la longueur des sources.
+"""
+
+import heapq
+from typing import Any, AsyncIterator, List, Tuple
+
+
+def _date_key(message) -> float:
+    date = getattr(message, 'date', None)
+    return date.timestamp() if date is not None else 0.0
+
+
+async def merge_by_date(streams: List[AsyncIterator[Any]]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Fusion k-voies de flux déjà triés par date.
+
+    Args:
+        streams: One ascending message stream per source
+
+    Yields:
+        (source index, message), oldest first; ties keep the source order
+    """
+    heap = []
+    for index, stream in enumerate(streams):
+        message = await _next(stream)
+        if message is not None:
+            heap.append((_date_key(message), index, message.id, message))
+    heapq.heapify(heap)
+
+    while heap:
+        _, index, _, message = heap[0]
+        yield index, message
+        following = await _next(streams[index])
+        if following is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (_date_key(following), index, following.id, following))
+
+
+async def _next(stream: AsyncIterator[Any]):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
@@ -0,0 +1,78 @@
+"""
+Diffusion vers plusieurs cibles pour le Clonage de Chaînes Telegram
+Un message lu une seule fois est envoyé à chaque cible ; son média est préparé
+(téléchargé, transformé) et téléversé une seule fois, puis le même descripteur
+de fichier Telegram est réutilisé pour chaque envoi.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class SharedUploads:
+    """Médias préparés et téléversés une fois, partagés entre les cibles d'un même lot."""
+
+    def __init__(self, consumers: int):
+        """
+        Initialize the shared upload cache.
+
+        Args:
+            consumers: Number of targets expected to send each media
+        """
+        self.consumers = consumers
+        self.uploads = 0
+        self.reuses = 0
+        # ID source -> (préparation en cours ou terminée, envois restants)
+        self._entries: Dict[int, List[Any]] = {}
+
+    async def get(self, message_id: int, produce: Callable[[], Awaitable[Tuple[Any, Optional[str]]]]) -> Any:
+        """
+        Média à envoyer pour ce message, produit au premier appel.
+
+        Args:
+            message_id: Source message ID
+            produce: Coroutine factory returning (media handle, temporary file or None)
+
+        Returns:
+            The media handle shared by every target
+        """
+        entry = self._entries.get(message_id)
+        if entry is None:
+            entry = self._entries[message_id] = [asyncio.ensure_future(produce()), self.consumers]
+            self.uploads += 1
+        else:
+            self.reuses += 1
+        try:
+            # shield : l'annulation d'une cible n'interrompt pas le téléversement des autres
+            media, _ = await asyncio.shield(entry[0])
+            return media
+        except Exception:
+            # Échec partagé : la cible suivante retentera une préparation complète
+            if self._entries.get(message_id) is entry:
+                del self._entries[message_id]
+            raise
+        finally:
+            entry[1] -= 1
+            if entry[1] <= 0 and self._entries.get(message_id) is entry:
+                self._discard(message_id)
+
+    def _discard(self, message_id: int):
+        future = self._entries.pop(message_id)[0]
+        if not future.done():
+            future.cancel()
+            return
+        if future.cancelled() or future.exception() is not None:
+            return
+        temp_path = future.result()[1]
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    def clear(self):
+        """Libère les médias du lot que certaines cibles n'ont pas envoyés (déjà copiés, arrêt)."""
+        for message_id in list(self._entries):
+            self._discard(message_id)
+
+    def log_stats(self, logger):
+        if self.uploads:
+            logger.info(f"Shared media: {self.uploads} prepared/uploaded once, {self.reuses} reused for other targets")
@@ -0,0 +1,118 @@
+"""
+Rafraîchissement des références de fichiers pour le Clonage de Chaînes Telegram
+Les références de fichiers d'un média expirent quelques heures après la
+récupération du message : send_file(message.media) échoue alors avec
+FileReferenceExpiredError. Les messages concernés sont relus en lot avec
+get_messages(ids=[...]), au plus 100 IDs par requête ; les échecs simultanés
+rejoignent la même requête, complétée par les messages suivis pas encore
+envoyés (récupérés en même temps, leurs références expirent aussi).
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+# get_messages(ids=...) accepte au plus 100 IDs par requête
+MAX_IDS_PER_REQUEST = 100
+
+
+def is_file_reference_error(error) -> bool:
+    """Vrai pour FileReferenceExpiredError / FileReferenceInvalidError (et variantes)."""
+    return 'FileReference' in type(error).__name__
+
+
+class FileReferenceRefresher:
+    """Relecture groupée des médias dont la référence de fichier a expiré."""
+
+    def __init__(self, client, entity, batch_size: int = MAX_IDS_PER_REQUEST):
+        """
+        Initialize the refresher.
+
+        Args:
+            client: Telethon client that fetched the messages
+            entity: Source channel of the messages
+            batch_size: Maximum number of IDs per get_messages call
+        """
+        self.client = client
+        self.entity = entity
+        self.batch_size = batch_size
+        self.requests = 0
+        self.refreshed = 0
+        self.missing = 0
+        # Messages récupérés en attente d'envoi : rafraîchis avec le premier échec
+        self._tracked: Dict[int, Any] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._flush: Optional[asyncio.Task] = None
+
+    def track(self, messages: Iterable[Any]):
+        """Suit les messages à média Telegram d'un lot qui va être envoyé."""
+        for message in messages:
+            media = getattr(message, 'media', None)
+            if media is not None and not isinstance(media, str):
+                self._tracked[message.id] = message
+
+    def discard(self, message_id: int):
+        """Message envoyé (ou abandonné) : plus besoin de rafraîchir sa référence."""
+        self._tracked.pop(message_id, None)
+
+    async def refresh(self, message, stale_media) -> Optional[Any]:
+        """
+        Média à jour d'un message dont la référence a expiré.
+
+        Args:
+            message: Message whose send failed (its media is updated in place)
+            stale_media: Media object that was rejected
+
+        Returns:
+            The fresh media, or None if the message or its media is gone from the source
+        """
+        if message.media is not stale_media:
+            # Déjà rafraîchi par le lot d'un autre échec
+            return message.media
+        future = self._pending.get(message.id)
+        if future is None:
+            future = self._pending[message.id] = asyncio.get_running_loop().create_future()
+            self._tracked.setdefault(message.id, message)
+            if self._flush is None:
+                self._flush = asyncio.ensure_future(self._run())
+        return await asyncio.shield(future)
+
+    async def _run(self):
+        # Un tour de boucle : les échecs simultanés rejoignent la même requête
+        await asyncio.sleep(0)
+        try:
+            while self._pending:
+                ids = sorted(self._pending)[:self.batch_size]
+                wanted = set(ids)
+                ids += [
+                    message_id for message_id in sorted(self._tracked) if message_id not in wanted
+                ][:self.batch_size - len(ids)]
+                try:
+                    fetched = await self.client.get_messages(self.entity, ids=ids)
+                except Exception as e:
+                    for message_id in wanted:
+                        future = self._pending.pop(message_id)
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                self.requests += 1
+                for message_id, fresh in zip(ids, fetched):
+                    media = getattr(fresh, 'media', None) if fresh is not None else None
+                    message = self._tracked.get(message_id)
+                    if media is None:
+                        if message_id in wanted:
+                            self.missing += 1
+                    elif message is not None:
+                        message.media = media
+                        self.refreshed += 1
+                    future = self._pending.pop(message_id, None)
+                    if future is not None and not future.done():
+                        future.set_result(media)
+        finally:
+            self._flush = None
+
+    def log_stats(self, logger):
+        if self.requests:
+            logger.info(
+                f"File references: {self.refreshed} refreshed in {self.requests} request(s)"
+                f"{f', {self.missing} gone from source' if self.missing else ''}"
+            )
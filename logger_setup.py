@@ -3,12 +3,16 @@ Logging setup for Telegram Channel Cloner
 Configures logging to both file and console with proper formatting.
 """
 
+import asyncio
 import logging
 import os
-from datetime import datetime
-from typing import Optional
+import time
+from datetime import timedelta
+from typing import Callable, Optional
 from logging.handlers import RotatingFileHandler
 
+from utils import format_duration, format_file_size
+
 
 def setup_logger(log_level: str = 'INFO', log_file: str = 'telegram_cloner.log') -> logging.Logger:
     """
@@ -74,53 +78,143 @@ def setup_logger(log_level: str = 'INFO', log_file: str = 'telegram_cloner.log')
 
 
 class ProgressLogger:
-    """Helper class for logging progress with different levels."""
+    """
+    Progress reporter emitting on a fixed time interval.
     
-    def __init__(self, logger: logging.Logger, name: str = "Progress"):
+    Counters are bumped on the per-message path; rates (messages/s and bytes/s,
+    smoothed by a time-based EWMA), ETA and formatting are only computed when a
+    report is due.
+    """
+    
+    def __init__(
+        self,
+        logger: logging.Logger,
+        name: str = "Progress",
+        interval: float = 10.0,
+        half_life: float = 30.0,
+        status: Optional[Callable[[], str]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
         """
         Initialize progress logger.
         
         Args:
             logger: Main logger instance
             name: Name for this progress logger
+            interval: Seconds between two reports
+            half_life: Seconds after which a rate sample weighs half as much
+            status: Optional callable returning extra details for each report
+            clock: Monotonic clock (injectable for tests)
         """
         self.logger = logger
         self.name = name
-        self.start_time = datetime.now()
-        self.last_update = self.start_time
+        self.interval = interval
+        self.half_life = half_life
+        self.status = status
+        self.clock = clock
+        self.total = 0
+        self.total_bytes = 0
+        self.current = 0
+        self.current_bytes = 0
+        self.message_rate: Optional[float] = None
+        self.byte_rate: Optional[float] = None
+        self.start_time = clock()
+        self._last_time = self.start_time
+        self._last_current = 0
+        self._last_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+    
+    def add_total(self, messages: int, media_bytes: int = 0):
+        """Ajoute des messages (et leurs octets de média) au travail connu."""
+        self.total += messages
+        self.total_bytes += media_bytes
+    
+    def add(self, messages: int = 1, media_bytes: int = 0):
+        """Compte des messages traités ; rien d'autre sur ce chemin."""
+        self.current += messages
+        self.current_bytes += media_bytes
+    
+    def start(self):
+        """Démarre les rapports périodiques (boucle asyncio requise)."""
+        self.start_time = self._last_time = self.clock()
+        if self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._report_loop())
+    
+    async def stop(self):
+        """Arrête les rapports périodiques."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.update()
+    
+    def _sample(self):
+        """Intègre l'activité depuis le dernier échantillon dans les moyennes mobiles."""
+        now = self.clock()
+        elapsed = now - self._last_time
+        if elapsed <= 0:
+            return
+        message_rate = (self.current - self._last_current) / elapsed
+        byte_rate = (self.current_bytes - self._last_bytes) / elapsed
+        if self.message_rate is None:
+            self.message_rate, self.byte_rate = message_rate, byte_rate
+        else:
+            # Poids fonction du temps écoulé : des rapports irréguliers gardent la même demi-vie
+            weight = 1 - 0.5 ** (elapsed / self.half_life) if self.half_life > 0 else 1.0
+            self.message_rate += weight * (message_rate - self.message_rate)
+            self.byte_rate += weight * (byte_rate - self.byte_rate)
+        self._last_time = now
+        self._last_current = self.current
+        self._last_bytes = self.current_bytes
+    
+    def eta(self) -> Optional[float]:
+        """
+        Seconds left, or None while unknown.
         
-    def update(self, current: int, total: int, message: str = ""):
+        Messages and media bytes are estimated separately; the slower of the
+        two dominates, so a tail of large media is not hidden by fast text.
+        """
+        remaining = max(0, self.total - self.current)
+        remaining_bytes = max(0, self.total_bytes - self.current_bytes)
+        if not remaining:
+            return 0.0
+        if not self.message_rate:
+            return None
+        eta = remaining / self.message_rate
+        if remaining_bytes and self.byte_rate:
+            eta = max(eta, remaining_bytes / self.byte_rate)
+        return eta
+    
+    def update(self, message: str = ""):
         """
         Log progress update.
         
         Args:
-            current: Current progress
-            total: Total items
             message: Additional message
         """
-        now = datetime.now()
-        percentage = (current / total) * 100 if total > 0 else 0
-        
-        # Calculate timing
-        elapsed = now - self.start_time
-        elapsed_seconds = elapsed.total_seconds()
-        
-        # Calculate ETA
-        if current > 0 and elapsed_seconds > 0:
-            rate = current / elapsed_seconds
-            remaining = total - current
-            eta_seconds = remaining / rate if rate > 0 else 0
-            eta = f"{int(eta_seconds // 60)}:{int(eta_seconds % 60):02d}"
-        else:
-            eta = "Unknown"
+        self._sample()
+        percentage = (self.current / self.total) * 100 if self.total > 0 else 0
+        eta_seconds = self.eta()
+        eta = format_duration(timedelta(seconds=eta_seconds)) if eta_seconds is not None else "Unknown"
         
-        # Log message
-        progress_msg = f"{self.name}: {current}/{total} ({percentage:.1f}%) - ETA: {eta}"
+        progress_msg = (
+            f"{self.name}: {self.current}/{self.total} ({percentage:.1f}%) - "
+            f"{self.message_rate or 0:.2f} msg/s, {format_file_size(self.byte_rate or 0)}/s - ETA: {eta}"
+        )
+        details = self.status() if self.status else ""
+        if details:
+            progress_msg += f" - {details}"
         if message:
             progress_msg += f" - {message}"
-            
+        
         self.logger.info(progress_msg)
-        self.last_update = now
     
     def finish(self, message: str = "Completed"):
         """
@@ -129,10 +223,8 @@ class ProgressLogger:
         Args:
             message: Completion message
         """
-        elapsed = datetime.now() - self.start_time
-        elapsed_str = f"{int(elapsed.total_seconds() // 60)}:{int(elapsed.total_seconds() % 60):02d}"
-        
-        self.logger.info(f"{self.name}: {message} in {elapsed_str}")
+        elapsed = self.clock() - self.start_time
+        self.logger.info(f"{self.name}: {message} in {format_duration(timedelta(seconds=elapsed))}")
 
 
 def log_exception(logger: logging.Logger, exception: Exception, context: str = ""):
@@ -152,6 +244,47 @@ def log_exception(logger: logging.Logger, exception: Exception, context: str = "
     logger.error(error_msg, exc_info=True)
 
 
+# Catégories d'erreurs Telegram (voir classify_telegram_error)
+ERROR_FLOOD = 'flood'
+ERROR_RETRYABLE = 'retryable'
+ERROR_FATAL_MESSAGE = 'fatal_message'
+ERROR_FATAL_JOB = 'fatal_job'
+
+# Erreurs 400 qui rendent toute la cible inutilisable, pas seulement un message
+_JOB_LEVEL_ERRORS = {
+    'ChatAdminRequiredError', 'ChannelInvalidError', 'ChannelPrivateError',
+    'PeerIdInvalidError', 'UserBannedInChannelError', 'ChatRestrictedError',
+}
+
+
+def classify_telegram_error(error) -> str:
+    """
+    Classify a Telegram error by how it should be handled.
+    
+    Args:
+        error: Exception raised while sending
+        
+    Returns:
+        ERROR_FLOOD, ERROR_FATAL_JOB, ERROR_FATAL_MESSAGE or ERROR_RETRYABLE
+    """
+    error_type = type(error).__name__
+    # Les classes de base Telethon (BadRequestError, ForbiddenError...) par nom,
+    # pour ne pas importer Telethon ici
+    bases = {cls.__name__ for cls in type(error).__mro__}
+    
+    if 'FloodWait' in error_type or 'SlowModeWait' in error_type or 'FloodError' in bases:
+        return ERROR_FLOOD
+    if ('Unauthorized' in error_type or 'Forbidden' in error_type
+            or error_type in _JOB_LEVEL_ERRORS or bases & {'UnauthorizedError', 'ForbiddenError'}):
+        return ERROR_FATAL_JOB
+    if 'FileReference' in error_type:
+        # La référence du média est relue avant la relance (voir filerefs.py)
+        return ERROR_RETRYABLE
+    if 'NotFound' in error_type or 'BadRequestError' in bases:
+        return ERROR_FATAL_MESSAGE
+    return ERROR_RETRYABLE
+
+
 def log_telegram_error(logger: logging.Logger, error, message_id: Optional[int] = None):
     """
     Log Telegram-specific errors with appropriate handling.
@@ -169,11 +302,12 @@ def log_telegram_error(logger: logging.Logger, error, message_id: Optional[int]
         base_msg += f" [Message ID: {message_id}]"
     
     # Different log levels for different error types
-    if 'FloodWait' in error_type:
+    category = classify_telegram_error(error)
+    if category == ERROR_FLOOD:
         logger.warning(base_msg)
-    elif 'Unauthorized' in error_type or 'Forbidden' in error_type:
+    elif category == ERROR_FATAL_JOB:
         logger.error(base_msg)
-    elif 'NotFound' in error_type:
+    elif category == ERROR_FATAL_MESSAGE:
         logger.warning(base_msg)
     else:
         logger.error(base_msg, exc_info=True)
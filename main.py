@@ -5,19 +5,17 @@ Un outil amélioré de clonage de chaînes Telegram avec gestion d'erreurs, jour
 """
 
 import argparse
-import asyncio
 import sys
 import os
 from datetime import datetime
 
-from config import Config
-from telegram_cloner import TelegramCloner
-from logger_setup import setup_logger
-from dotenv import load_dotenv
+# Les modules lourds (Telethon via telegram_cloner, asyncio, logging, dotenv) sont
+# importés à la demande : --help et --check ne doivent pas payer leur chargement.
 
 
 def check_credentials():
     """Vérifie et demande les identifiants requis."""
+    from dotenv import load_dotenv
     load_dotenv()
     
     print("🔧 Vérification de la Configuration")
@@ -171,19 +169,32 @@ Exemples:
   python main.py --source @chaine_source --target @chaine_cible
   python main.py --source -1001234567890 --target -1009876543210 --limit 100
   python main.py --source @chaine_source --target @chaine_cible --resume --use-bot
+  python main.py --source @chaine_source --export ./archive_chaine
+  python main.py --source @chaine_source --export ./archive_chaine --takeout
+  python main.py --source @chaine_source --target @chaine_cible --since 2024-01-01 --only photo,video
+  python main.py --from-archive ./archive_chaine --target @chaine_cible
+  python main.py --retry-failed --source @chaine_source --target @chaine_cible
+  python main.py --reconcile --dry-run --source @chaine_source --target @chaine_cible
+  python main.py --coordinator /partage/clonage.db --source @chaine_source --target @chaine_cible
+  python main.py --senders compte1,compte2,compte3 --source @chaine_source --target @chaine_cible
+  python main.py --source @chaine_source --target @cible1,@cible2,@cible3
+  python main.py --source @source1,@source2,@source3 --target @chaine_cible
+  python main.py --check --source @chaine_source --target @chaine_cible
         """
     )
     
     parser.add_argument(
         '--source', '-s',
         required=False,
-        help='Nom ou ID de la chaîne source (ex: @chaine, -1001234567890)'
+        help='Nom ou ID de la chaîne source (ex: @chaine, -1001234567890) ; '
+             'plusieurs sources séparées par des virgules pour les fusionner par date dans la cible'
     )
     
     parser.add_argument(
         '--target', '-t',
         required=False,
-        help='Nom ou ID de la chaîne cible (ex: @chaine, -1001234567890)'
+        help='Nom ou ID de la chaîne cible (ex: @chaine, -1001234567890) ; '
+             'plusieurs cibles séparées par des virgules pour une diffusion (une seule lecture de la source)'
     )
     
     parser.add_argument(
@@ -232,16 +243,332 @@ Exemples:
         help='Utiliser un bot pour envoyer les messages (nécessite TELEGRAM_BOT_TOKEN)'
     )
     
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Ignorer les messages dont le contenu a déjà été cloné (filtre de Bloom persistant)'
+    )
+    
+    parser.add_argument(
+        '--coalesce',
+        action='store_true',
+        help='Regrouper les rafales de messages texte courts en un seul envoi (remplace COALESCE_ENABLED)'
+    )
+    
+    parser.add_argument(
+        '--export',
+        metavar='DOSSIER',
+        default=None,
+        help='Exporter la chaîne source vers une archive locale au lieu de cloner (reprise automatique)'
+    )
+    
+    parser.add_argument(
+        '--from-archive',
+        metavar='DOSSIER',
+        default=None,
+        help="Envoyer depuis une archive locale (créée avec --export) au lieu de lire la source"
+    )
+    
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help="Renvoyer uniquement les messages en échec enregistrés pour cette paire (DEAD_LETTER_FILE)"
+    )
+    
+    parser.add_argument(
+        '--reconcile',
+        action='store_true',
+        help="Comparer source et cible et renvoyer les messages manquants (--dry-run : rapport seul)"
+    )
+    
+    parser.add_argument(
+        '--reconcile-output',
+        metavar='FICHIER',
+        default=None,
+        help="Écrire les IDs source des messages manquants dans ce fichier (un par ligne)"
+    )
+    
+    parser.add_argument(
+        '--coordinator',
+        metavar='FICHIER',
+        default=None,
+        help="Travailler comme worker d'un clonage réparti, coordonné par ce fichier SQLite partagé (remplace COORDINATOR_DB)"
+    )
+    
+    parser.add_argument(
+        '--ordered',
+        action='store_true',
+        help="Avec --coordinator : préparer les tranches en parallèle puis les publier dans l'ordre"
+    )
+    
+    parser.add_argument(
+        '--senders',
+        metavar='SESSIONS',
+        default=None,
+        help="Un processus d'envoi par session Telethon, séparées par des virgules, sans --use-bot (remplace SENDER_SESSIONS)"
+    )
+    
+    parser.add_argument(
+        '--since',
+        metavar='DATE',
+        default=None,
+        help="Sélectionner les messages publiés à partir de cette date ISO, UTC par défaut (remplace SELECT_SINCE)"
+    )
+    
+    parser.add_argument(
+        '--until',
+        metavar='DATE',
+        default=None,
+        help="Sélectionner les messages publiés jusqu'à cette date ISO incluse (remplace SELECT_UNTIL)"
+    )
+    
+    parser.add_argument(
+        '--min-id',
+        type=int,
+        default=None,
+        help="Premier ID de message sélectionné, inclus (remplace SELECT_MIN_ID)"
+    )
+    
+    parser.add_argument(
+        '--max-id',
+        type=int,
+        default=None,
+        help="Dernier ID de message sélectionné, inclus (remplace SELECT_MAX_ID)"
+    )
+    
+    parser.add_argument(
+        '--only',
+        metavar='TYPES',
+        default=None,
+        help="Types sélectionnés, séparés par des virgules: photo, video, audio, document, image, text "
+             "(remplace SELECT_ONLY)"
+    )
+    
+    parser.add_argument(
+        '--search',
+        metavar='TEXTE',
+        default=None,
+        help="Sélectionner les messages contenant ce texte, recherche Telegram (remplace SELECT_SEARCH)"
+    )
+    
+    parser.add_argument(
+        '--takeout',
+        action='store_true',
+        help="Lire l'historique via une session takeout (limites d'export), repli sur la session normale (remplace USE_TAKEOUT)"
+    )
+    
+    parser.add_argument(
+        '--lanes',
+        choices=['unordered', 'window'],
+        default=None,
+        help="Envoyer via des voies prioritaires texte/gros médias (remplace SCHEDULER_MODE)"
+    )
+    
+    parser.add_argument(
+        '--reorder-window',
+        type=int,
+        default=None,
+        help="Décalage maximal de publication en mode --lanes window (remplace REORDER_WINDOW)"
+    )
+    
+    parser.add_argument(
+        '--upload-limit',
+        metavar='OCTETS',
+        type=float,
+        default=None,
+        help="Débit maximal d'envoi des médias en octets/s, tous clients confondus (remplace UPLOAD_RATE_LIMIT). "
+             "Ne s'applique qu'aux médias envoyés depuis un fichier local, pas à ceux renvoyés par référence"
+    )
+    
+    parser.add_argument(
+        '--memory-budget',
+        metavar='MO',
+        type=int,
+        default=None,
+        help="Budget de mémoire résidente en Mo : récupération par tranches au-delà (remplace MEMORY_BUDGET_MB)"
+    )
+    
+    parser.add_argument(
+        '--trace-memory',
+        metavar='SECONDES',
+        type=float,
+        default=None,
+        help="Échantillonner les allocations (tracemalloc) à cet intervalle (remplace MEMORY_TRACE_INTERVAL)"
+    )
+    
+    parser.add_argument(
+        '--transform',
+        metavar='LISTE',
+        default=None,
+        help="Transformations d'images avant envoi, séparées par des virgules: strip_exif, watermark, downscale "
+             "(remplace MEDIA_TRANSFORMS)"
+    )
+    
+    parser.add_argument(
+        '--rules',
+        default=None,
+        help='Fichier JSON de règles de filtrage et de réécriture (remplace RULES_FILE)'
+    )
+    
+    parser.add_argument(
+        '--control-socket',
+        metavar='CHEMIN',
+        default=None,
+        help='Socket Unix pour régler les paramètres à chaud (remplace CONTROL_SOCKET)'
+    )
+    
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Valider la configuration et les identifiants de canaux sans connexion, puis quitter'
+    )
+    
     return parser.parse_args()
 
 
-async def main():
+def apply_cli_overrides(config, args):
+    """Remplace la config avec les arguments de ligne de commande si fournis."""
+    if args.delay is not None:
+        config.rate_limit_delay = args.delay
+    if args.batch_size is not None:
+        config.batch_size = args.batch_size
+    if hasattr(args, 'use_bot') and args.use_bot:
+        config.use_bot_for_sending = True
+    if args.dedup:
+        config.dedup_enabled = True
+    if args.coalesce:
+        config.coalesce_enabled = True
+    if args.rules:
+        config.rules_file = args.rules
+    if args.transform is not None:
+        config.media_transforms = [name.strip() for name in args.transform.split(',') if name.strip()]
+    if args.upload_limit is not None:
+        config.upload_rate_limit = args.upload_limit
+    if args.lanes:
+        config.scheduler_mode = args.lanes
+    if args.reorder_window is not None:
+        config.reorder_window = args.reorder_window
+    if args.memory_budget is not None:
+        config.memory_budget = args.memory_budget * 1024 * 1024
+    if args.trace_memory is not None:
+        config.memory_trace_interval = args.trace_memory
+    if args.control_socket:
+        config.control_socket = args.control_socket
+    if args.coordinator:
+        config.coordinator_db = args.coordinator
+    if args.ordered:
+        config.coordinator_mode = 'ordered'
+    if args.since:
+        config.select_since = args.since
+    if args.until:
+        config.select_until = args.until
+    if args.min_id is not None:
+        config.select_min_id = args.min_id
+    if args.max_id is not None:
+        config.select_max_id = args.max_id
+    if args.only is not None:
+        from selection import parse_types
+        config.select_only = parse_types(args.only)
+    if args.search:
+        config.select_search = args.search
+    if args.takeout:
+        config.use_takeout = True
+    if args.senders is not None:
+        config.sender_sessions = [name.strip() for name in args.senders.split(',') if name.strip()]
+
+
+def run_check(args) -> int:
+    """
+    Valide la configuration et les identifiants de canaux sans accès réseau.
+    
+    Returns:
+        Code de sortie (0 si tout est valide)
+    """
+    from config import Config
+    from utils import parse_channel_identifier
+    
+    config = Config()
+    apply_cli_overrides(config, args)
+    
+    valid = config.validate()
+    
+    sources = args.source.split(',') if args.source else []
+    targets = args.target.split(',') if args.target else []
+    for label, identifier in (
+        [('Source', source.strip()) for source in sources] + [('Cible', target.strip()) for target in targets]
+    ):
+        if not identifier:
+            continue
+        parsed = parse_channel_identifier(identifier)
+        if parsed is None:
+            print(f"❌ {label} invalide : {identifier}")
+            valid = False
+        else:
+            print(f"✅ {label} : {parsed}")
+    
+    if config.rules_file:
+        from rules import RuleEngine
+        try:
+            engine = RuleEngine.from_file(config.rules_file)
+            print(f"✅ Règles : {len(engine.rules)} règles, {len(engine.substitution_names)} substitutions")
+        except ValueError as e:
+            print(f"❌ Règles invalides : {e}")
+            valid = False
+    
+    print("✅ Configuration valide" if valid else "❌ Configuration invalide")
+    return 0 if valid else 1
+
+
+async def main(args=None):
     """Point d'entrée principal de l'application."""
-    args = parse_arguments()
+    args = args or parse_arguments()
+    
+    from config import Config
+    from logger_setup import setup_logger
     
     try:
+        if args.export and not args.source:
+            print("❌ --export nécessite --source")
+            return 1
+        
+        if args.reconcile and (not args.source or not args.target):
+            print("❌ --reconcile nécessite --source et --target")
+            return 1
+        
+        if args.retry_failed and (not args.source or not args.target or args.from_archive):
+            print("❌ --retry-failed nécessite --source et --target (sans --from-archive)")
+            return 1
+        
+        if args.senders and (not args.source or not args.target or args.from_archive):
+            print("❌ --senders nécessite --source et --target (sans --from-archive)")
+            return 1
+        
+        if args.coordinator and (not args.source or not args.target or args.from_archive):
+            print("❌ --coordinator nécessite --source et --target (sans --from-archive)")
+            return 1
+        
+        fan_out = bool(args.target) and ',' in args.target
+        if fan_out and (args.reconcile or args.retry_failed or args.senders or args.coordinator or args.dry_run):
+            print("❌ Plusieurs cibles : incompatible avec --reconcile, --retry-failed, --senders, --coordinator et --dry-run")
+            return 1
+        
+        fan_in = bool(args.source) and ',' in args.source
+        if fan_in and (fan_out or args.from_archive or args.export or args.reconcile or args.retry_failed
+                       or args.senders or args.coordinator or args.dry_run):
+            print("❌ Plusieurs sources : une seule cible, sans --from-archive, --export, --reconcile, "
+                  "--retry-failed, --senders, --coordinator ni --dry-run")
+            return 1
+        
+        if args.from_archive and not args.target:
+            print("❌ --from-archive nécessite --target")
+            return 1
+        
+        # Sans --source, la clé de progression est dérivée du nom de l'archive
+        if args.from_archive and not args.source:
+            args.source = f"archive_{os.path.basename(os.path.normpath(args.from_archive))}"
+        
         # Si aucun argument source/target, lancer le mode interactif
-        if not args.source or not args.target:
+        if not args.export and (not args.source or not args.target):
             result = interactive_mode()
             if not result or result[0] is None or result[1] is None:
                 return 0
@@ -268,43 +595,213 @@ async def main():
         config = Config()
         
         # Remplacer la config avec les arguments de ligne de commande si fournis
-        if args.delay is not None:
-            config.rate_limit_delay = args.delay
-        if args.batch_size is not None:
-            config.batch_size = args.batch_size
-        if hasattr(args, 'use_bot') and args.use_bot:
-            config.use_bot_for_sending = True
+        apply_cli_overrides(config, args)
             
         # Validation de la configuration
         if not config.validate():
             logger.error("Échec de validation de la configuration. Veuillez vérifier votre fichier .env.")
             return 1
             
-        # Initialisation du clonage Telegram
+        # Initialisation du clonage Telegram (charge Telethon)
+        from telegram_cloner import TelegramCloner
+        from sharding import ShardLauncher
         cloner = TelegramCloner(config, logger)
         
+        # Démarrage du processus de clonage
+        start_time = datetime.now()
+        
+        if args.export:
+            logger.info("Démarrage de l'Export de Chaîne Telegram")
+            logger.info(f"Chaîne Source: {args.source}")
+            logger.info(f"Archive: {args.export}")
+            logger.info(f"Limite de Messages: {args.limit or 'Aucune limite'}")
+            
+            success = await cloner.export_channel(
+                source_channel=args.source,
+                archive_path=args.export,
+                message_limit=args.limit
+            )
+            
+            duration = datetime.now() - start_time
+            if success:
+                logger.info(f"Export terminé avec succès en {duration}")
+                print("\n🎉 Export terminé avec succès !")
+                return 0
+            logger.error(f"Échec de l'export après {duration}")
+            print("\n❌ Échec de l'export ! Consultez les logs pour plus de détails.")
+            return 1
+        
+        if args.retry_failed:
+            logger.info("Renvoi des Messages en Échec")
+            logger.info(f"Chaîne Source: {args.source}")
+            logger.info(f"Chaîne Cible: {args.target}")
+            
+            success = await cloner.retry_failed(
+                source_channel=args.source,
+                target_channel=args.target
+            )
+            
+            duration = datetime.now() - start_time
+            if success:
+                logger.info(f"Renvoi terminé avec succès en {duration}")
+                print("\n🎉 Tous les messages en échec ont été renvoyés !")
+                return 0
+            logger.warning(f"Renvoi incomplet après {duration}")
+            print("\n⚠️  Certains messages sont toujours en échec. Consultez les logs pour plus de détails.")
+            return 1
+        
+        if args.reconcile:
+            logger.info("Démarrage de la Réconciliation")
+            logger.info(f"Chaîne Source: {args.source}")
+            logger.info(f"Chaîne Cible: {args.target}")
+            
+            success = await cloner.reconcile_channel(
+                source_channel=args.source,
+                target_channel=args.target,
+                dry_run=args.dry_run,
+                output_file=args.reconcile_output
+            )
+            
+            duration = datetime.now() - start_time
+            if success:
+                logger.info(f"Réconciliation terminée en {duration} : cible complète")
+                print("\n🎉 Cible complète !")
+                return 0
+            logger.warning(f"Réconciliation terminée en {duration} : cible incomplète")
+            print("\n⚠️  Cible incomplète ! Consultez les logs pour plus de détails.")
+            return 1
+        
+        if fan_in:
+            sources = [source.strip() for source in args.source.split(',') if source.strip()]
+            logger.info(f"Démarrage de la Fusion de {len(sources)} sources")
+            logger.info(f"Chaînes Sources: {', '.join(sources)}")
+            logger.info(f"Chaîne Cible: {args.target}")
+            logger.info(f"Limite de Messages: {args.limit or 'Aucune limite'}")
+            logger.info(f"Mode Reprise: {'Activé' if args.resume else 'Désactivé'}")
+            
+            success = await cloner.merge_channels(
+                source_channels=sources,
+                target_channel=args.target,
+                message_limit=args.limit,
+                resume=args.resume
+            )
+            
+            duration = datetime.now() - start_time
+            if cloner.shutdown_requested:
+                logger.warning(f"Fusion interrompue proprement après {duration}")
+                print("\n⏸️  Fusion interrompue proprement. Relancez avec --resume pour continuer.")
+                return 143
+            if success:
+                logger.info(f"Fusion terminée avec succès en {duration}")
+                print("\n🎉 Fusion terminée avec succès !")
+                return 0
+            logger.error(f"Échec de la fusion après {duration}")
+            print("\n❌ Échec de la fusion ! Consultez les logs pour plus de détails.")
+            return 1
+        
+        if fan_out:
+            targets = [target.strip() for target in args.target.split(',') if target.strip()]
+            logger.info(f"Démarrage de la Diffusion vers {len(targets)} cibles")
+            logger.info(f"Chaîne Source: {args.from_archive or args.source}")
+            logger.info(f"Chaînes Cibles: {', '.join(targets)}")
+            logger.info(f"Limite de Messages: {args.limit or 'Aucune limite'}")
+            logger.info(f"Mode Reprise: {'Activé' if args.resume else 'Désactivé'}")
+            
+            success = await cloner.fan_out_channel(
+                source_channel=args.source,
+                target_channels=targets,
+                message_limit=args.limit,
+                resume=args.resume,
+                from_archive=args.from_archive
+            )
+            
+            duration = datetime.now() - start_time
+            if cloner.shutdown_requested:
+                logger.warning(f"Diffusion interrompue proprement après {duration}")
+                print("\n⏸️  Diffusion interrompue proprement. Relancez avec --resume pour continuer.")
+                return 143
+            if success:
+                logger.info(f"Diffusion terminée avec succès en {duration}")
+                print("\n🎉 Diffusion terminée avec succès !")
+                return 0
+            logger.error(f"Échec de la diffusion après {duration}")
+            print("\n❌ Échec de la diffusion ! Consultez les logs pour plus de détails.")
+            return 1
+        
+        if config.sender_sessions and not config.coordinator_db:
+            logger.info(f"Démarrage du Clonage Multi-Processus ({len(config.sender_sessions)} comptes d'envoi)")
+            logger.info(f"Chaîne Source: {args.source}")
+            logger.info(f"Chaîne Cible: {args.target}")
+            
+            launcher = ShardLauncher(
+                config, logger, config.sender_sessions, cloner._make_progress_key(args.source, args.target)
+            )
+            success = await launcher.run(args.source, args.target)
+            
+            duration = datetime.now() - start_time
+            if launcher.stopping:
+                logger.warning(f"Clonage multi-processus interrompu proprement après {duration}")
+                print("\n⏸️  Clonage interrompu proprement. Relancez la même commande pour continuer.")
+                return 143
+            if success:
+                logger.info(f"Clonage multi-processus terminé avec succès en {duration}")
+                print("\n🎉 Clonage terminé avec succès !")
+                return 0
+            logger.warning(f"Clonage multi-processus incomplet après {duration}")
+            print("\n⚠️  Des tranches restent à traiter. Consultez les logs pour plus de détails.")
+            return 1
+        
+        if config.coordinator_db:
+            logger.info(f"Démarrage du Worker {config.worker_id} ({config.coordinator_mode})")
+            logger.info(f"Chaîne Source: {args.source}")
+            logger.info(f"Chaîne Cible: {args.target}")
+            logger.info(f"Coordinateur: {config.coordinator_db}")
+            
+            success = await cloner.run_worker(
+                source_channel=args.source,
+                target_channel=args.target
+            )
+            
+            duration = datetime.now() - start_time
+            if cloner.shutdown_requested:
+                logger.warning(f"Worker arrêté proprement après {duration}")
+                print("\n⏸️  Worker arrêté proprement. Sa tranche en cours sera reprise par un autre worker.")
+                return 143
+            if success:
+                logger.info(f"Clonage réparti terminé en {duration}")
+                print("\n🎉 Toutes les tranches ont été envoyées !")
+                return 0
+            logger.warning(f"Worker terminé après {duration}, tranches restantes")
+            print("\n⚠️  Des tranches restent à traiter. Consultez les logs pour plus de détails.")
+            return 1
+        
         logger.info("Démarrage du Clonage de Chaînes Telegram")
         logger.info(f"Chaîne Source: {args.source}")
         logger.info(f"Chaîne Cible: {args.target}")
+        if args.from_archive:
+            logger.info(f"Archive Source: {args.from_archive}")
         logger.info(f"Limite de Messages: {args.limit or 'Aucune limite'}")
         logger.info(f"Mode Reprise: {'Activé' if args.resume else 'Désactivé'}")
         logger.info(f"Mode Test: {'Activé' if args.dry_run else 'Désactivé'}")
         logger.info(f"Mode Bot: {'Activé' if config.use_bot_for_sending else 'Désactivé'}")
         
-        # Démarrage du processus de clonage
-        start_time = datetime.now()
-        
         success = await cloner.clone_channel(
             source_channel=args.source,
             target_channel=args.target,
             message_limit=args.limit,
             resume=args.resume,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            from_archive=args.from_archive
         )
         
         end_time = datetime.now()
         duration = end_time - start_time
         
+        if cloner.shutdown_requested:
+            logger.warning(f"Clonage interrompu proprement après {duration}")
+            print("\n⏸️  Clonage interrompu proprement. Relancez avec --resume pour continuer.")
+            return 143
+        
         if success:
             logger.info(f"Clonage terminé avec succès en {duration}")
             print("\n🎉 Clonage terminé avec succès !")
@@ -323,8 +820,13 @@ async def main():
 
 
 if __name__ == '__main__':
+    arguments = parse_arguments()
+    if arguments.check:
+        sys.exit(run_check(arguments))
+    
+    import asyncio
     try:
-        exit_code = asyncio.run(main())
+        exit_code = asyncio.run(main(arguments))
         sys.exit(exit_code)
     except KeyboardInterrupt:
         print("\nOpération annulée par l'utilisateur")
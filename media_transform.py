@@ -0,0 +1,193 @@
+"""
+Transformation des médias pour le Clonage de Chaînes Telegram
+Applique des transformations coûteuses en CPU (suppression EXIF, filigrane,
+réduction) dans un pool de processus, pour ne jamais bloquer la boucle
+asyncio qui envoie les messages. Les médias circulent par chemin de fichier.
+
+Pillow est optionnel : il n'est requis que si MEDIA_TRANSFORMS est configuré.
+"""
+
+import asyncio
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from utils import get_message_type
+
+
+# Types de messages auxquels les transformations d'image s'appliquent
+IMAGE_TYPES = ('photo', 'image')
+
+
+def _open_image(path: str):
+    from PIL import Image
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def _save_image(image, source_format: Optional[str], output_path: str):
+    image_format = source_format or 'JPEG'
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    image.save(output_path, format=image_format)
+
+
+def strip_exif(input_path: str, output_path: str, options: Dict[str, Any]):
+    """Réécrit l'image sans ses métadonnées (EXIF, GPS, profil de l'appareil)."""
+    from PIL import Image
+    image = _open_image(input_path)
+    clean = Image.new(image.mode, image.size)
+    clean.paste(image)
+    _save_image(clean, image.format, output_path)
+
+
+def watermark(input_path: str, output_path: str, options: Dict[str, Any]):
+    """Incruste le texte de filigrane en bas à droite de l'image."""
+    from PIL import Image, ImageDraw
+    image = _open_image(input_path)
+    source_format = image.format
+    text = options.get('watermark_text') or ''
+    if text:
+        base = image.convert('RGBA')
+        overlay = Image.new('RGBA', base.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        left, top, right, bottom = draw.textbbox((0, 0), text)
+        margin = max(4, min(base.size) // 50)
+        position = (base.size[0] - (right - left) - margin, base.size[1] - (bottom - top) - margin)
+        draw.text(position, text, fill=(255, 255, 255, 160))
+        image = Image.alpha_composite(base, overlay)
+    _save_image(image, source_format, output_path)
+
+
+def downscale(input_path: str, output_path: str, options: Dict[str, Any]):
+    """Réduit l'image pour que son plus grand côté ne dépasse pas max_dimension."""
+    image = _open_image(input_path)
+    source_format = image.format
+    max_dimension = options.get('max_dimension') or 1280
+    image.thumbnail((max_dimension, max_dimension))
+    _save_image(image, source_format, output_path)
+
+
+TRANSFORMS = {
+    'strip_exif': strip_exif,
+    'watermark': watermark,
+    'downscale': downscale,
+}
+
+
+def run_transform(name: str, input_path: str, output_path: str, options: Dict[str, Any]) -> float:
+    """
+    Exécute une transformation dans un processus du pool.
+
+    Returns:
+        CPU time spent in the worker, in seconds
+    """
+    start = time.process_time()
+    TRANSFORMS[name](input_path, output_path, options)
+    return time.process_time() - start
+
+
+def pillow_available() -> bool:
+    return importlib.util.find_spec('PIL') is not None
+
+
+class MediaTransformStage:
+    """Étape de transformation des médias entre téléchargement et envoi."""
+
+    def __init__(self, transforms: List[str], options: Dict[str, Any], workers: int = 0):
+        """
+        Initialize the transform stage.
+
+        Args:
+            transforms: Transform names applied in order (see TRANSFORMS)
+            options: Options passed to every transform (watermark_text, max_dimension)
+            workers: Worker processes (0 for one per core)
+
+        Raises:
+            ValueError: If a transform is unknown or Pillow is missing
+        """
+        unknown = [name for name in transforms if name not in TRANSFORMS]
+        if unknown:
+            raise ValueError(f"Transformation(s) inconnue(s): {', '.join(unknown)} "
+                             f"(disponibles: {', '.join(TRANSFORMS)})")
+        if transforms and not pillow_available():
+            raise ValueError("Pillow est requis pour transformer les médias (pip install Pillow)")
+        self.transforms = transforms
+        self.options = options
+        self.workers = workers or os.cpu_count() or 1
+        self.temp_dir: Optional[str] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._counter = 0
+        self.stats: Dict[str, Dict[str, float]] = {
+            name: {'count': 0, 'cpu_time': 0.0, 'wall_time': 0.0, 'max_wall': 0.0} for name in transforms
+        }
+
+    def applies_to(self, message) -> bool:
+        """Vrai si le média du message doit passer par les transformations."""
+        if not self.transforms or not getattr(message, 'media', None):
+            return False
+        media_type = getattr(message, 'type', None) or get_message_type(message)
+        return media_type in IMAGE_TYPES
+
+    def start(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='transform_')
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+    def new_path(self, extension: str = '') -> str:
+        """Chemin de fichier temporaire unique dans le dossier de l'étape."""
+        self._counter += 1
+        return os.path.join(self.temp_dir, f"{self._counter}{extension}")
+
+    async def transform(self, path: str) -> str:
+        """
+        Applique les transformations dans le pool de processus.
+
+        Args:
+            path: Input file (left untouched)
+
+        Returns:
+            Path of the transformed file, inside the stage temp directory
+        """
+        loop = asyncio.get_running_loop()
+        extension = os.path.splitext(path)[1]
+        current = path
+        for name in self.transforms:
+            output = self.new_path(extension)
+            start = time.monotonic()
+            cpu_time = await loop.run_in_executor(
+                self._executor, run_transform, name, current, output, self.options
+            )
+            wall_time = time.monotonic() - start
+            stats = self.stats[name]
+            stats['count'] += 1
+            stats['cpu_time'] += cpu_time
+            stats['wall_time'] += wall_time
+            stats['max_wall'] = max(stats['max_wall'], wall_time)
+            if current != path:
+                os.remove(current)
+            current = output
+        return current
+
+    def log_stats(self, logger):
+        """Journalise le temps passé par transformation."""
+        for name, stats in self.stats.items():
+            if not stats['count']:
+                continue
+            count = int(stats['count'])
+            logger.info(
+                f"Transform '{name}': {count} media, CPU {stats['cpu_time'] / count * 1000:.1f} ms/media, "
+                f"wall {stats['wall_time'] / count * 1000:.1f} ms/media (max {stats['max_wall'] * 1000:.0f} ms)"
+            )
@@ -0,0 +1,149 @@
+"""
+Suivi de la mémoire pour le Clonage de Chaînes Telegram
+Mesure la mémoire résidente face à un budget et, en mode instrumentation,
+échantillonne tracemalloc pour journaliser les principaux sites d'allocation
+et leur croissance entre deux échantillons.
+"""
+
+import asyncio
+import os
+import tracemalloc
+from typing import List, Optional
+
+from utils import format_file_size
+
+
+def rss_bytes() -> int:
+    """Mémoire résidente actuelle du processus en octets (0 si indisponible)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Pic et non valeur courante hors Linux : borne haute, suffisante pour un budget
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError, OSError):
+        return 0
+
+
+class MemoryMonitor:
+    """Budget mémoire et échantillonnage périodique de tracemalloc."""
+
+    # Allocations internes du traçage lui-même, exclues des rapports
+    _IGNORED = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    )
+
+    def __init__(self, logger, budget: int = 0, trace_interval: float = 0, top: int = 10):
+        """
+        Initialize the memory monitor.
+
+        Args:
+            logger: Logger instance
+            budget: Resident memory budget in bytes (0 to disable backpressure)
+            trace_interval: Seconds between tracemalloc samples (0 to disable tracing)
+            top: Number of allocation sites reported per sample
+        """
+        self.logger = logger
+        self.budget = budget
+        self.trace_interval = trace_interval
+        self.top = top
+        self.peak_rss = 0
+        self.pressure_events = 0
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._task: Optional[asyncio.Task] = None
+        self._started_tracing = False
+
+    @property
+    def tracing(self) -> bool:
+        return self.trace_interval > 0
+
+    def usage(self) -> int:
+        """Mémoire résidente actuelle, en mettant à jour le pic observé."""
+        current = rss_bytes()
+        self.peak_rss = max(self.peak_rss, current)
+        return current
+
+    def over_budget(self) -> bool:
+        """Vrai si un budget est fixé et dépassé."""
+        if not self.budget:
+            return False
+        if self.usage() > self.budget:
+            self.pressure_events += 1
+            return True
+        return False
+
+    def start(self):
+        """Démarre tracemalloc et l'échantillonnage périodique si l'instrumentation est active."""
+        if not self.tracing:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._baseline = self._previous = self._snapshot()
+        self._task = asyncio.get_running_loop().create_task(self._sample_loop())
+        self.logger.info(f"Traçage mémoire actif (échantillon toutes les {self.trace_interval:.0f}s)")
+
+    async def stop(self):
+        """Arrête l'échantillonnage et journalise la croissance depuis le début."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._baseline is not None:
+            self._report(self._snapshot(), self._baseline, "depuis le début")
+            self._baseline = self._previous = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._IGNORED)
+
+    async def _sample_loop(self):
+        while True:
+            await asyncio.sleep(self.trace_interval)
+            self.sample()
+
+    def sample(self) -> List[tracemalloc.StatisticDiff]:
+        """Prend un échantillon et journalise les sites d'allocation qui ont le plus grossi."""
+        snapshot = self._snapshot()
+        stats = self._report(snapshot, self._previous, "depuis l'échantillon précédent")
+        self._previous = snapshot
+        return stats
+
+    def _report(self, snapshot, reference, label: str) -> List[tracemalloc.StatisticDiff]:
+        stats = snapshot.compare_to(reference, 'lineno')[:self.top]
+        traced, peak = tracemalloc.get_traced_memory()
+        self.logger.info(
+            f"Mémoire: RSS {format_file_size(self.usage())}, tracée {format_file_size(traced)} "
+            f"(pic {format_file_size(peak)}) - principaux sites {label}:"
+        )
+        for stat in stats:
+            frame = stat.traceback[0]
+            self.logger.info(
+                f"  {frame.filename}:{frame.lineno}: {format_file_size(stat.size)} "
+                f"({'+' if stat.size_diff >= 0 else '-'}{format_file_size(abs(stat.size_diff))}, "
+                f"{stat.count} blocs)"
+            )
+        return stats
+
+    def log_stats(self):
+        """Journalise le pic de mémoire et les épisodes de pression."""
+        if not self.budget and not self.tracing:
+            return
+        budget = format_file_size(self.budget) if self.budget else "none"
+        self.logger.info(
+            f"Memory: peak RSS {format_file_size(self.peak_rss)}, budget {budget}, "
+            f"pressure events {self.pressure_events}"
+        )
@@ -0,0 +1,36 @@
+"""
+Outils partagés par les tests du Clonage de Chaînes Telegram
+"""
+
+import os
+from typing import Optional
+
+from config import Config
+
+
+def config_de_test(tmp_dir: Optional[str] = None, **overrides) -> Config:
+    """
+    Configuration d'un cloneur sous test : envoi par la session utilisateur,
+    sans délai, sans ordonnanceur, sans regroupement ni journal de progression.
+
+    Args:
+        tmp_dir: Directory receiving the progress file (None keeps PROGRESS_FILE)
+        **overrides: Config attributes to set on top of the test defaults
+
+    Returns:
+        Configuration object
+    """
+    config = Config()
+    config.use_bot_for_sending = False
+    config.download_media = True
+    config.rate_limit_delay = 0
+    config.scheduler_mode = 'off'
+    config.coalesce_enabled = False
+    config.progress_log_interval = 0
+    if tmp_dir:
+        config.progress_file = os.path.join(tmp_dir, 'progression.json')
+    for name, value in overrides.items():
+        if not hasattr(config, name):
+            raise AttributeError(f"Option de configuration inconnue : {name}")
+        setattr(config, name, value)
+    return config
@@ -0,0 +1,271 @@
+"""
+Réconciliation source/cible pour le Clonage de Chaînes Telegram
+Aligne les deux historiques par empreinte de contenu pour retrouver les
+messages absents de la cible, en lisant les deux flux au fil de l'eau avec
+une mémoire bornée par la fenêtre d'alignement.
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from utils import get_message_type, get_message_size
+
+
+SOURCE = 'source'
+TARGET = 'target'
+
+# Balises HTML et marqueurs Markdown : l'envoi peut les interpréter et les retirer du texte
+_MARKUP = re.compile(r'</?[a-zA-Z][^>]*>|[*_~`|]+')
+_WHITESPACE = re.compile(r'\s+')
+
+# Les photos sont recompressées par Telegram à l'envoi : leur taille n'est pas comparable
+_SIZED_TYPES = {'video', 'audio', 'image', 'document'}
+
+# Profondeur de la fenêtre cible, en multiples de la fenêtre source (8 octets par empreinte)
+TARGET_LOOKAHEAD = 8
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalise un texte pour la comparaison (Unicode, balisage, espaces, casse)."""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKC', text)
+    text = _MARKUP.sub('', text)
+    return _WHITESPACE.sub(' ', text).strip().casefold()
+
+
+def message_fingerprint(message) -> Optional[bytes]:
+    """
+    Empreinte d'un message : texte normalisé, type et taille du média.
+
+    Returns:
+        8-byte digest, or None for messages the cloner never sends
+        (service messages, empty messages)
+    """
+    media = getattr(message, 'media', None)
+    if media is not None and type(media).__name__ == 'MessageMediaWebPage':
+        media = None  # Aperçu de lien : généré par Telegram côté cible aussi
+
+    text = normalize_text(getattr(message, 'message', None))
+    if media is None:
+        if not text:
+            return None
+        kind, size = 'text', 0
+    else:
+        kind = get_message_type(message)
+        size = get_message_size(message) if kind in _SIZED_TYPES else 0
+
+    return hashlib.blake2b(f"{kind}\x00{size}\x00{text}".encode('utf-8'), digest_size=8).digest()
+
+
+def source_id_fingerprint(source_id: int) -> bytes:
+    """Empreinte d'un message source envoyé fusionné avec d'autres : son texte n'existe plus tel quel."""
+    return hashlib.blake2b(f"source\x00{source_id}".encode('utf-8'), digest_size=8).digest()
+
+
+class CoalescedSends:
+    """
+    Envois fusionnés (regroupement des rafales) : un message cible compte pour
+    chacun des messages source qu'il regroupe, appariés par ID.
+    """
+
+    def __init__(self, coalesced_map: Optional[Dict[str, List[int]]] = None):
+        """
+        Initialize the mapping.
+
+        Args:
+            coalesced_map: Target message ID (as saved in the progress file) to merged source IDs
+        """
+        self.sources = {int(sent_id): list(source_ids) for sent_id, source_ids in (coalesced_map or {}).items()}
+        self.merged = {source_id for source_ids in self.sources.values() for source_id in source_ids}
+
+    def source(self, message) -> Optional[bytes]:
+        if message.id in self.merged:
+            return source_id_fingerprint(message.id)
+        return message_fingerprint(message)
+
+    def target(self, message) -> List[bytes]:
+        source_ids = self.sources.get(message.id)
+        if source_ids:
+            return [source_id_fingerprint(source_id) for source_id in source_ids]
+        digest = message_fingerprint(message)
+        return [digest] if digest is not None else []
+
+
+class SequenceAligner:
+    """
+    Alignement incrémental de deux flux ordonnés.
+
+    Les têtes identiques sont appariées directement ; sur une divergence, les deux
+    tampons sont remplis (la cible, qui ne garde que des empreintes, sur une
+    fenêtre plus profonde) puis le point de resynchronisation le plus proche
+    (i + j minimal) est recherché. Les messages source sautés sont manquants, les
+    messages cible sautés sont en trop. Sans point de reprise, la fenêtre source
+    glisse d'un message à la fois : seule sa tête est déclarée manquante.
+    """
+
+    def __init__(self, window: int = 1000, lookahead: Optional[int] = None):
+        """
+        Initialize the aligner.
+
+        Args:
+            window: Maximum number of buffered source messages
+            lookahead: Maximum number of buffered target fingerprints (default TARGET_LOOKAHEAD windows)
+        """
+        self.window = max(1, window)
+        self.lookahead = max(self.window, lookahead or self.window * TARGET_LOOKAHEAD)
+        self._source: Deque[Tuple[bytes, Any]] = deque()
+        self._target: Deque[bytes] = deque()
+        # Positions des empreintes cible après une recherche infructueuse (cible inchangée depuis)
+        self._target_positions: Optional[Dict[bytes, int]] = None
+        self.source_open = True
+        self.target_open = True
+        self.matched = 0
+        self.missing = 0
+        self.extra = 0
+
+    def push_source(self, fingerprint: bytes, item: Any):
+        self._source.append((fingerprint, item))
+
+    def push_target(self, fingerprint: bytes):
+        self._target.append(fingerprint)
+        self._target_positions = None
+
+    def close(self, side: str):
+        """Signale la fin d'un flux."""
+        if side == SOURCE:
+            self.source_open = False
+        else:
+            self.target_open = False
+
+    def _drop_source(self, count: int, missing: List[Any]):
+        for _ in range(count):
+            missing.append(self._source.popleft()[1])
+        self.missing += count
+
+    def _drop_target(self, count: int):
+        for _ in range(count):
+            self._target.popleft()
+        self.extra += count
+        self._target_positions = None
+
+    def _find_sync(self) -> Optional[Tuple[int, int]]:
+        """Point de resynchronisation le plus proche des têtes, ou None."""
+        if self._target_positions is not None:
+            # Rien trouvé au dernier essai et cible inchangée : seul le dernier message source est nouveau
+            j = self._target_positions.get(self._source[-1][0])
+            return (len(self._source) - 1, j) if j is not None else None
+
+        first_position = {}
+        for i, (fingerprint, _) in enumerate(self._source):
+            first_position.setdefault(fingerprint, i)
+
+        best = None
+        for j, fingerprint in enumerate(self._target):
+            if best is not None and j >= best[0] + best[1]:
+                break
+            i = first_position.get(fingerprint)
+            if i is not None and (best is None or i + j < best[0] + best[1]):
+                best = (i, j)
+        return best
+
+    def advance(self) -> Tuple[List[Any], Optional[str]]:
+        """
+        Aligne autant que possible avec les messages en tampon.
+
+        Returns:
+            (missing source items, stream to feed next or None when done)
+        """
+        missing: List[Any] = []
+        source, target = self._source, self._target
+        while True:
+            if source and target and source[0][0] == target[0]:
+                source.popleft()
+                target.popleft()
+                self.matched += 1
+                self._target_positions = None
+                continue
+
+            if not source:
+                if self.source_open:
+                    return missing, SOURCE
+                # Source épuisée : le reste de la cible n'a pas d'équivalent
+                self._drop_target(len(target))
+                return missing, None
+
+            if not target:
+                if self.target_open:
+                    return missing, TARGET
+                self._drop_source(len(source), missing)
+                return missing, (SOURCE if self.source_open else None)
+
+            # Divergence : remplir les deux fenêtres avant de chercher où reprendre
+            if self.source_open and len(source) < self.window:
+                return missing, SOURCE
+            if self.target_open and len(target) < self.lookahead:
+                return missing, TARGET
+
+            sync = self._find_sync()
+            if sync is not None:
+                self._drop_source(sync[0], missing)
+                self._drop_target(sync[1])
+            elif self.source_open:
+                # La tête source n'a pas d'équivalent dans la fenêtre cible : on glisse d'un message
+                if self._target_positions is None:
+                    self._target_positions = {}
+                    for j, fingerprint in enumerate(target):
+                        self._target_positions.setdefault(fingerprint, j)
+                self._drop_source(1, missing)
+            else:
+                self._drop_target(len(target))
+
+
+async def iter_missing(
+    source_messages: AsyncIterable,
+    target_messages: AsyncIterable,
+    aligner: Optional[SequenceAligner] = None,
+    fingerprint: Callable[[Any], Optional[bytes]] = message_fingerprint,
+    target_fingerprints: Optional[Callable[[Any], List[bytes]]] = None
+) -> AsyncIterator[Any]:
+    """
+    Produit, dans l'ordre de la source, les messages absents de la cible.
+
+    Args:
+        source_messages: Source messages, oldest first
+        target_messages: Target messages, oldest first
+        aligner: Aligner holding the window and counters (created if None)
+        fingerprint: Message fingerprint function (None skips the message)
+        target_fingerprints: Fingerprints of a target message, several for a merged send
+            (default: fingerprint of the message)
+    """
+    aligner = aligner or SequenceAligner()
+    streams = {SOURCE: source_messages.__aiter__(), TARGET: target_messages.__aiter__()}
+
+    while True:
+        missing, side = aligner.advance()
+        for item in missing:
+            yield item
+        if side is None:
+            return
+
+        try:
+            message = await streams[side].__anext__()
+        except StopAsyncIteration:
+            aligner.close(side)
+            continue
+
+        if side == TARGET and target_fingerprints is not None:
+            for digest in target_fingerprints(message):
+                aligner.push_target(digest)
+            continue
+
+        digest = fingerprint(message)
+        if digest is None:
+            continue
+        if side == SOURCE:
+            aligner.push_source(digest, message)
+        else:
+            aligner.push_target(digest)
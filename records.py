@@ -0,0 +1,72 @@
+"""
+Enregistrements compacts des messages pour le Clonage de Chaînes Telegram
+Les objets Message de Telethon portent tout un graphe TL (expéditeur, chat,
+transfert, réponses...) et une référence au client. Ils sont convertis dès la
+récupération en MessageRecord : seuls les champs utiles à l'envoi sont gardés,
+dans des ``__slots__``, sans dictionnaire d'instance.
+"""
+
+from typing import Any, List, Optional
+
+from utils import get_message_size, get_message_type
+
+
+class MessageRecord:
+    """Message réduit aux champs consommés par le chemin d'envoi."""
+
+    __slots__ = ('id', 'date', 'message', 'entities', 'media', 'grouped_id', 'type', 'size')
+
+    def __init__(
+        self,
+        id: int,
+        date=None,
+        message: str = "",
+        entities: Optional[List[Any]] = None,
+        media: Any = None,
+        grouped_id: Optional[int] = None,
+        type: str = 'empty',
+        size: int = 0
+    ):
+        """
+        Build a record.
+
+        Args:
+            id: Source message ID
+            date: Publication date
+            message: Raw text (without markup)
+            entities: Formatting entities
+            media: Telegram media object (re-sent by reference) or local file path
+            grouped_id: Album ID
+            type: Message type (see utils.get_message_type)
+            size: Media size in bytes
+        """
+        self.id = id
+        self.date = date
+        self.message = message
+        self.entities = entities
+        self.media = media
+        self.grouped_id = grouped_id
+        self.type = type
+        self.size = size
+
+    @classmethod
+    def from_message(cls, message) -> 'MessageRecord':
+        """Construit l'enregistrement d'un message Telethon (le message peut ensuite être libéré)."""
+        # Les messages de service (épinglage, création...) n'ont ni texte, ni média, ni album
+        return cls(
+            message.id,
+            getattr(message, 'date', None),
+            getattr(message, 'message', None) or "",
+            getattr(message, 'entities', None) or None,
+            getattr(message, 'media', None),
+            getattr(message, 'grouped_id', None),
+            get_message_type(message),
+            get_message_size(message)
+        )
+
+    @property
+    def text(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"MessageRecord({self.id}, {self.type}, {self.size} B)"
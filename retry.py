@@ -0,0 +1,168 @@
+"""
+Politique de relance pour le Clonage de Chaînes Telegram
+Classe les erreurs d'envoi, calcule un délai exponentiel avec gigue et
+programme les relances sur une file temporisée au lieu d'attendre sur place.
+"""
+
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from logger_setup import (
+    classify_telegram_error, ERROR_FLOOD, ERROR_RETRYABLE, ERROR_FATAL_MESSAGE, ERROR_FATAL_JOB
+)
+
+
+# Décisions après un échec
+RETRY_SCHEDULED = 'scheduled'
+GIVE_UP = 'give_up'
+ABORT_JOB = 'abort_job'
+
+
+class JobAbortedError(Exception):
+    """Erreur rendant la suite du clonage inutile (droits d'écriture perdus, session révoquée...)."""
+
+    def __init__(self, error: Exception):
+        super().__init__(f"{type(error).__name__}: {error}")
+        self.error = error
+
+
+class RetryEngine:
+    """File temporisée des messages à relancer et état de pause anti-flood."""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 300.0,
+        jitter: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random
+    ):
+        """
+        Initialize the retry engine.
+
+        Args:
+            max_retries: Retries allowed per message for retryable errors
+            base_delay: Delay before the first retry, doubled at each attempt
+            max_delay: Upper bound of the backoff delay
+            jitter: Fraction of the delay drawn at random (0 for none, 1 for full jitter)
+            clock: Monotonic clock (injectable for tests)
+            rng: Random source in [0, 1) (injectable for tests)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng
+        self.paused_until = 0.0
+        self._queue: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+        self._attempts: Dict[int, int] = {}
+        self._in_flight: Dict[int, Any] = {}
+        self.stats: Dict[str, int] = {
+            ERROR_RETRYABLE: 0, ERROR_FLOOD: 0, ERROR_FATAL_MESSAGE: 0, ERROR_FATAL_JOB: 0,
+            'retries': 0, 'gave_up': 0,
+        }
+
+    def backoff(self, attempt: int) -> float:
+        """Délai avant la relance n° attempt (à partir de 1), gigue comprise."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * self.rng())
+
+    def attempts(self, message) -> int:
+        """Nombre d'échecs déjà enregistrés pour ce message."""
+        return self._attempts.get(message.id, 0)
+
+    def record_failure(self, message, error: Exception) -> str:
+        """
+        Enregistre un échec d'envoi et décide de la suite.
+
+        Returns:
+            RETRY_SCHEDULED, GIVE_UP or ABORT_JOB
+        """
+        self._in_flight.pop(message.id, None)
+        category = classify_telegram_error(error)
+        self.stats[category] += 1
+
+        if category == ERROR_FATAL_JOB:
+            return ABORT_JOB
+        if category == ERROR_FATAL_MESSAGE:
+            self._forget(message)
+            return GIVE_UP
+
+        if category == ERROR_FLOOD:
+            # La limite vaut pour tout le compte : pause globale, sans consommer de tentative
+            wait = getattr(error, 'seconds', None) or self.base_delay
+            self.paused_until = max(self.paused_until, self.clock() + wait)
+            self._push(self.paused_until, message)
+            return RETRY_SCHEDULED
+
+        attempt = self._attempts.get(message.id, 0) + 1
+        if attempt > self.max_retries:
+            self._forget(message)
+            self.stats['gave_up'] += 1
+            return GIVE_UP
+        self._attempts[message.id] = attempt
+        self._push(self.clock() + self.backoff(attempt), message)
+        return RETRY_SCHEDULED
+
+    def record_success(self, message):
+        self.release(message)
+
+    def release(self, message):
+        """Retire un message du suivi des relances."""
+        self._in_flight.pop(message.id, None)
+        self._forget(message)
+
+    def _forget(self, message):
+        self._attempts.pop(message.id, None)
+
+    def _push(self, due: float, message):
+        heapq.heappush(self._queue, (due, next(self._sequence), message))
+        self.stats['retries'] += 1
+
+    def pop_due(self) -> Optional[Any]:
+        """
+        Retire le prochain message dont la relance est échue (None s'il n'y en a pas).
+
+        Le message reste compté comme en attente jusqu'à record_success/record_failure.
+        """
+        if not self._queue or self._queue[0][0] > self.clock():
+            return None
+        message = heapq.heappop(self._queue)[2]
+        self._in_flight[message.id] = message
+        return message
+
+    def next_due_in(self) -> Optional[float]:
+        """Secondes avant la prochaine relance (None si la file est vide)."""
+        if not self._queue:
+            return None
+        return max(0.0, self._queue[0][0] - self.clock())
+
+    def pause_remaining(self) -> float:
+        """Secondes de pause anti-flood restantes."""
+        return max(0.0, self.paused_until - self.clock())
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def pending_min_id(self) -> Optional[int]:
+        """Plus petit ID source en attente ou en cours de relance (borne le point de reprise)."""
+        waiting = [message for _, _, message in self._queue] + list(self._in_flight.values())
+        ids = [(getattr(message, 'source_ids', None) or [message.id])[0] for message in waiting]
+        return min(ids) if ids else None
+
+    def log_stats(self, logger):
+        """Journalise les erreurs par catégorie et les relances."""
+        if not any(self.stats.values()):
+            return
+        logger.info(
+            f"Retries: {self.stats['retries']} scheduled, {self.stats['gave_up']} gave up "
+            f"(errors: {self.stats[ERROR_RETRYABLE]} retryable, {self.stats[ERROR_FLOOD]} flood, "
+            f"{self.stats[ERROR_FATAL_MESSAGE]} fatal per message, {self.stats[ERROR_FATAL_JOB]} fatal per job)"
+        )
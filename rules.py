@@ -0,0 +1,322 @@
+"""
+Moteur de règles pour le Clonage de Chaînes Telegram
+Filtre et réécrit les messages entre la récupération et l'envoi.
+
+Le fichier de règles est un JSON de la forme :
+
+    {
+        "rules": [
+            {"name": "sans_pub", "action": "exclude", "pattern": "promo|publicité", "ignore_case": true},
+            {"name": "pas_de_video", "action": "exclude", "types": ["video"]},
+            {"name": "recent", "action": "include", "since": "2024-01-01"},
+            {"name": "petits_fichiers", "action": "include", "max_size": 52428800}
+        ],
+        "substitutions": [
+            {"name": "liens", "pattern": "https?://\\\\S+", "replace": ""},
+            {"name": "handle", "pattern": "@ancien_canal", "replace": "@nouveau_canal"}
+        ]
+    }
+
+Une règle correspond si toutes ses conditions sont vraies. Un message est
+écarté si une règle « exclude » correspond, ou si des règles « include »
+existent et qu'aucune ne correspond. Les remplacements sont littéraux.
+
+Les motifs sont combinés dans une alternance unique (un groupe nommé par
+règle) : ils ne peuvent donc contenir ni groupe nommé ni référence arrière.
+"""
+
+import copy
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from coalesce import utf16_length
+from utils import load_json, get_message_type, get_message_size
+
+# Références arrière (\\1, (?P=nom)) : renumérotées ou ambiguës dans l'alternance combinée
+_BACKREFERENCE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=')
+
+
+def _compile_combinable(pattern: str, flags: int, label: str):
+    """Compile un motif destiné à l'alternance combinée, ValueError s'il ne s'y prête pas."""
+    try:
+        regex = re.compile(pattern, flags)
+    except re.error as e:
+        raise ValueError(f"Expression invalide pour {label}: {e}")
+    if regex.groupindex or _BACKREFERENCE.search(pattern):
+        raise ValueError(
+            f"Expression non combinable pour {label}: groupes nommés et références arrière interdits"
+        )
+    return regex
+
+
+class Rule:
+    """Règle d'inclusion ou d'exclusion compilée."""
+
+    def __init__(self, index: int, spec: Dict[str, Any]):
+        """
+        Initialize a rule from its JSON specification.
+
+        Args:
+            index: Position of the rule in the file
+            spec: Rule specification
+        """
+        self.name: str = spec.get('name') or f"regle_{index}"
+        self.group: str = f"r{index}"
+        self.action: str = spec.get('action', 'exclude')
+        if self.action not in ('include', 'exclude'):
+            raise ValueError(f"Action invalide pour la règle {self.name}: {self.action}")
+
+        self.pattern: Optional[str] = spec.get('pattern')
+        self.regex = None
+        if self.pattern:
+            flags = re.IGNORECASE if spec.get('ignore_case') else 0
+            self.regex = _compile_combinable(self.pattern, flags, f"la règle {self.name}")
+
+        self.types = set(spec.get('types') or [])
+        self.since = _parse_date(spec.get('since'))
+        self.until = _parse_date(spec.get('until'))
+        self.min_size: Optional[int] = spec.get('min_size')
+        self.max_size: Optional[int] = spec.get('max_size')
+
+    @property
+    def scoped_pattern(self) -> str:
+        """Motif avec ses options locales, combinable dans une alternance."""
+        if self.regex.flags & re.IGNORECASE:
+            return f"(?i:{self.pattern})"
+        return f"(?:{self.pattern})"
+
+    def matches_metadata(self, message_type: str, date, size: int) -> bool:
+        """Vérifie les conditions autres que le texte."""
+        if self.types and message_type not in self.types:
+            return False
+        if self.since and (date is None or _as_utc(date) < self.since):
+            return False
+        if self.until and (date is None or _as_utc(date) > self.until):
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        return True
+
+
+class RuleEngine:
+    """Moteur de filtrage et de réécriture compilé une seule fois au démarrage."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        """
+        Compile rules and substitutions.
+
+        Args:
+            spec: Parsed rule file
+        """
+        self.rules: List[Rule] = [Rule(i, r) for i, r in enumerate(spec.get('rules') or [])]
+        self.has_include = any(rule.action == 'include' for rule in self.rules)
+
+        # Tous les motifs de règles dans un seul automate, un groupe nommé par règle
+        pattern_rules = [rule for rule in self.rules if rule.regex is not None]
+        self._rules_by_group = {rule.group: rule for rule in pattern_rules}
+        try:
+            self._combined_rules = re.compile(
+                '|'.join(f"(?P<{rule.group}>{rule.scoped_pattern})" for rule in pattern_rules)
+            ) if pattern_rules else None
+        except re.error as e:
+            raise ValueError(f"Règles non combinables: {e}")
+
+        # Toutes les substitutions dans un seul automate également
+        self.substitution_names: Dict[str, str] = {}
+        self._replacements: Dict[str, str] = {}
+        parts = []
+        for i, sub in enumerate(spec.get('substitutions') or []):
+            group = f"s{i}"
+            name = sub.get('name') or f"substitution_{i}"
+            pattern = sub.get('pattern')
+            if not pattern:
+                raise ValueError(f"Motif manquant pour la substitution {name}")
+            _compile_combinable(pattern, 0, f"la substitution {name}")
+            scoped = f"(?i:{pattern})" if sub.get('ignore_case') else f"(?:{pattern})"
+            parts.append(f"(?P<{group}>{scoped})")
+            self.substitution_names[group] = name
+            self._replacements[group] = sub.get('replace', '')
+        try:
+            self._combined_substitutions = re.compile('|'.join(parts)) if parts else None
+        except re.error as e:
+            raise ValueError(f"Substitutions non combinables: {e}")
+
+        # Statistiques
+        self.rule_hits: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+        self.substitution_hits: Dict[str, int] = {name: 0 for name in self.substitution_names.values()}
+        self.messages_evaluated = 0
+        self.messages_excluded = 0
+        self.messages_rewritten = 0
+        self.evaluation_time = 0.0
+
+    @classmethod
+    def from_file(cls, filepath: str) -> 'RuleEngine':
+        """Charge et compile un fichier de règles JSON."""
+        spec = load_json(filepath)
+        if spec is None:
+            raise ValueError(f"Fichier de règles illisible: {filepath}")
+        return cls(spec)
+
+    def _matching_rules(self, text: str, message_type: str, date, size: int) -> List[Rule]:
+        """Retourne les règles qui correspondent au message."""
+        text_hits = set()
+        if self._combined_rules is not None and text:
+            for match in self._combined_rules.finditer(text):
+                text_hits.add(match.lastgroup)
+            if text_hits:
+                # finditer ne rend que des correspondances disjointes : sur un message touché, les règles masquées sont revérifiées une à une
+                for group, rule in self._rules_by_group.items():
+                    if group not in text_hits and rule.regex.search(text):
+                        text_hits.add(group)
+
+        matched = []
+        for rule in self.rules:
+            if rule.regex is not None and rule.group not in text_hits:
+                continue
+            if rule.matches_metadata(message_type, date, size):
+                matched.append(rule)
+        return matched
+
+    def _substitute(self, match) -> str:
+        group = match.lastgroup
+        self.substitution_hits[self.substitution_names[group]] += 1
+        return self._replacements[group]
+
+    def _rewrite(self, text: str) -> Tuple[str, List[Tuple[int, int, int]]]:
+        """
+        Applique les substitutions en relevant les segments remplacés.
+
+        Returns:
+            New text and (start, end, new length) of each replaced span, in UTF-16 units of the old text
+        """
+        parts = []
+        edits = []
+        last = 0
+        position = 0
+        for match in self._combined_substitutions.finditer(text):
+            replacement = self._substitute(match)
+            start = position + utf16_length(text[last:match.start()])
+            end = start + utf16_length(match.group())
+            parts.append(text[last:match.start()])
+            parts.append(replacement)
+            edits.append((start, end, utf16_length(replacement)))
+            last, position = match.end(), end
+        parts.append(text[last:])
+        return ''.join(parts), edits
+
+    def apply(self, message) -> bool:
+        """
+        Évalue les règles pour un message et réécrit son texte si nécessaire.
+
+        Args:
+            message: Message Telegram
+
+        Returns:
+            True si le message doit être envoyé, False s'il est écarté
+        """
+        start = time.perf_counter()
+        self.messages_evaluated += 1
+
+        text = getattr(message, 'message', '') or ''
+        matched = self._matching_rules(
+            text, get_message_type(message), getattr(message, 'date', None), get_message_size(message)
+        )
+        for rule in matched:
+            self.rule_hits[rule.name] += 1
+
+        keep = not any(rule.action == 'exclude' for rule in matched)
+        if keep and self.has_include:
+            keep = any(rule.action == 'include' for rule in matched)
+
+        if keep and text and self._combined_substitutions is not None:
+            new_text, edits = self._rewrite(text)
+            if new_text != text:
+                message.message = new_text
+                if getattr(message, 'entities', None):
+                    message.entities = shift_entities(message.entities, edits) or None
+                self.messages_rewritten += 1
+
+        if not keep:
+            self.messages_excluded += 1
+
+        self.evaluation_time += time.perf_counter() - start
+        return keep
+
+    def filter(self, messages: list) -> list:
+        """Applique les règles à une liste de messages et retourne ceux à envoyer."""
+        return [message for message in messages if self.apply(message)]
+
+    def log_stats(self, logger):
+        """Journalise les compteurs par règle et le coût d'évaluation."""
+        logger.info("=== Rule Engine ===")
+        logger.info(f"Messages Evaluated: {self.messages_evaluated}")
+        logger.info(f"Messages Excluded: {self.messages_excluded}")
+        logger.info(f"Messages Rewritten: {self.messages_rewritten}")
+        if self.messages_evaluated > 0:
+            per_message = self.evaluation_time / self.messages_evaluated * 1_000_000
+            logger.info(f"Evaluation Cost: {per_message:.1f} µs/message ({self.evaluation_time:.3f}s total)")
+        for name, hits in self.rule_hits.items():
+            logger.info(f"  Rule '{name}': {hits} hits")
+        for name, hits in self.substitution_hits.items():
+            logger.info(f"  Substitution '{name}': {hits} replacements")
+
+
+def shift_entities(entities: list, edits: List[Tuple[int, int, int]]) -> list:
+    """
+    Recale les entités de mise en forme sur un texte réécrit.
+
+    Une entité qui suit un segment remplacé est décalée, une entité qui le
+    contient entièrement change de longueur ; celle qui le chevauche en
+    partie est abandonnée.
+
+    Args:
+        entities: Message entities (offsets in UTF-16 units)
+        edits: (start, end, new length) of each replaced span, in UTF-16 units of the old text
+
+    Returns:
+        Shifted copies of the entities that still apply
+    """
+    shifted_entities = []
+    for entity in entities:
+        start = entity.offset
+        end = entity.offset + entity.length
+        shift = 0
+        length = entity.length
+        for edit_start, edit_end, new_length in edits:
+            delta = new_length - (edit_end - edit_start)
+            if edit_end <= start:
+                shift += delta
+            elif edit_start >= end:
+                break
+            elif start <= edit_start and edit_end <= end:
+                length += delta
+            else:
+                length = 0
+                break
+        if length > 0:
+            shifted = copy.copy(entity)
+            shifted.offset = start + shift
+            shifted.length = length
+            shifted_entities.append(shifted)
+    return shifted_entities
+
+
+def _parse_date(value) -> Optional[datetime]:
+    """Parse une date ISO 8601 (UTC si aucun fuseau n'est précisé)."""
+    if not value:
+        return None
+    try:
+        return _as_utc(datetime.fromisoformat(value))
+    except ValueError:
+        raise ValueError(f"Date invalide dans le fichier de règles: {value}")
+
+
+def _as_utc(date: datetime) -> datetime:
+    """Normalise une date en UTC."""
+    if date.tzinfo is None:
+        return date.replace(tzinfo=timezone.utc)
+    return date
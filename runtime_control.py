@@ -0,0 +1,220 @@
+"""
+Réglage à chaud pour le Clonage de Chaînes Telegram
+Modifie les paramètres de débit et de concurrence d'un clonage en cours,
+via SIGHUP (relecture du fichier .env) ou un socket de contrôle local.
+
+Protocole du socket (une commande par ligne) :
+
+    get                         valeurs courantes (JSON)
+    set rate_limit_delay 0.5    modifie un paramètre
+    reload                      relit le fichier .env
+"""
+
+import asyncio
+import json
+import os
+import signal
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Paramètre -> (variable d'environnement, type, valeur minimale, minimum exclu)
+TUNABLE_PARAMETERS: Dict[str, Tuple[str, type, float, bool]] = {
+    'rate_limit_delay': ('RATE_LIMIT_DELAY', float, 0, False),
+    'batch_size': ('BATCH_SIZE', int, 0, True),
+    'max_retries': ('MAX_RETRIES', int, 0, False),
+    'retry_delay': ('RETRY_DELAY', float, 0, False),
+    'upload_rate_limit': ('UPLOAD_RATE_LIMIT', float, 0, False),
+    'client_upload_rate_limit': ('CLIENT_UPLOAD_RATE_LIMIT', float, 0, False),
+    'download_rate_limit': ('DOWNLOAD_RATE_LIMIT', float, 0, False),
+}
+
+
+class RuntimeController:
+    """Applique les changements de paramètres sans interrompre les envois en cours."""
+
+    def __init__(
+        self,
+        config,
+        logger,
+        processed_count: Callable[[], int],
+        on_change: Optional[Callable[[str, object], None]] = None,
+        env_file: str = '.env',
+        socket_path: Optional[str] = None,
+        effect_window: float = 60.0
+    ):
+        """
+        Initialize the runtime controller.
+
+        Args:
+            config: Configuration object modified in place
+            logger: Logger instance
+            processed_count: Returns the number of messages processed so far
+            on_change: Callback invoked with (name, value) after each change
+            env_file: Environment file re-read on SIGHUP
+            socket_path: Unix socket path for the control interface (optional)
+            effect_window: Seconds after a change before its effect is logged
+        """
+        self.config = config
+        self.logger = logger
+        self.processed_count = processed_count
+        self.on_change = on_change
+        self.env_file = env_file
+        self.socket_path = socket_path
+        self.effect_window = effect_window
+        self._server = None
+        self._signal_registered = False
+        self._effect_tasks = set()
+        self._mark_time = time.monotonic()
+        self._mark_count = 0
+
+    def _throughput_since_mark(self) -> float:
+        elapsed = time.monotonic() - self._mark_time
+        if elapsed <= 0:
+            return 0.0
+        return (self.processed_count() - self._mark_count) / elapsed
+
+    def values(self) -> Dict[str, object]:
+        """Valeurs courantes des paramètres réglables."""
+        return {name: getattr(self.config, name) for name in TUNABLE_PARAMETERS}
+
+    def apply(self, name: str, raw_value) -> object:
+        """
+        Modifie un paramètre après validation.
+
+        Args:
+            name: Parameter name (see TUNABLE_PARAMETERS)
+            raw_value: New value (string or number)
+
+        Returns:
+            The converted value now in effect
+
+        Raises:
+            ValueError: If the parameter or value is invalid
+        """
+        if name not in TUNABLE_PARAMETERS:
+            raise ValueError(f"Paramètre non réglable: {name}")
+        _, kind, minimum, exclusive = TUNABLE_PARAMETERS[name]
+        try:
+            value = kind(raw_value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valeur invalide pour {name}: {raw_value}")
+        if value < minimum or (exclusive and value == minimum):
+            raise ValueError(f"Valeur hors limites pour {name}: {raw_value}")
+
+        old_value = getattr(self.config, name)
+        if value == old_value:
+            return value
+
+        throughput_before = self._throughput_since_mark()
+        setattr(self.config, name, value)
+        if self.on_change:
+            self.on_change(name, value)
+
+        self.logger.info(
+            f"Paramètre modifié à chaud: {name} {old_value} -> {value} "
+            f"(débit actuel: {throughput_before:.2f} messages/s)"
+        )
+        self._mark_time = time.monotonic()
+        self._mark_count = self.processed_count()
+        self._schedule_effect_report(name, value, throughput_before)
+        return value
+
+    def _schedule_effect_report(self, name: str, value, throughput_before: float):
+        """Journalise l'effet d'un changement sur le débit après une fenêtre d'observation."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        mark_time = self._mark_time
+
+        async def report():
+            await asyncio.sleep(self.effect_window)
+            if self._mark_time != mark_time:
+                return  # Un autre changement est intervenu entre-temps
+            self.logger.info(
+                f"Effet de {name}={value}: débit {throughput_before:.2f} -> "
+                f"{self._throughput_since_mark():.2f} messages/s"
+            )
+
+        task = loop.create_task(report())
+        self._effect_tasks.add(task)
+        task.add_done_callback(self._effect_tasks.discard)
+
+    def reload(self):
+        """Relit le fichier .env et applique les paramètres réglables qui ont changé."""
+        from dotenv import dotenv_values
+
+        if not os.path.exists(self.env_file):
+            self.logger.warning(f"Rechargement impossible: {self.env_file} introuvable")
+            return
+        values = dotenv_values(self.env_file)
+        self.logger.info(f"Rechargement de la configuration depuis {self.env_file}")
+        for name, (env_key, _, _, _) in TUNABLE_PARAMETERS.items():
+            if values.get(env_key) in (None, ''):
+                continue
+            try:
+                self.apply(name, values[env_key])
+            except ValueError as e:
+                self.logger.warning(str(e))
+
+    async def start(self):
+        """Installe le gestionnaire SIGHUP et ouvre le socket de contrôle si configuré."""
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, 'SIGHUP'):
+            try:
+                loop.add_signal_handler(signal.SIGHUP, self.reload)
+                self._signal_registered = True
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+            os.chmod(self.socket_path, 0o600)
+            self.logger.info(f"Socket de contrôle ouvert: {self.socket_path}")
+
+    async def stop(self):
+        """Retire le gestionnaire de signal et ferme le socket de contrôle."""
+        if self._signal_registered:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            self._signal_registered = False
+        for task in list(self._effect_tasks):
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def handle_command(self, line: str) -> str:
+        """Exécute une commande du socket de contrôle et retourne la réponse."""
+        parts = line.split()
+        if not parts:
+            return "error: commande vide"
+        command = parts[0].lower()
+        if command == 'get':
+            return json.dumps(self.values())
+        if command == 'reload':
+            self.reload()
+            return json.dumps(self.values())
+        if command == 'set' and len(parts) == 3:
+            try:
+                value = self.apply(parts[1], parts[2])
+            except ValueError as e:
+                return f"error: {e}"
+            return f"ok {parts[1]}={value}"
+        return "error: commandes disponibles: get, set <paramètre> <valeur>, reload"
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write((self.handle_command(line.decode('utf-8').strip()) + "\n").encode('utf-8'))
+                await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,168 @@
+"""
+Ordonnancement par voies prioritaires pour le Clonage de Chaînes Telegram
+Sépare les messages texte/petits médias des gros médias pour éviter qu'un
+seul envoi volumineux ne bloque tous les messages derrière lui.
+"""
+
+import asyncio
+import time
+from typing import Callable, Awaitable, Optional, Dict, List, Any
+
+
+SMALL_LANE = 'small'
+LARGE_LANE = 'large'
+
+
+class RateLimiter:
+    """Budget d'envoi partagé : intervalle minimal entre deux envois, toutes voies confondues."""
+
+    def __init__(self, interval: float):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            interval: Minimum delay in seconds between two sends
+        """
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Attend le prochain créneau d'envoi disponible."""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = time.monotonic()
+            self._next_slot = now + self.interval
+
+
+class ReorderWindow:
+    """Suivi des positions terminées et fenêtre de réordonnancement bornée."""
+
+    def __init__(self, window: Optional[int] = None):
+        """
+        Initialize the reorder window.
+
+        Args:
+            window: Maximum number of positions a message may be published ahead
+                of the oldest unfinished one (None for unordered mode)
+        """
+        self.window = window
+        self.prefix = 0
+        self._completed = set()
+        self._released = False
+        self._changed = asyncio.Condition()
+
+    async def wait_turn(self, position: int):
+        """Attend que la position entre dans la fenêtre autorisée."""
+        if self.window is None:
+            return
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._released or position < self.prefix + self.window)
+
+    async def release(self):
+        """Débloque toutes les attentes (arrêt en cours)."""
+        async with self._changed:
+            self._released = True
+            self._changed.notify_all()
+
+    async def complete(self, position: int):
+        """Marque une position comme terminée et avance le préfixe contigu."""
+        async with self._changed:
+            self._completed.add(position)
+            while self.prefix in self._completed:
+                self._completed.discard(self.prefix)
+                self.prefix += 1
+            self._changed.notify_all()
+
+
+class LaneScheduler:
+    """Répartit les messages sur deux voies à concurrence indépendante et budget de débit partagé."""
+
+    def __init__(
+        self,
+        send: Callable[[Any], Awaitable[bool]],
+        classify: Callable[[Any], str],
+        rate_limiter: RateLimiter,
+        small_concurrency: int = 4,
+        large_concurrency: int = 1,
+        window: Optional[int] = None,
+        on_done: Optional[Callable[[int, Any, bool], None]] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            send: Coroutine sending one message, returns success
+            classify: Returns SMALL_LANE or LARGE_LANE for a message
+            rate_limiter: Rate budget shared by both lanes
+            small_concurrency: Concurrent sends in the small/text lane
+            large_concurrency: Concurrent sends in the large media lane
+            window: Bounded reorder window (None for unordered mode)
+            on_done: Callback invoked with (position, message, success)
+        """
+        self.send = send
+        self.classify = classify
+        self.rate_limiter = rate_limiter
+        self.concurrency = {SMALL_LANE: max(1, small_concurrency), LARGE_LANE: max(1, large_concurrency)}
+        self.reorder = ReorderWindow(window)
+        self.on_done = on_done
+        self.stopping = False
+        self.stats: Dict[str, Dict[str, float]] = {
+            lane: {'messages': 0, 'busy_time': 0.0} for lane in self.concurrency
+        }
+
+    async def _worker(self, lane: str, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            position, message = item
+            if self.stopping:
+                continue
+            await self.reorder.wait_turn(position)
+            if self.stopping:
+                continue
+            await self.rate_limiter.acquire()
+
+            start = time.monotonic()
+            try:
+                success = await self.send(message)
+            except Exception:
+                success = False
+            self.stats[lane]['messages'] += 1
+            self.stats[lane]['busy_time'] += time.monotonic() - start
+
+            if self.stopping and not success:
+                # Envoi interrompu par l'arrêt : la position reste ouverte pour la reprise
+                continue
+            await self.reorder.complete(position)
+            if self.on_done:
+                self.on_done(position, message, success)
+
+    def stop(self):
+        """Cesse de démarrer de nouveaux envois ; ceux en cours se terminent."""
+        if self.stopping:
+            return
+        self.stopping = True
+        self._release_task = asyncio.get_running_loop().create_task(self.reorder.release())
+
+    async def run(self, messages: List[Any]):
+        """Envoie tous les messages et attend la fin des deux voies."""
+        queues = {lane: asyncio.Queue() for lane in self.concurrency}
+        for position, message in enumerate(messages):
+            queues[self.classify(message)].put_nowait((position, message))
+
+        workers = []
+        for lane, queue in queues.items():
+            for _ in range(self.concurrency[lane]):
+                queue.put_nowait(None)
+                workers.append(asyncio.create_task(self._worker(lane, queue)))
+
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
@@ -0,0 +1,198 @@
+"""
+Sélection côté serveur des messages pour le Clonage de Chaînes Telegram
+Les bornes de date et d'ID, la recherche textuelle et les types de média sont
+transmis à iter_messages (offset_date, min_id/max_id, search, filter) : Telegram
+ne renvoie que les messages sélectionnés, rien d'autre n'est lu ni téléchargé.
+Plusieurs types sans filtre commun donnent un flux filtré par type, fusionnés
+par date ; un type sans filtre serveur (text) se rabat sur un tri côté client.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from fanin import merge_by_date
+from utils import get_message_type
+
+# Types acceptés par --only et filtres serveur correspondants (voir utils.get_message_type)
+SERVER_FILTERS = {
+    'photo': ('InputMessagesFilterPhotos',),
+    'video': ('InputMessagesFilterVideo',),
+    'audio': ('InputMessagesFilterMusic', 'InputMessagesFilterVoice'),
+    'document': ('InputMessagesFilterDocument',),
+    'image': ('InputMessagesFilterDocument',),
+    'text': (),
+}
+SELECTABLE_TYPES = tuple(SERVER_FILTERS)
+
+
+def parse_date(value: str, end_of_day: bool = False) -> datetime:
+    """
+    Parse a --since/--until date (ISO 8601, UTC unless an offset is given).
+
+    Args:
+        value: "YYYY-MM-DD" or "YYYY-MM-DDTHH:MM[:SS][+HH:MM]"
+        end_of_day: For a bare date, return the following midnight (inclusive upper bound)
+
+    Returns:
+        Timezone-aware datetime
+    """
+    parsed = datetime.fromisoformat(value.strip())
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if end_of_day and len(value.strip()) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_types(value: str) -> List[str]:
+    """Liste de types séparés par des virgules (--only photo,video)."""
+    return [name.strip().lower() for name in value.split(',') if name.strip()]
+
+
+class MessageSelection:
+    """Sous-ensemble de l'historique source à cloner, appliqué dans les requêtes d'historique."""
+
+    def __init__(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_id: int = 0,
+        max_id: int = 0,
+        only: Iterable[str] = (),
+        search: Optional[str] = None
+    ):
+        """
+        Initialize the selection.
+
+        Args:
+            since: First publication date included
+            until: Publication date at which the selection stops (excluded)
+            min_id: First message ID included (0 = no bound)
+            max_id: Last message ID included (0 = no bound)
+            only: Message types kept (see SELECTABLE_TYPES), empty for all
+            search: Text that selected messages must contain
+        """
+        self.since = since
+        self.until = until
+        self.min_id = min_id
+        self.max_id = max_id
+        self.only = frozenset(only)
+        self.search = search or None
+        self.skipped = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'MessageSelection':
+        return cls(
+            since=parse_date(config.select_since) if config.select_since else None,
+            until=parse_date(config.select_until, end_of_day=True) if config.select_until else None,
+            min_id=config.select_min_id,
+            max_id=config.select_max_id,
+            only=config.select_only,
+            search=config.select_search
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.since or self.until or self.min_id or self.max_id or self.only or self.search)
+
+    def server_filters(self) -> List[Optional[Any]]:
+        """Un filtre par flux à lire ; [None] si un type demandé n'a pas de filtre serveur."""
+        from telethon.tl import types
+
+        if not self.only or any(not SERVER_FILTERS[name] for name in self.only):
+            return [None]
+        names = {kind for name in self.only for kind in SERVER_FILTERS[name]}
+        if {'InputMessagesFilterPhotos', 'InputMessagesFilterVideo'} <= names:
+            names -= {'InputMessagesFilterPhotos', 'InputMessagesFilterVideo'}
+            names.add('InputMessagesFilterPhotoVideo')
+        return [getattr(types, name)() for name in sorted(names)]
+
+    def query(self, min_id: int = 0, max_id: int = 0, **kwargs) -> Dict[str, Any]:
+        """
+        Arguments iter_messages du flux, bornes de l'appelant (reprise, tranche) comprises.
+
+        Args:
+            min_id: Caller's exclusive lower ID bound
+            max_id: Caller's exclusive upper ID bound (0 = none)
+            **kwargs: Other iter_messages arguments, passed through
+
+        Returns:
+            Keyword arguments for iter_messages (filter excluded)
+        """
+        query = dict(kwargs, min_id=max(min_id or 0, self.min_id - 1 if self.min_id else 0))
+        upper = [bound for bound in (max_id, self.max_id + 1 if self.max_id else 0) if bound]
+        if upper:
+            query['max_id'] = min(upper)
+        if self.since:
+            # Ignoré par Telethon en reprise (min_id prioritaire) : accepts() garde la borne
+            query['offset_date'] = self.since
+        if self.search:
+            query['search'] = self.search
+        return query
+
+    def accepts(self, message) -> bool:
+        """Contrôle côté client des critères que le serveur n'a pas pu appliquer."""
+        date = getattr(message, 'date', None)
+        if self.since and date is not None and date < self.since:
+            return False
+        return not self.only or get_message_type(message) in self.only
+
+    def ended(self, message) -> bool:
+        """Vrai au premier message publié après --until : la lecture s'arrête là."""
+        date = getattr(message, 'date', None)
+        return self.until is not None and date is not None and date >= self.until
+
+    async def iterate(
+        self,
+        open_stream: Callable[..., AsyncIterator[Any]],
+        limit: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Messages sélectionnés, du plus ancien au plus récent.
+
+        Args:
+            open_stream: Callable taking iter_messages keyword arguments and returning an ascending stream
+            limit: Maximum number of selected messages
+            **kwargs: Caller's iter_messages arguments (min_id, max_id...)
+
+        Yields:
+            Selected messages, each once
+        """
+        query = self.query(**kwargs)
+        if limit and not self.only:
+            query['limit'] = limit
+        streams = [
+            open_stream(**query) if kind is None else open_stream(filter=kind, **query)
+            for kind in self.server_filters()
+        ]
+        count = 0
+        seen_date, seen_ids = None, set()
+        async for _, message in merge_by_date(streams):
+            if self.ended(message):
+                return
+            # Un même message peut sortir de deux filtres (document et musique...)
+            if message.date != seen_date:
+                seen_date, seen_ids = message.date, set()
+            if message.id in seen_ids:
+                continue
+            seen_ids.add(message.id)
+            if not self.accepts(message):
+                self.skipped += 1
+                continue
+            yield message
+            count += 1
+            if limit and count >= limit:
+                return
+
+    def describe(self) -> str:
+        parts = []
+        if self.since or self.until:
+            parts.append(f"dates {self.since or '…'} → {self.until or '…'}")
+        if self.min_id or self.max_id:
+            parts.append(f"IDs {self.min_id or 1} → {self.max_id or '…'}")
+        if self.only:
+            parts.append(f"types {', '.join(sorted(self.only))}")
+        if self.search:
+            parts.append(f"recherche « {self.search} »")
+        return '; '.join(parts)
@@ -0,0 +1,256 @@
+"""
+Répartition multi-processus pour le Clonage de Chaînes Telegram
+Lance un processus par compte d'envoi (session Telethon) : chacun a sa propre
+boucle asyncio, son propre cœur pour le chiffrement et la sérialisation, et
+ses propres limites anti-flood. Le processus parent découpe la plage d'IDs
+source en tranches, les distribue par des pipes aux processus libres et
+agrège leurs compteurs.
+
+Protocole (tuples sur le pipe) :
+
+    enfant → parent   ('ready', dernier_id) | ('error', texte)
+                      ('progress', compteurs) | ('done', début, curseur, compteurs)
+    parent → enfant   ('chunk', début, après_id, fin) | ('stop',)
+
+Les messages sont envoyés sans ordre global entre processus ; le curseur de
+chaque tranche est sauvegardé pour reprendre exactement après un arrêt.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import wait
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import Config
+from logger_setup import ProgressLogger, setup_logger
+from utils import format_duration, load_json, save_json
+
+COUNTERS = ('processed', 'sent', 'failed', 'skipped_duplicate')
+
+
+def shard_process_main(conn, session_name: str, settings: Dict[str, Any], source_channel: str, target_channel: str):
+    """Point d'entrée d'un processus d'envoi (doit rester importable pour le mode spawn)."""
+    # Le terminal envoie SIGINT à tout le groupe : seul le parent décide de l'arrêt
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from telegram_cloner import TelegramCloner
+
+    config = Config()
+    config.__dict__.update(settings)
+    config.session_name = session_name
+    # Chaque processus envoie avec son propre compte (refusé par la validation avec un bot)
+    config.use_bot_for_sending = False
+    report_interval = config.progress_log_interval
+    config.progress_log_interval = 0
+    log_root, log_ext = os.path.splitext(config.log_file)
+    logger = setup_logger(config.log_level, f"{log_root}-{session_name}{log_ext}")
+
+    cloner = TelegramCloner(config, logger)
+    asyncio.run(cloner.run_shard(conn, source_channel, target_channel, report_interval))
+
+
+class ShardLauncher:
+    """Processus parent : distribution des tranches et agrégation des compteurs."""
+
+    def __init__(self, config: Config, logger, sessions: List[str], progress_key: str):
+        """
+        Initialize the launcher.
+
+        Args:
+            config: Configuration object (passed to every process)
+            logger: Logger instance
+            sessions: One Telethon session name per sender process
+            progress_key: Source/target pair key
+        """
+        self.config = config
+        self.logger = logger
+        self.sessions = sessions
+        self.state_key = f"{progress_key}_shards"
+        self.counters: Dict[str, Dict[str, int]] = {session: dict.fromkeys(COUNTERS, 0) for session in sessions}
+        self.cursors: Dict[int, int] = {}
+        self.chunks_done = 0
+        self.stopping = False
+        self.progress = ProgressLogger(
+            logger,
+            name="Progress (all processes)",
+            interval=config.progress_log_interval,
+            half_life=config.progress_half_life,
+            status=lambda: f"Sent: {self.total('sent')}, Failed: {self.total('failed')}"
+        )
+
+    def total(self, counter: str) -> int:
+        return sum(counters[counter] for counters in self.counters.values())
+
+    def _load_state(self, chunk_size: int):
+        state = (load_json(self.config.progress_file) or {}).get(self.state_key) or {}
+        if state.get('chunk_size') == chunk_size:
+            self.cursors = {int(start): cursor for start, cursor in state.get('cursors', {}).items()}
+
+    def _save_state(self, chunk_size: int, last_id: int):
+        data = load_json(self.config.progress_file) or {}
+        data[self.state_key] = {
+            'chunk_size': chunk_size,
+            'last_id': last_id,
+            'cursors': {str(start): cursor for start, cursor in sorted(self.cursors.items())},
+            'last_update': datetime.now().isoformat(),
+        }
+        if not save_json(data, self.config.progress_file):
+            self.logger.warning(f"Impossible de sauvegarder la progression dans {self.config.progress_file}")
+
+    def _plan(self, last_id: int, chunk_size: int) -> Deque[Tuple[int, int, int]]:
+        """Tranches restantes (début, après_id, fin), en reprenant au curseur sauvegardé."""
+        chunks: Deque[Tuple[int, int, int]] = deque()
+        for start in range(1, last_id + 1, chunk_size):
+            end = min(start + chunk_size - 1, last_id)
+            cursor = self.cursors.get(start, start - 1)
+            if cursor < end:
+                chunks.append((start, cursor, end))
+        return chunks
+
+    def request_stop(self, reason: str = "arrêt demandé"):
+        if self.stopping:
+            return
+        self.stopping = True
+        self.logger.warning(f"{reason} reçu: arrêt des processus d'envoi après leurs envois en cours")
+
+    async def run(self, source_channel: str, target_channel: str) -> bool:
+        """
+        Spawn one process per session and distribute the chunks until done.
+
+        Returns:
+            True if every chunk was sent, False otherwise
+        """
+        context = multiprocessing.get_context('spawn')
+        settings = dict(vars(self.config))
+        processes: Dict[str, multiprocessing.Process] = {}
+        pipes: Dict[Any, str] = {}
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.request_stop, signal.Signals(signum).name)
+
+        start_time = datetime.now()
+        chunk_size = self.config.shard_chunk_size
+        try:
+            for session in self.sessions:
+                parent_conn, child_conn = context.Pipe()
+                process = context.Process(
+                    target=shard_process_main,
+                    args=(child_conn, session, settings, source_channel, target_channel),
+                    name=f"clone-{session}",
+                    daemon=True
+                )
+                process.start()
+                child_conn.close()
+                processes[session] = process
+                pipes[parent_conn] = session
+
+            # Chaque processus se connecte et annonce le dernier ID de la source
+            last_id = 0
+            for conn, session in list(pipes.items()):
+                reply = await loop.run_in_executor(None, _receive, conn)
+                if reply is None or reply[0] != 'ready':
+                    self.logger.error(
+                        f"Processus {session} indisponible: "
+                        f"{reply[1] if reply else 'arrêté (session autorisée au préalable ?)'}"
+                    )
+                    del pipes[conn]
+                    continue
+                last_id = max(last_id, reply[1])
+            if not pipes:
+                return False
+
+            self._load_state(chunk_size)
+            chunks = self._plan(last_id, chunk_size)
+            self.progress.add_total(sum(end - cursor for _, cursor, end in chunks))
+            self.logger.info(
+                f"{len(chunks)} tranche(s) de {chunk_size} IDs à répartir sur {len(pipes)} processus d'envoi"
+            )
+            self.progress.start()
+
+            assigned: Dict[Any, Tuple[int, int, int]] = {}
+            signalled = set()
+            idle = list(pipes)
+            while pipes:
+                # Distribution aux processus libres
+                while idle:
+                    conn = idle.pop()
+                    if chunks and not self.stopping:
+                        assigned[conn] = chunks.popleft()
+                        conn.send(('chunk', *assigned[conn]))
+                    else:
+                        conn.send(('stop',))
+                        del pipes[conn]
+                if self.stopping:
+                    for conn in set(assigned) - signalled:
+                        processes[pipes[conn]].terminate()  # SIGTERM : arrêt propre côté enfant
+                        signalled.add(conn)
+                if not pipes:
+                    break
+
+                ready = await loop.run_in_executor(None, wait, list(pipes), 1.0)
+                for conn in ready:
+                    session = pipes[conn]
+                    reply = _receive(conn)
+                    if reply is None:
+                        # Processus mort : sa tranche repart dans la file depuis le dernier curseur connu
+                        self.logger.error(f"Processus {session} arrêté de façon inattendue")
+                        if conn in assigned:
+                            start, cursor, end = assigned.pop(conn)
+                            chunks.appendleft((start, self.cursors.get(start, cursor), end))
+                        del pipes[conn]
+                        continue
+                    if reply[0] == 'progress':
+                        self._update_counters(session, reply[1])
+                    elif reply[0] == 'done':
+                        _, start, cursor, counters = reply
+                        self._update_counters(session, counters)
+                        end = assigned.pop(conn)[2]
+                        self.cursors[start] = cursor
+                        self._save_state(chunk_size, last_id)
+                        if cursor >= end:
+                            self.chunks_done += 1
+                        elif not self.stopping:
+                            chunks.append((start, cursor, end))
+                        idle.append(conn)
+
+            remaining = self._plan(last_id, chunk_size)
+            self._print_summary(start_time, len(remaining))
+            return not remaining and not self.stopping
+
+        finally:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.remove_signal_handler(signum)
+            await self.progress.stop()
+            for process in processes.values():
+                await loop.run_in_executor(None, process.join, self.config.shutdown_timeout + 30)
+                if process.is_alive():
+                    process.kill()
+
+    def _update_counters(self, session: str, counters: Dict[str, int]):
+        processed_before = self.total('processed')
+        self.counters[session].update(counters)
+        self.progress.add(self.total('processed') - processed_before)
+
+    def _print_summary(self, start_time: datetime, remaining_chunks: int):
+        self.logger.info("=== Sharded Cloning Summary ===")
+        self.logger.info(f"Total Duration: {format_duration(datetime.now() - start_time)}")
+        for session, counters in self.counters.items():
+            self.logger.info(
+                f"  {session}: {counters['processed']} processed, {counters['sent']} sent, {counters['failed']} failed"
+            )
+        self.logger.info(f"Messages Processed: {self.total('processed')}")
+        self.logger.info(f"Messages Sent: {self.total('sent')}")
+        self.logger.info(f"Messages Failed: {self.total('failed')}")
+        self.logger.info(f"Chunks: {self.chunks_done} done, {remaining_chunks} remaining")
+
+
+def _receive(conn) -> Optional[tuple]:
+    """Message suivant du pipe (None si l'autre extrémité est fermée)."""
+    try:
+        return conn.recv()
+    except (EOFError, OSError):
+        return None
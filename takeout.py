@@ -0,0 +1,139 @@
+"""
+Session takeout pour le Clonage de Chaînes Telegram
+Telegram propose des sessions « takeout » destinées à l'export de données,
+aux limites de lecture d'historique assouplies. La session est demandée à
+l'ouverture (account.initTakeoutSession) et terminée proprement à la fin
+(account.finishTakeoutSession). Si Telegram impose un délai d'initialisation
+(TakeoutInitDelayError) ou refuse la session, la lecture se fait avec la
+session normale.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+MODE_TAKEOUT = 'takeout'
+MODE_NORMAL = 'normal'
+
+
+class TakeoutSession:
+    """Session takeout ouverte sur le client utilisateur, avec repli sur la session normale."""
+
+    def __init__(self, client, logger, max_wait: float = 60.0, files: bool = True):
+        """
+        Initialize the takeout session.
+
+        Args:
+            client: Connected user TelegramClient
+            logger: Logger instance
+            max_wait: Longest init delay (seconds) worth waiting for before falling back
+            files: Whether media files will be downloaded through the session
+        """
+        self.client = client
+        self.logger = logger
+        self.max_wait = max_wait
+        self.files = files
+        self.reader: Optional[Any] = None
+
+    @property
+    def active(self) -> bool:
+        return self.reader is not None
+
+    async def open(self) -> bool:
+        """
+        Demande la session takeout.
+
+        Returns:
+            True if history reads now go through the takeout session
+        """
+        from telethon import errors
+
+        for attempt in range(2):
+            try:
+                takeout = self.client.takeout(
+                    finalize=False, channels=True, megagroups=True, files=self.files
+                )
+                self.reader = await takeout.__aenter__()
+                self.logger.info("Session takeout ouverte: lecture de l'historique aux limites d'export")
+                return True
+            except errors.TakeoutInitDelayError as e:
+                if attempt or e.seconds > self.max_wait:
+                    self.logger.warning(
+                        f"Session takeout différée de {e.seconds}s par Telegram (à confirmer dans l'application "
+                        f"officielle) : lecture avec la session normale"
+                    )
+                    return False
+                self.logger.info(f"Session takeout disponible dans {e.seconds}s, attente...")
+                await asyncio.sleep(e.seconds)
+            except ValueError:
+                # Takeout précédent non terminé (interruption) : on le clôt avant d'en redemander un
+                if attempt:
+                    break
+                self.logger.info("Session takeout précédente non terminée, clôture")
+                await self.client.end_takeout(success=False)
+            except Exception as e:
+                self.logger.warning(
+                    f"Session takeout refusée ({type(e).__name__}: {e}) : lecture avec la session normale"
+                )
+                return False
+        self.logger.warning("Session takeout indisponible : lecture avec la session normale")
+        return False
+
+    async def finish(self, success: bool):
+        """Termine la session takeout (sans effet si elle n'a pas été ouverte)."""
+        if not self.active:
+            return
+        self.reader = None
+        try:
+            await self.client.end_takeout(success=success)
+            self.logger.info("Session takeout terminée")
+        except Exception as e:
+            self.logger.warning(f"Impossible de terminer la session takeout: {str(e)}")
+
+
+class ReadMeter:
+    """Débit de lecture de l'historique : seul le temps passé à attendre les messages compte."""
+
+    def __init__(self):
+        self.messages = 0
+        self.seconds = 0.0
+
+    async def iterate(self, iterator) -> AsyncIterator[Any]:
+        """Parcourt un itérateur asynchrone en mesurant le temps de chaque lecture."""
+        iterator = iterator.__aiter__()
+        while True:
+            started = time.monotonic()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                self.seconds += time.monotonic() - started
+            self.messages += 1
+            yield item
+
+    @property
+    def rate(self) -> float:
+        return self.messages / self.seconds if self.seconds > 0 else 0.0
+
+    def record(self, rates: Dict[str, float], mode: str):
+        """Mémorise le débit de cette lecture (persisté) pour comparer les modes d'une exécution à l'autre."""
+        if self.messages:
+            rates[mode] = round(self.rate, 1)
+
+    def log_stats(self, logger, mode: str, rates: Optional[Dict[str, float]] = None):
+        """
+        Journalise le débit de lecture, comparé au dernier débit mesuré dans l'autre mode.
+
+        Args:
+            logger: Logger instance
+            mode: MODE_TAKEOUT or MODE_NORMAL
+            rates: Persisted rates per mode
+        """
+        if not self.messages:
+            return
+        line = f"History Read: {self.messages} messages in {self.seconds:.1f}s ({self.rate:.1f} msg/s, {mode} session)"
+        other = MODE_NORMAL if mode == MODE_TAKEOUT else MODE_TAKEOUT
+        if rates and rates.get(other):
+            line += f" vs {rates[other]:.1f} msg/s in {other} mode (x{self.rate / rates[other]:.2f})"
+        logger.info(line)
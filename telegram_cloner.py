@@ -4,15 +4,61 @@ Gère le clonage réel des messages entre les chaînes Telegram.
 """
 
 import asyncio
+import gc
+import functools
 import json
 import os
+import shutil
+import signal
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, Tuple
 from telethon import TelegramClient, errors
-from telethon.tl.types import Message
+from telethon.tl.types import Message, MessageEntityMentionName
 
 from config import Config
-from utils import sanitize_filename, format_duration, calculate_eta, parse_channel_identifier, is_channel_id
+from archive import ArchiveWriter, ArchiveReader, ArchivedMessage, serialize_entities
+from bandwidth import BandwidthShaper
+from coalesce import coalesce_messages
+from coordinator import LeaseCoordinator, LeaseLostError, Lease, PHASE_STAGE, PHASE_PUBLISH
+from deadletter import DeadLetterQueue
+from fanin import merge_by_date
+from filerefs import FileReferenceRefresher, is_file_reference_error
+from fanout import SharedUploads
+from dedup import BloomFilter, content_fingerprint, media_identity
+from logger_setup import log_telegram_error, ProgressLogger
+from media_transform import MediaTransformStage
+from memory import MemoryMonitor
+from reconcile import CoalescedSends, SequenceAligner, iter_missing
+from records import MessageRecord
+from retry import RetryEngine, JobAbortedError, RETRY_SCHEDULED, ABORT_JOB
+from rules import RuleEngine
+from runtime_control import RuntimeController
+from selection import MessageSelection
+from takeout import TakeoutSession, ReadMeter, MODE_TAKEOUT, MODE_NORMAL
+from scheduler import LaneScheduler, RateLimiter, SMALL_LANE, LARGE_LANE
+from utils import (
+    save_json, load_json, sanitize_filename, format_duration, parse_channel_identifier, is_channel_id,
+    get_message_type, get_message_size, format_file_size
+)
+
+
+def _remove_prepared_file(future: asyncio.Future):
+    """Supprime le fichier d'un média préparé puis abandonné."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        os.remove(future.result())
+    except OSError:
+        pass
+
+
+# get_messages(ids=...) accepte au plus 100 IDs par requête
+DEAD_LETTER_FETCH_CHUNK = 100
+
+# Budget mémoire : fréquence de mesure pendant la récupération et plus petite tranche
+MEMORY_CHECK_INTERVAL = 100
+MIN_MEMORY_CHUNK = 100
 
 
 class TelegramCloner:
@@ -36,18 +82,101 @@ class TelegramCloner:
         self.messages_processed = 0
         self.messages_sent = 0
         self.messages_failed = 0
+        self.messages_skipped_duplicate = 0
+        self.messages_coalesced = 0
+        
+        # Relances : file temporisée, délai exponentiel avec gigue
+        self.retry_engine = RetryEngine(
+            max_retries=config.max_retries,
+            base_delay=config.retry_delay,
+            max_delay=config.retry_max_delay,
+            jitter=config.retry_jitter
+        )
+        self.job_aborted = False
+        self.dead_letters = DeadLetterQueue(config.dead_letter_file)
+        
+        # Transformation des médias (pool de processus, file bornée téléchargement -> envoi)
+        self.media_stage: Optional[MediaTransformStage] = None
+        self._prepared_media: Dict[int, asyncio.Future] = {}
+        self._media_slots: Optional[asyncio.Semaphore] = None
+        self._media_taken: Set[int] = set()
+        
+        # Budget mémoire et traçage des allocations
+        self.memory_monitor = MemoryMonitor(
+            logger,
+            budget=config.memory_budget,
+            trace_interval=config.memory_trace_interval,
+            top=config.memory_trace_top
+        )
+        
+        # Progression : rapports à intervalle fixe, débits lissés (EWMA)
+        self.progress = ProgressLogger(
+            logger,
+            interval=config.progress_log_interval,
+            half_life=config.progress_half_life,
+            status=lambda: f"Sent: {self.messages_sent}, Failed: {self.messages_failed}"
+        )
+        
+        # Content deduplication (optional)
+        self.dedup_filter: Optional[BloomFilter] = None
+        self.dedup_path: Optional[str] = None
+        self.dedup_saturated = False
+        
+        # Media bandwidth shaping (shared by every transfer)
+        self.bandwidth = BandwidthShaper(
+            upload_rate=config.upload_rate_limit,
+            client_upload_rate=config.client_upload_rate_limit,
+            download_rate=config.download_rate_limit
+        )
+        
+        # Live parameter tuning (SIGHUP / control socket)
+        self.runtime_controller: Optional[RuntimeController] = None
+        self._send_rate_limiter: Optional[RateLimiter] = None
+        
+        # Filter/transform rules (optional)
+        self.rule_engine: Optional[RuleEngine] = None
+        
+        # Graceful shutdown (SIGTERM/SIGINT)
+        self.shutdown_requested = False
+        self.shutdown_latency: Optional[float] = None
+        self._shutdown_started: Optional[float] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._clone_task: Optional[asyncio.Task] = None
+        self._lane_scheduler: Optional[LaneScheduler] = None
+        self._signals_installed: List[int] = []
         
         # Message tracking to avoid duplicates
         self.copied_messages: set = set()
+        self.coalesced_map: Dict[str, List[int]] = {}
         self.progress_key = ""
         
+        # Modes répartis : le point de reprise est tenu par le coordinateur ou le processus parent
+        self.external_checkpoints = False
+        # Bail en cours (coordination multi-nœuds), vérifié avant chaque envoi
+        self._lease: Optional[Tuple[LeaseCoordinator, Lease]] = None
+        
+        # Diffusion vers plusieurs cibles : une instance par cible, médias partagés
+        self.shared_uploads: Optional[SharedUploads] = None
+        
+        # Relecture groupée des médias dont la référence de fichier a expiré
+        self.file_refs: Optional[FileReferenceRefresher] = None
+        
+        # Lecture de l'historique : session takeout optionnelle et débit mesuré
+        self.takeout: Optional[TakeoutSession] = None
+        self.read_meter = ReadMeter()
+        
+        # Sous-ensemble de l'historique source sélectionné côté serveur (--since, --only...)
+        self.selection = MessageSelection.from_config(config)
+        self._followers: List['TelegramCloner'] = []
+        
     async def clone_channel(
         self,
         source_channel: str,
         target_channel: str,
         message_limit: Optional[int] = None,
         resume: bool = False,
-        dry_run: bool = False
+        dry_run: bool = False,
+        from_archive: Optional[str] = None
     ) -> bool:
         """
         Clone messages from source channel to target channel.
@@ -58,93 +187,1316 @@ class TelegramCloner:
             message_limit: Maximum number of messages to clone
             resume: Whether to resume from last position
             dry_run: Whether to perform a dry run without sending messages
+            from_archive: Local archive directory to replay instead of reading
+                the source channel (no source API call is made)
             
         Returns:
             True if successful, False otherwise
         """
+        archive_reader: Optional[ArchiveReader] = None
         try:
             # Initialisation du client Telegram
             if not self.config.api_id or not self.config.api_hash:
                 self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
                 return False
-                
-            self.client = TelegramClient(
-                self.config.session_name,
-                self.config.api_id,
-                self.config.api_hash
-            )
             
-            await self.client.start()
-            self.logger.info("Connecté à Telegram avec votre compte")
+            # Compilation des règles de filtrage avant toute connexion
+            if not self._load_rules():
+                return False
+            if not self._load_media_stage():
+                return False
+                
+            await self._connect_user_client()
             
             # Initialiser le client bot si configuré
-            if self.config.use_bot_for_sending:
-                self.bot_client = TelegramClient(
-                    f"{self.config.session_name}_bot",
-                    self.config.api_id,
-                    self.config.api_hash
-                )
-                await self.bot_client.start(bot_token=self.config.bot_token)
-                self.logger.info("Bot connecté pour l'envoi des messages")
+            await self._connect_bot_client()
+            
+            # Dès la connexion : un signal pendant une longue récupération l'interrompt proprement
+            self._install_shutdown_handlers()
+            await self._start_runtime_control()
+            if not from_archive:
+                await self._start_takeout()
             
             # Obtenir les entités source et cible
-            source_entity = await self._get_entity(source_channel)
-            if not source_entity:
-                return False
+            if from_archive:
+                archive_reader = ArchiveReader(from_archive)
+                archive_reader.open()
+                source_entity = None
+                source_title = f"archive {from_archive} ({archive_reader.manifest.get('source') or 'source inconnue'})"
+            else:
+                source_entity = await self._get_source_entity(source_channel)
+                if not source_entity:
+                    return False
+                source_title = getattr(source_entity, 'title', getattr(source_entity, 'username', str(source_entity.id)))
                 
             target_entity = await self._get_entity(target_channel)
             if not target_entity:
                 return False
             
-            # Obtenir les titres des entités de manière sécurisée
-            source_title = getattr(source_entity, 'title', getattr(source_entity, 'username', str(source_entity.id)))
+            # Obtenir le titre de la cible de manière sécurisée
             target_title = getattr(target_entity, 'title', getattr(target_entity, 'username', str(target_entity.id)))
             
             self.logger.info(f"Source: {source_title}")
             self.logger.info(f"Cible: {target_title}")
+            self._log_selection()
             
             # Charger la progression si reprise
+            self.progress_key = self._make_progress_key(source_channel, target_channel)
             if resume:
                 self._load_progress(source_channel, target_channel)
+            else:
+                # Débits de lecture des exécutions précédentes, pour comparer les modes takeout/normal
+                previous = (load_json(self.config.progress_file) or {}).get(self.progress_key, {})
+                if previous.get('read_rates'):
+                    self.progress_data['read_rates'] = previous['read_rates']
+            
+            # Charger le filtre de déduplication si activé
+            if self.config.dedup_enabled:
+                self._load_dedup_filter()
+            
+            self.memory_monitor.start()
+            
+            if (self.memory_monitor.budget or from_archive) and not dry_run:
+                # Budget mémoire ou rejeu d'archive : lecture et envoi par tranches bornées,
+                # l'archive n'est jamais chargée entièrement en mémoire
+                if self.memory_monitor.budget:
+                    self.logger.info(
+                        f"Budget mémoire: {format_file_size(self.memory_monitor.budget)}, "
+                        f"tranches de {self.config.memory_chunk_size} messages au plus"
+                    )
+                else:
+                    self.logger.info(
+                        f"Rejeu de l'archive ({len(archive_reader)} messages archivés) "
+                        f"par tranches de {self.config.memory_chunk_size} messages"
+                    )
+                start_time = datetime.now()
+                clone = self._clone_in_rounds(source_entity, archive_reader, target_entity, message_limit, start_time)
+            else:
+                # Obtenir les messages à cloner
+                if from_archive:
+                    messages = self._get_archived_messages(archive_reader, message_limit)
+                else:
+                    messages = await self._get_messages(source_entity, message_limit)
+                if self.shutdown_requested:
+                    # Arrêt pendant la récupération : rien n'a été envoyé, la reprise repart du même point
+                    self.logger.warning("Récupération interrompue par l'arrêt demandé, aucun message envoyé")
+                    self._save_progress(source_channel, target_channel, completed=False)
+                    return False
+                if not messages:
+                    self.logger.warning("Aucun message trouvé à cloner")
+                    return True
+                
+                # Étape de filtrage et de réécriture entre récupération et envoi
+                if self.rule_engine:
+                    messages = self.rule_engine.filter(messages)
+                    self.logger.info(f"{self.rule_engine.messages_excluded} messages écartés par les règles")
+                    if not messages:
+                        self.logger.warning("Aucun message restant après application des règles")
+                        self.rule_engine.log_stats(self.logger)
+                        return True
+                
+                total_messages = len(messages)
+                self.logger.info(f"Trouvé {total_messages} messages à cloner")
+                
+                if dry_run:
+                    self.logger.info("MODE TEST - Aucun message ne sera envoyé")
+                    await self._dry_run_analysis(messages)
+                    return True
+                
+                start_time = datetime.now()
+                clone = self._clone_messages_batch(messages, target_entity, total_messages, start_time)
+            
+            # Cloner les messages par lots
+            self.progress.start()
+            self._clone_task = asyncio.ensure_future(clone)
+            try:
+                success = await self._clone_task
+            except asyncio.CancelledError:
+                # Annulation par l'échéance d'arrêt : on continue vers le point de reprise
+                if not self.shutdown_requested:
+                    raise
+                success = False
+            finally:
+                self._clone_task = None
+            
+            if self.shutdown_requested:
+                success = False
+            
+            # Sauvegarder la progression finale
+            self.read_meter.record(self.progress_data.setdefault('read_rates', {}), self._read_mode())
+            self._save_progress(source_channel, target_channel, completed=success)
+            
+            if self.shutdown_requested:
+                self.shutdown_latency = time.monotonic() - self._shutdown_started
+                self.logger.warning(
+                    f"Arrêt propre terminé en {self.shutdown_latency:.2f}s "
+                    f"(échéance {self.config.shutdown_timeout:.0f}s) - point de reprise: "
+                    f"message {self.progress_data.get('last_message_id', 0)}"
+                )
+            
+            # Afficher le résumé
+            if self.progress.current:
+                self.progress.update()
+            self._print_summary(start_time)
+            
+            return success
+            
+        except Exception as e:
+            self.logger.error(f"Erreur pendant le clonage: {str(e)}", exc_info=True)
+            return False
+        finally:
+            self._remove_shutdown_handlers()
+            await self.progress.stop()
+            if self.media_stage:
+                self.media_stage.close()
+            await self.memory_monitor.stop()
+            await self._stop_runtime_control()
+            await self._finish_takeout()
+            if archive_reader is not None:
+                archive_reader.close()
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+            if self.bot_client:
+                await self.bot_client.disconnect()
+                self.logger.info("Bot déconnecté")
+    
+    async def fan_out_channel(
+        self,
+        source_channel: str,
+        target_channels: List[str],
+        message_limit: Optional[int] = None,
+        resume: bool = False,
+        from_archive: Optional[str] = None
+    ) -> bool:
+        """
+        Clone one source into several targets with a single read of the source.
+        
+        Each target gets its own TelegramCloner (progress entry, copied messages,
+        retry queue, rate limiting), all sharing the connected clients. Messages
+        are read once per chunk and sent to every target concurrently; media are
+        prepared and uploaded once, then the same file handle is reused.
+        
+        Args:
+            source_channel: Source channel username or ID
+            target_channels: Target channel usernames or IDs
+            message_limit: Maximum number of messages to clone
+            resume: Whether each target resumes from its last position
+            from_archive: Local archive directory to replay instead of the source
+            
+        Returns:
+            True if every target was cloned, False otherwise
+        """
+        archive_reader = None
+        try:
+            if not self.config.api_id or not self.config.api_hash:
+                self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
+                return False
+            if not self._load_rules() or not self._load_media_stage():
+                return False
+            
+            await self._connect_user_client()
+            await self._connect_bot_client()
+            
+            if from_archive:
+                archive_reader = ArchiveReader(from_archive)
+                archive_reader.open()
+                source_entity = None
+            else:
+                source_entity = await self._get_source_entity(source_channel)
+                if not source_entity:
+                    return False
+            
+            self.shared_uploads = SharedUploads(len(target_channels))
+            targets = []
+            for target_channel in target_channels:
+                target_entity = await self._get_entity(target_channel)
+                if not target_entity:
+                    return False
+                targets.append((self._make_pair_cloner(source_channel, target_channel, resume), target_entity))
+            self._followers = [target for target, _ in targets]
+            
+            cursor = min(target.progress_data.get('last_message_id', 0) for target in self._followers)
+            self.logger.info(
+                f"Diffusion vers {len(self._followers)} cibles: {', '.join(target_channels)} "
+                f"(lecture à partir de l'ID {cursor})"
+            )
+            
+            self.memory_monitor.start()
+            self._install_shutdown_handlers()
+            await self._start_runtime_control()
+            self.progress.start()
+            start_time = datetime.now()
+            self._clone_task = asyncio.ensure_future(
+                self._fan_out_rounds(source_entity, archive_reader, targets, cursor, message_limit, start_time)
+            )
+            try:
+                success = await self._clone_task
+            except asyncio.CancelledError:
+                if not self.shutdown_requested:
+                    raise
+                success = False
+            
+            for target, target_channel in zip(self._followers, target_channels):
+                target._save_progress(
+                    source_channel, target_channel,
+                    completed=success and not target.job_aborted and not self.shutdown_requested
+                )
+            
+            self.logger.info("=== Fan-out Summary ===")
+            self.logger.info(f"Total Duration: {format_duration(datetime.now() - start_time)}")
+            for target in self._followers:
+                self.logger.info(
+                    f"  {target.progress_key}: {target.messages_sent} sent, {target.messages_failed} failed"
+                    f"{' (aborted)' if target.job_aborted else ''}"
+                )
+            self.shared_uploads.log_stats(self.logger)
+            if self.file_refs:
+                self.file_refs.log_stats(self.logger)
+            if self.media_stage:
+                self.media_stage.log_stats(self.logger)
+            self.bandwidth.log_stats(self.logger)
+            
+            return success and not any(target.job_aborted for target in self._followers)
             
-            # Obtenir les messages à cloner
-            messages = await self._get_messages(source_entity, message_limit)
+        except Exception as e:
+            self.logger.error(f"Erreur pendant la diffusion: {str(e)}", exc_info=True)
+            return False
+        finally:
+            self._remove_shutdown_handlers()
+            await self.progress.stop()
+            if self.shared_uploads:
+                self.shared_uploads.clear()
+            if self.media_stage:
+                self.media_stage.close()
+            await self.memory_monitor.stop()
+            await self._stop_runtime_control()
+            if archive_reader is not None:
+                archive_reader.close()
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+            if self.bot_client:
+                await self.bot_client.disconnect()
+                self.logger.info("Bot déconnecté")
+    
+    def _make_pair_cloner(self, source_channel: str, target_channel: str, resume: bool) -> 'TelegramCloner':
+        """État d'une paire source/cible (diffusion, fusion), partageant clients, médias et progression."""
+        target = TelegramCloner(self.config, self.logger)
+        target.client = self.client
+        target.bot_client = self.bot_client
+        target.media_stage = self.media_stage
+        target.bandwidth = self.bandwidth
+        target.shared_uploads = self.shared_uploads
+        target.file_refs = self.file_refs
+        target.progress = self.progress
+        if resume:
+            target._load_progress(source_channel, target_channel)
+        target.progress_key = target._make_progress_key(source_channel, target_channel)
+        return target
+    
+    async def _fan_out_rounds(
+        self,
+        source_entity,
+        archive_reader: Optional[ArchiveReader],
+        targets: List[tuple],
+        cursor: int,
+        message_limit: Optional[int],
+        start_time: datetime
+    ) -> bool:
+        """Lit la source par tranches et envoie chaque tranche à toutes les cibles en parallèle."""
+        remaining = message_limit or None
+        while not self.shutdown_requested:
+            if all(target.job_aborted for target, _ in targets):
+                # Plus aucune cible à servir : inutile de parcourir le reste de la source
+                return False
+            limit = self.config.memory_chunk_size if remaining is None else min(self.config.memory_chunk_size, remaining)
+            if limit <= 0:
+                return True
+            messages = [message async for message in self._iter_source(source_entity, archive_reader, cursor, limit)]
             if not messages:
-                self.logger.warning("Aucun message trouvé à cloner")
                 return True
+            cursor = messages[-1].id
+            if remaining is not None:
+                remaining -= len(messages)
+            if self.rule_engine:
+                messages = self.rule_engine.filter(messages)
             
-            total_messages = len(messages)
-            self.logger.info(f"Trouvé {total_messages} messages à cloner")
+            sends = []
+            for target, target_entity in targets:
+                if target.job_aborted:
+                    continue
+                # Chaque cible reprend à son propre point de reprise
+                last_id = target.progress_data.get('last_message_id', 0)
+                pending = [message for message in messages if message.id > last_id]
+                if pending:
+                    sends.append(target._clone_messages_batch(pending, target_entity, len(pending), start_time))
+            try:
+                results = await asyncio.gather(*sends)
+            finally:
+                self.shared_uploads.clear()
+            if not all(results) and self.shutdown_requested:
+                return False
+            del messages
+        return False
+    
+    async def merge_channels(
+        self,
+        source_channels: List[str],
+        target_channel: str,
+        message_limit: Optional[int] = None,
+        resume: bool = False
+    ) -> bool:
+        """
+        Merge several sources into one target in chronological order.
+        
+        One iter_messages stream is opened per source and the streams are merged
+        lazily by date, so memory stays proportional to the number of sources.
+        Each source keeps its own progress entry (watermark, copied messages,
+        retry queue, dead letters) under its source/target pair key, and every
+        source resumes from its own watermark.
+        
+        Args:
+            source_channels: Source channel usernames or IDs
+            target_channel: Target channel username or ID
+            message_limit: Maximum number of messages to clone (all sources)
+            resume: Whether each source resumes from its last position
+            
+        Returns:
+            True if every source was cloned, False otherwise
+        """
+        try:
+            if not self.config.api_id or not self.config.api_hash:
+                self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
+                return False
+            if not self._load_rules() or not self._load_media_stage():
+                return False
+            
+            await self._connect_user_client()
+            await self._connect_bot_client()
+            
+            target_entity = await self._get_entity(target_channel)
+            if not target_entity:
+                return False
+            
+            sources = []
+            for source_channel in source_channels:
+                source_entity = await self._get_entity(source_channel)
+                if not source_entity:
+                    return False
+                source = self._make_pair_cloner(source_channel, target_channel, resume)
+                source.file_refs = FileReferenceRefresher(self.client, source_entity)
+                sources.append((source, source_entity))
+            self._followers = [source for source, _ in sources]
+            
+            # Un seul filtre pour toutes les sources : une même dépêche n'est publiée qu'une fois
+            if self.config.dedup_enabled:
+                self._load_dedup_filter(self._make_progress_key('fusion', target_channel))
+                for source in self._followers:
+                    source.dedup_filter = self.dedup_filter
+                    source.dedup_path = self.dedup_path
+            
+            self.logger.info(
+                f"Fusion de {len(sources)} sources vers {target_channel}: "
+                + ", ".join(
+                    f"{channel} (depuis l'ID {source.progress_data.get('last_message_id', 0)})"
+                    for channel, source in zip(source_channels, self._followers)
+                )
+            )
+            
+            self.memory_monitor.start()
+            self._install_shutdown_handlers()
+            await self._start_runtime_control()
+            self.progress.start()
+            start_time = datetime.now()
+            self._clone_task = asyncio.ensure_future(self._merge_sources(sources, target_entity, message_limit))
+            try:
+                success = await self._clone_task
+            except asyncio.CancelledError:
+                if not self.shutdown_requested:
+                    raise
+                success = False
+            
+            for source, source_channel in zip(self._followers, source_channels):
+                source._save_progress(source_channel, target_channel, completed=success)
+            
+            self.logger.info("=== Fan-in Summary ===")
+            self.logger.info(f"Total Duration: {format_duration(datetime.now() - start_time)}")
+            for source in self._followers:
+                self.logger.info(
+                    f"  {source.progress_key}: {source.messages_sent} sent, {source.messages_failed} failed, "
+                    f"watermark {source.progress_data.get('last_message_id', 0)}"
+                )
+            for source in self._followers:
+                if source.file_refs:
+                    source.file_refs.log_stats(self.logger)
+            if self.rule_engine:
+                self.rule_engine.log_stats(self.logger)
+            if self.media_stage:
+                self.media_stage.log_stats(self.logger)
+            self.bandwidth.log_stats(self.logger)
+            
+            return success
+            
+        except Exception as e:
+            self.logger.error(f"Erreur pendant la fusion: {str(e)}", exc_info=True)
+            return False
+        finally:
+            self._remove_shutdown_handlers()
+            await self.progress.stop()
+            if self.media_stage:
+                self.media_stage.close()
+            await self.memory_monitor.stop()
+            await self._stop_runtime_control()
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+            if self.bot_client:
+                await self.bot_client.disconnect()
+                self.logger.info("Bot déconnecté")
+    
+    async def _merge_sources(self, sources: List[tuple], target_entity, message_limit: Optional[int]) -> bool:
+        """Envoie les messages de toutes les sources dans l'ordre chronologique, un par un."""
+        streams = [
+            self._iter_records(entity, min_id=source.progress_data.get('last_message_id', 0))
+            for source, entity in sources
+        ]
+        count = 0
+        try:
+            async for index, message in merge_by_date(streams):
+                if self.shutdown_requested:
+                    return False
+                if message_limit and count >= message_limit:
+                    break
+                count += 1
+                source = sources[index][0]
+                if self.rule_engine and not self.rule_engine.apply(message):
+                    source._save_progress_data(source._resume_watermark(message.id))
+                    continue
+                
+                self.progress.add_total(1, get_message_size(message))
+                await self._wait_merged_flood_pause()
+                for other, _ in sources:
+                    await other._send_due_retries(target_entity)
+                success = await source._process_single_message(message, target_entity)
+                if success is False and self.shutdown_requested:
+                    return False
+                
+                # Filigrane de la source du message ; les autres sources gardent le leur
+                source._save_progress_data(source._resume_watermark(message.id))
+                if source.messages_processed % self.config.save_progress_interval == 0:
+                    source._checkpoint()
+                if count % self.config.batch_size == 0 and self.config.rate_limit_delay > 0:
+                    await self._interruptible_sleep(self.config.rate_limit_delay)
+            
+            for source, _ in sources:
+                await source._drain_retries(target_entity)
+        except JobAbortedError as e:
+            self._abort_job(e)
+            return False
+        return not self.shutdown_requested
+    
+    async def _wait_merged_flood_pause(self):
+        """Une seule cible : une pause anti-flood subie par une source s'applique à toutes."""
+        remaining = max(source.retry_engine.pause_remaining() for source in self._followers)
+        if remaining > 0:
+            self.logger.warning(f"Rate limited. Waiting {remaining:.0f} seconds...")
+            await self._interruptible_sleep(remaining)
+    
+    async def export_channel(
+        self,
+        source_channel: str,
+        archive_path: str,
+        message_limit: Optional[int] = None
+    ) -> bool:
+        """
+        Export the source channel history to a local archive.
+        
+        Messages are streamed straight from ``iter_messages`` to disk, so memory
+        stays bounded whatever the channel size. Re-running the export on the same
+        archive resumes after the last archived message.
+        
+        Args:
+            source_channel: Source channel username or ID
+            archive_path: Archive directory
+            message_limit: Maximum number of messages to export
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        writer = ArchiveWriter(archive_path, source=str(source_channel))
+        writer_opened = False
+        try:
+            if not self.config.api_id or not self.config.api_hash:
+                self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
+                return False
             
+            await self._connect_user_client()
+            await self._start_runtime_control()
+            await self._start_takeout()
+            
+            source_entity = await self._get_entity(source_channel)
+            if not source_entity:
+                return False
+            self._log_selection()
+            
+            writer.open()
+            writer_opened = True
+            if writer.last_message_id:
+                self.logger.info(
+                    f"Reprise de l'export après le message ID {writer.last_message_id} "
+                    f"({writer.message_count} messages déjà archivés)"
+                )
+            
+            start_time = datetime.now()
+            exported = 0
+            
+            history = self._iter_history(
+                source_entity,
+                min_id=writer.last_message_id,
+                limit=message_limit or None
+            )
+            async for message in history:
+                media_info = None
+                if message.media and self.config.download_media:
+                    media_info = await self._archive_media(writer, message)
+                
+                writer.append(self._archive_record(message, media_info))
+                exported += 1
+                
+                if exported % 100 == 0:
+                    elapsed = (datetime.now() - start_time).total_seconds()
+                    rate = exported / elapsed if elapsed > 0 else 0
+                    self.logger.info(f"Export: {exported} messages ({rate:.1f} messages/s)")
+            
+            duration = datetime.now() - start_time
+            self.logger.info("=== Export Summary ===")
+            self.logger.info(f"Total Duration: {format_duration(duration)}")
+            self.logger.info(f"Messages Exported: {exported} (archive total: {writer.message_count})")
+            self.logger.info(f"Media Stored: {writer.media_stored}")
+            self.logger.info(f"Media Deduplicated: {writer.media_deduplicated}")
+            read_rates = writer.manifest.setdefault('read_rates', {})
+            self.read_meter.record(read_rates, self._read_mode())
+            self.read_meter.log_stats(self.logger, self._read_mode(), read_rates)
+            self.bandwidth.log_stats(self.logger)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erreur pendant l'export: {str(e)}", exc_info=True)
+            return False
+        finally:
+            await self._stop_runtime_control()
+            if writer_opened:
+                writer.close()
+            await self._finish_takeout()
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+    
+    async def reconcile_channel(
+        self,
+        source_channel: str,
+        target_channel: str,
+        dry_run: bool = False,
+        output_file: Optional[str] = None
+    ) -> bool:
+        """
+        Compare the source and target histories and resend what is missing.
+        
+        Both histories are streamed oldest first and aligned by content
+        fingerprint (see reconcile.py), so memory is bounded by RECONCILE_WINDOW
+        whatever the channel sizes. Local progress is ignored on purpose: the
+        target itself is the reference.
+        
+        Args:
+            source_channel: Source channel username or ID
+            target_channel: Target channel username or ID
+            dry_run: Only report missing messages, do not resend them
+            output_file: File receiving the missing source message IDs, one per line
+            
+        Returns:
+            True if the target is (now) complete, False otherwise
+        """
+        output = None
+        try:
+            if not self.config.api_id or not self.config.api_hash:
+                self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
+                return False
+            
+            if not self._load_rules():
+                return False
+            
+            await self._connect_user_client()
+            if not dry_run:
+                await self._connect_bot_client()
+            
+            source_entity = await self._get_source_entity(source_channel)
+            target_entity = await self._get_entity(target_channel)
+            if not source_entity or not target_entity:
+                return False
+            
+            self.progress_key = self._make_progress_key(source_channel, target_channel)
+            
+            # Les renvois arrivent en fin de cible : on ne compare qu'avec l'historique existant
+            latest = await self.client.get_messages(target_entity, limit=1)
+            target_end = latest[0].id if latest else 0
+            
+            async def source_messages():
+                async for message in self._iter_records(source_entity):
+                    # Les messages exclus ou réécrits par les règles sont comparés tels qu'envoyés
+                    if self.rule_engine and not self.rule_engine.apply(message):
+                        continue
+                    yield message
+            
+            async def target_messages():
+                if not target_end:
+                    return
+                async for message in self._iter_records(target_entity, selected=False, max_id=target_end + 1):
+                    yield message
+            
+            # Rafales envoyées fusionnées : appariées par ID source (sans reprendre copied_messages, qui bloquerait les renvois)
+            saved = (load_json(self.config.progress_file) or {}).get(self.progress_key, {})
+            coalesced = CoalescedSends(saved.get('coalesced_messages'))
+            
+            if output_file:
+                output = open(output_file, 'w', encoding='utf-8')
+            
+            self._install_shutdown_handlers()
+            await self._start_runtime_control()
+            aligner = SequenceAligner(self.config.reconcile_window)
+            start_time = datetime.now()
+            self.logger.info(
+                f"Réconciliation en cours (fenêtre {aligner.window}, "
+                f"{'rapport seul' if dry_run else 'renvoi des manquants'})..."
+            )
+            
+            async for message in iter_missing(source_messages(), target_messages(), aligner,
+                                              coalesced.source, coalesced.target):
+                if output:
+                    output.write(f"{message.id}\n")
+                if dry_run:
+                    self.logger.info(f"Manquant: message {message.id}")
+                    continue
+                if self.shutdown_requested:
+                    break
+                
+                await self._process_single_message(message, target_entity)
+                if self.config.rate_limit_delay > 0:
+                    await self._interruptible_sleep(self.config.rate_limit_delay)
+            
+            if not dry_run:
+                await self._drain_retries(target_entity)
+            
+            self.logger.info("=== Reconciliation Summary ===")
+            self.logger.info(f"Total Duration: {format_duration(datetime.now() - start_time)}")
+            self.logger.info(f"Messages Matched: {aligner.matched}")
+            self.logger.info(f"Messages Missing: {aligner.missing}")
+            self.logger.info(f"Target Messages Without Source: {aligner.extra}")
+            if not dry_run:
+                self.logger.info(f"Messages Resent: {self.messages_sent}")
+                self.logger.info(f"Messages Failed: {self.messages_failed}")
+            if self.rule_engine:
+                self.rule_engine.log_stats(self.logger)
+            
+            if self.shutdown_requested:
+                return False
             if dry_run:
-                self.logger.info("MODE TEST - Aucun message ne sera envoyé")
-                await self._dry_run_analysis(messages)
+                return aligner.missing == 0
+            return self.messages_failed == 0
+            
+        except Exception as e:
+            self.logger.error(f"Erreur pendant la réconciliation: {str(e)}", exc_info=True)
+            return False
+        finally:
+            self._remove_shutdown_handlers()
+            await self._stop_runtime_control()
+            if output:
+                output.close()
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+            if self.bot_client:
+                await self.bot_client.disconnect()
+                self.logger.info("Bot déconnecté")
+    
+    async def retry_failed(self, source_channel: str, target_channel: str) -> bool:
+        """
+        Re-send the messages recorded in the dead-letter queue for this channel pair.
+        
+        Only the failed IDs are fetched, with ``get_messages(ids=...)`` in chunks of
+        100, so the cost scales with the number of failures, not the channel size.
+        The resume point of the regular clone is left untouched.
+        
+        Args:
+            source_channel: Source channel username or ID
+            target_channel: Target channel username or ID
+            
+        Returns:
+            True if every failed message was recovered, False otherwise
+        """
+        try:
+            if not self.config.api_id or not self.config.api_hash:
+                self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
+                return False
+            
+            self._load_progress(source_channel, target_channel)
+            failed_ids = [entry['id'] for entry in self.dead_letters.entries(self.progress_key)]
+            if not failed_ids:
+                self.logger.info("Aucun message en échec pour cette paire de canaux")
                 return True
+            self.logger.info(f"{len(failed_ids)} message(s) en échec à renvoyer")
             
-            # Cloner les messages par lots
+            if not self._load_rules():
+                return False
+            
+            await self._connect_user_client()
+            await self._connect_bot_client()
+            
+            source_entity = await self._get_source_entity(source_channel)
+            target_entity = await self._get_entity(target_channel)
+            if not source_entity or not target_entity:
+                return False
+            
+            self._install_shutdown_handlers()
+            await self._start_runtime_control()
             start_time = datetime.now()
-            success = await self._clone_messages_batch(
-                messages, target_entity, total_messages, start_time
+            missing = 0
+            
+            try:
+                for start in range(0, len(failed_ids), DEAD_LETTER_FETCH_CHUNK):
+                    if self.shutdown_requested:
+                        break
+                    chunk = failed_ids[start:start + DEAD_LETTER_FETCH_CHUNK]
+                    fetched = await self.client.get_messages(source_entity, ids=chunk)
+                    
+                    for message_id, message in zip(chunk, fetched):
+                        if message is not None:
+                            message = MessageRecord.from_message(message)
+                        if message is None:
+                            # Supprimé de la source : plus rien à renvoyer
+                            self.logger.warning(f"Message {message_id} introuvable dans la source, retiré de la file")
+                            self.dead_letters.resolve(self.progress_key, message_id)
+                            missing += 1
+                            continue
+                        if self.rule_engine and not self.rule_engine.apply(message):
+                            self.dead_letters.resolve(self.progress_key, message_id)
+                            continue
+                        if self.shutdown_requested:
+                            break
+                        await self._process_single_message(message, target_entity)
+                        if self.config.rate_limit_delay > 0:
+                            await self._interruptible_sleep(self.config.rate_limit_delay)
+                
+                await self._drain_retries(target_entity)
+            except JobAbortedError as e:
+                self._abort_job(e)
+            
+            for message_id in failed_ids:
+                if message_id in self.copied_messages:
+                    self.dead_letters.resolve(self.progress_key, message_id)
+            self.dead_letters.compact()
+            self._save_progress(source_channel, target_channel, completed=self.progress_data.get('completed', False))
+            
+            remaining = len(self.dead_letters.entries(self.progress_key))
+            self.logger.info("=== Retry Summary ===")
+            self.logger.info(f"Total Duration: {format_duration(datetime.now() - start_time)}")
+            self.logger.info(f"Messages Recovered: {self.messages_sent}")
+            self.logger.info(f"Messages Gone From Source: {missing}")
+            self.logger.info(f"Messages Still Failing: {remaining}")
+            self.retry_engine.log_stats(self.logger)
+            
+            return remaining == 0 and not self.job_aborted and not self.shutdown_requested
+            
+        except Exception as e:
+            self.logger.error(f"Erreur pendant le renvoi des messages en échec: {str(e)}", exc_info=True)
+            return False
+        finally:
+            self._remove_shutdown_handlers()
+            await self._stop_runtime_control()
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+            if self.bot_client:
+                await self.bot_client.disconnect()
+                self.logger.info("Bot déconnecté")
+    
+    async def run_worker(self, source_channel: str, target_channel: str) -> bool:
+        """
+        Clone the channel as one worker of a multi-node job (see coordinator.py).
+        
+        The first worker splits the source ID range into chunks in the shared
+        coordinator database; every worker then leases chunks until none is
+        left, renewing its lease while it works. In ordered mode, chunks are
+        first staged as archives on the shared storage, then published one at
+        a time in ID order.
+        
+        Args:
+            source_channel: Source channel username or ID
+            target_channel: Target channel username or ID
+            
+        Returns:
+            True if every chunk of the job was sent, False otherwise
+        """
+        coordinator = None
+        try:
+            if not self.config.api_id or not self.config.api_hash:
+                self.logger.error("Les identifiants API sont requis. Veuillez vérifier votre fichier .env.")
+                return False
+            
+            if not self._load_rules():
+                return False
+            if not self._load_media_stage():
+                return False
+            
+            await self._connect_user_client()
+            await self._connect_bot_client()
+            
+            source_entity = await self._get_source_entity(source_channel)
+            target_entity = await self._get_entity(target_channel)
+            if not source_entity or not target_entity:
+                return False
+            
+            self.progress_key = self._make_progress_key(source_channel, target_channel)
+            # Ouverture de la base partagée (verrou possible) hors de la boucle asyncio
+            coordinator = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                LeaseCoordinator,
+                self.config.coordinator_db,
+                self.progress_key,
+                self.config.worker_id,
+                lease_seconds=self.config.lease_seconds
+            ))
+            
+            latest = await self.client.get_messages(source_entity, limit=1)
+            if not latest:
+                self.logger.warning("Aucun message trouvé à cloner")
+                return True
+            if await coordinator.run(
+                coordinator.plan, 1, latest[0].id, self.config.coordinator_chunk_size, self.config.coordinator_mode
+            ):
+                self.logger.info(
+                    f"Plan créé: IDs 1-{latest[0].id} en tranches de {self.config.coordinator_chunk_size} "
+                    f"(mode {self.config.coordinator_mode})"
+                )
+            else:
+                mode = await coordinator.run(lambda: coordinator.mode)
+                if mode != self.config.coordinator_mode:
+                    self.logger.warning(f"Plan existant en mode {mode}, utilisé tel quel")
+            
+            self.logger.info(f"Worker {self.config.worker_id} prêt ({self.config.coordinator_db})")
+            self._install_shutdown_handlers()
+            await self._start_runtime_control()
+            self.progress.start()
+            start_time = datetime.now()
+            chunks_done = 0
+            
+            while not self.shutdown_requested and not self.job_aborted:
+                lease = await coordinator.run(coordinator.acquire)
+                if lease is None:
+                    if await coordinator.run(coordinator.finished):
+                        break
+                    # Tranches toutes sous bail ailleurs (ou publication en attente de préparation)
+                    await self._interruptible_sleep(max(1.0, self.config.lease_seconds / 6))
+                    continue
+                if await self._run_lease(coordinator, lease, source_entity, target_entity, start_time):
+                    chunks_done += 1
+            
+            counts = await coordinator.run(coordinator.counts)
+            self._print_summary(start_time)
+            self.logger.info(
+                f"Chunks: {chunks_done} done by this worker, job {counts['done']} done / "
+                f"{counts['staged']} staged / {counts['pending']} pending"
+            )
+            finished = counts['pending'] == 0 and counts['staged'] == 0
+            return finished and not self.job_aborted and not self.shutdown_requested
+            
+        except Exception as e:
+            self.logger.error(f"Erreur du worker: {str(e)}", exc_info=True)
+            return False
+        finally:
+            self._remove_shutdown_handlers()
+            await self.progress.stop()
+            if self.media_stage:
+                self.media_stage.close()
+            await self._stop_runtime_control()
+            if coordinator:
+                await asyncio.get_running_loop().run_in_executor(None, coordinator.close)
+            if self.client:
+                await self.client.disconnect()
+                self.logger.info("Déconnecté de Telegram")
+            if self.bot_client:
+                await self.bot_client.disconnect()
+                self.logger.info("Bot déconnecté")
+    
+    async def run_shard(self, conn, source_channel: str, target_channel: str, report_interval: float = 10.0) -> bool:
+        """
+        Serve ID ranges sent by the parent process over a pipe (see sharding.py).
+        
+        Args:
+            conn: Pipe connection to the parent process
+            source_channel: Source channel username or ID
+            target_channel: Target channel username or ID
+            report_interval: Seconds between two counter reports to the parent
+            
+        Returns:
+            True if stopped by the parent after every range, False otherwise
+        """
+        reporter = None
+        try:
+            if not self._load_rules() or not self._load_media_stage():
+                conn.send(('error', "configuration invalide"))
+                return False
+            
+            await self._connect_user_client()
+            await self._connect_bot_client()
+            source_entity = await self._get_source_entity(source_channel)
+            target_entity = await self._get_entity(target_channel)
+            if not source_entity or not target_entity:
+                conn.send(('error', "canal source ou cible introuvable"))
+                return False
+            
+            latest = await self.client.get_messages(source_entity, limit=1)
+            conn.send(('ready', latest[0].id if latest else 0))
+            
+            self.progress_key = self._make_progress_key(source_channel, target_channel)
+            self.external_checkpoints = True
+            # SIGTERM seulement : le parent transmet l'arrêt, SIGINT du terminal reste ignoré
+            loop = asyncio.get_running_loop()
+            self._stop_event = asyncio.Event()
+            loop.add_signal_handler(signal.SIGTERM, self.request_stop, 'SIGTERM')
+            self._signals_installed.append(signal.SIGTERM)
+            if report_interval > 0:
+                reporter = asyncio.ensure_future(self._report_shard_counters(conn, report_interval))
+            
+            start_time = datetime.now()
+            while True:
+                command = await loop.run_in_executor(None, conn.recv)
+                if command[0] == 'stop':
+                    return True
+                _, start_id, after_id, end_id = command
+                self.progress_data['last_message_id'] = after_id
+                self._clone_task = asyncio.ensure_future(
+                    self._clone_id_range(source_entity, target_entity, after_id, end_id, start_time)
+                )
+                try:
+                    success = await self._clone_task
+                except asyncio.CancelledError:
+                    if not self.shutdown_requested:
+                        raise
+                    success = False
+                cursor = end_id if success else self.progress_data.get('last_message_id', after_id)
+                conn.send(('done', start_id, cursor, self._shard_counters()))
+                if self.job_aborted:
+                    return False
+            
+        except (EOFError, OSError):
+            # Parent disparu : plus personne à qui rendre compte
+            return False
+        except Exception as e:
+            self.logger.error(f"Erreur du processus d'envoi: {str(e)}", exc_info=True)
+            try:
+                conn.send(('error', str(e)))
+            except (EOFError, OSError):
+                pass
+            return False
+        finally:
+            if reporter:
+                reporter.cancel()
+            self._remove_shutdown_handlers()
+            if self.media_stage:
+                self.media_stage.close()
+            if self.client:
+                await self.client.disconnect()
+            if self.bot_client:
+                await self.bot_client.disconnect()
+            conn.close()
+    
+    async def _report_shard_counters(self, conn, interval: float):
+        """Envoie périodiquement les compteurs au processus parent."""
+        while True:
+            await asyncio.sleep(interval)
+            conn.send(('progress', self._shard_counters()))
+    
+    def _shard_counters(self) -> Dict[str, int]:
+        return {
+            'processed': self.messages_processed,
+            'sent': self.messages_sent,
+            'failed': self.messages_failed,
+            'skipped_duplicate': self.messages_skipped_duplicate,
+        }
+    
+    async def _run_lease(
+        self,
+        coordinator: LeaseCoordinator,
+        lease: Lease,
+        source_entity,
+        target_entity,
+        start_time: datetime
+    ) -> bool:
+        """
+        Traite une tranche sous bail en renouvelant le bail ; la rend en cas d'échec.
+        
+        Un worker dont le bail a été réattribué ne doit plus rien écrire : la
+        préparation se fait dans un répertoire propre au bail, renommé une fois
+        terminée, et chaque envoi vérifie d'abord que le bail est toujours le nôtre.
+        """
+        self.logger.info(f"Tranche {lease.start_id}-{lease.end_id}: {lease.phase} (reprise après l'ID {lease.cursor})")
+        # Le curseur de la tranche est tenu par le coordinateur, pas par le fichier de progression
+        self.external_checkpoints = True
+        self.progress_data['last_message_id'] = lease.cursor
+        if lease.phase == PHASE_STAGE:
+            work = self._stage_chunk(lease, source_entity)
+        else:
+            work = self._send_chunk(lease, source_entity, target_entity, start_time)
+        self._lease = (coordinator, lease)
+        self._clone_task = asyncio.ensure_future(work)
+        heartbeat = asyncio.ensure_future(self._heartbeat_lease(coordinator, lease))
+        try:
+            success = await self._clone_task
+        except asyncio.CancelledError:
+            # Bail perdu ou échéance d'arrêt : la tranche sera reprise depuis son curseur
+            if not self.shutdown_requested and not heartbeat.done():
+                raise
+            success = False
+        except LeaseLostError as e:
+            self.logger.warning(f"{e}: abandon de la tranche")
+            success = False
+        except Exception as e:
+            self.logger.error(f"Échec de la tranche {lease.start_id}-{lease.end_id}: {str(e)}", exc_info=True)
+            success = False
+        finally:
+            heartbeat.cancel()
+            self._lease = None
+        
+        try:
+            if success:
+                if lease.phase == PHASE_STAGE:
+                    # Bail confirmé juste avant de rendre l'archive visible sous son nom définitif
+                    await coordinator.run(coordinator.heartbeat, lease)
+                    self._promote_staging(lease)
+                await coordinator.run(coordinator.complete, lease)
+                if lease.phase == PHASE_PUBLISH:
+                    self._remove_staging(lease)
+                return True
+            released = await coordinator.run(coordinator.release, lease, self._lease_cursor(lease))
+            if released and lease.phase == PHASE_STAGE:
+                # Archive partielle laissée au prochain bail de la tranche
+                self._park_staging(lease)
+        except LeaseLostError as e:
+            self.logger.warning(str(e))
+        if not self.shutdown_requested:
+            # Évite de reprendre aussitôt une tranche qui échoue
+            await self._interruptible_sleep(self.config.retry_delay)
+        return False
+    
+    async def _heartbeat_lease(self, coordinator: LeaseCoordinator, lease: Lease):
+        """Renouvelle le bail au tiers de sa durée ; annule le travail si le bail est perdu."""
+        while True:
+            await asyncio.sleep(coordinator.lease_seconds / 3)
+            try:
+                await coordinator.run(coordinator.heartbeat, lease, self._lease_cursor(lease))
+            except LeaseLostError as e:
+                self.logger.warning(f"{e}: abandon de la tranche")
+                self._clone_task.cancel()
+                return
+    
+    def _lease_cursor(self, lease: Lease) -> Optional[int]:
+        """Dernier ID sûr de la tranche (une préparation reprend sur sa propre archive)."""
+        if lease.phase == PHASE_STAGE:
+            return None
+        return self.progress_data.get('last_message_id', lease.cursor)
+    
+    def _staging_path(self, lease: Lease, suffix: str = '') -> str:
+        """Archive préparée d'une tranche ; suffix désigne une archive en cours (jeton du bail) ou laissée."""
+        staging_dir = self.config.coordinator_staging_dir or f"{self.config.coordinator_db}.staging"
+        return os.path.join(staging_dir, self.progress_key, f"chunk-{lease.start_id}{suffix}")
+    
+    def _promote_staging(self, lease: Lease):
+        """Rend l'archive du bail visible sous le nom lu par la publication."""
+        final = self._staging_path(lease)
+        # Archive complète d'un ancien bail renommée trop tard : remplacée
+        shutil.rmtree(final, ignore_errors=True)
+        os.rename(self._staging_path(lease, f".{lease.token}"), final)
+    
+    def _park_staging(self, lease: Lease):
+        """Laisse l'archive partielle d'un bail rendu au prochain bail de la tranche."""
+        current = self._staging_path(lease, f".{lease.token}")
+        if os.path.isdir(current):
+            parked = self._staging_path(lease, '.partial')
+            shutil.rmtree(parked, ignore_errors=True)
+            os.rename(current, parked)
+    
+    def _remove_staging(self, lease: Lease):
+        """Supprime l'archive publiée et les archives abandonnées par des baux perdus."""
+        final = self._staging_path(lease)
+        parent = os.path.dirname(final)
+        prefix = os.path.basename(final) + '.'
+        shutil.rmtree(final, ignore_errors=True)
+        if os.path.isdir(parent):
+            for name in os.listdir(parent):
+                if name.startswith(prefix):
+                    shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+    
+    async def _check_lease(self):
+        """Vérifie, avant un envoi, que le bail en cours n'a pas été réattribué."""
+        coordinator, lease = self._lease
+        if not await coordinator.run(coordinator.holds, lease):
+            raise LeaseLostError(f"Bail perdu sur la tranche {lease.start_id}-{lease.end_id}")
+    
+    async def _stage_chunk(self, lease: Lease, source_entity) -> bool:
+        """Archive une tranche sur le stockage partagé, en attente de publication ordonnée."""
+        path = self._staging_path(lease, f".{lease.token}")
+        parked = self._staging_path(lease, '.partial')
+        if os.path.isdir(parked):
+            # Reprise de l'archive laissée par un bail rendu proprement
+            os.rename(parked, path)
+        writer = ArchiveWriter(path, source=str(source_entity.id))
+        writer.open()
+        try:
+            async for message in self._iter_history(
+                source_entity,
+                min_id=max(lease.start_id - 1, writer.last_message_id),
+                max_id=lease.end_id + 1
+            ):
+                if self.shutdown_requested:
+                    return False
+                media_info = None
+                if message.media and self.config.download_media:
+                    media_info = await self._archive_media(writer, message)
+                writer.append(self._archive_record(message, media_info))
+            return True
+        finally:
+            writer.close()
+    
+    async def _send_chunk(self, lease: Lease, source_entity, target_entity, start_time: datetime) -> bool:
+        """Envoie une tranche, depuis la source (sans ordre) ou depuis son archive préparée (ordonné)."""
+        if lease.phase == PHASE_PUBLISH:
+            reader = ArchiveReader(self._staging_path(lease))
+            reader.open()
+            try:
+                messages = list(reader.iter_messages(min_id=lease.cursor))
+            finally:
+                reader.close()
+            if self.rule_engine:
+                messages = self.rule_engine.filter(messages)
+            if not messages:
+                return True
+            return await self._clone_messages_batch(messages, target_entity, len(messages), start_time)
+        return await self._clone_id_range(source_entity, target_entity, lease.cursor, lease.end_id, start_time)
+    
+    async def _clone_id_range(self, source_entity, target_entity, after_id: int, end_id: int, start_time: datetime) -> bool:
+        """Clone les messages source d'IDs after_id (exclu) à end_id (inclus)."""
+        messages = [
+            message async for message in self._iter_records(source_entity, min_id=after_id, max_id=end_id + 1)
+        ]
+        if self.rule_engine:
+            messages = self.rule_engine.filter(messages)
+        if not messages:
+            return True
+        return await self._clone_messages_batch(messages, target_entity, len(messages), start_time)
+    
+    async def _archive_media(self, writer: ArchiveWriter, message: Message) -> Optional[Dict[str, Any]]:
+        """Télécharge le média d'un message dans l'archive, sauf s'il y est déjà."""
+        # Seuls les photos et documents ont un identifiant propre : aperçus de lien, contacts,
+        # positions... (identité None) sont toujours téléchargés
+        identity = media_identity(message.media)
+        known = writer.lookup_media(identity)
+        if known:
+            return known
+        
+        try:
+            path = await asyncio.wait_for(
+                self._history_client().download_media(
+                    message,
+                    file=writer.temp_dir + os.sep,
+                    progress_callback=self.bandwidth.download_callback()
+                ),
+                timeout=self.config.media_timeout
             )
-            
-            # Sauvegarder la progression finale
-            self._save_progress(source_channel, target_channel, completed=success)
-            
-            # Afficher le résumé
-            self._print_summary(start_time)
-            
-            return success
-            
         except Exception as e:
-            self.logger.error(f"Erreur pendant le clonage: {str(e)}", exc_info=True)
+            self.logger.warning(f"Échec du téléchargement du média pour message {message.id}: {str(e)}")
+            return None
+        
+        if not path:
+            return None
+        
+        document = getattr(message.media, 'document', None)
+        mime_type = getattr(document, 'mime_type', None) or ""
+        return writer.store_media(path, identity, mime_type)
+    
+    def _archive_record(self, message: Message, media_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Construit l'enregistrement d'archive d'un message."""
+        return {
+            'id': message.id,
+            'date': message.date.isoformat() if message.date else None,
+            'text': message.message or "",
+            'entities': serialize_entities(message.entities),
+            'grouped_id': message.grouped_id,
+            'type': get_message_type(message),
+            'size': get_message_size(message),
+            'media': media_info
+        }
+    
+    async def _connect_user_client(self):
+        """Crée et démarre le client Telegram du compte utilisateur."""
+        self.client = TelegramClient(
+            self.config.session_name,
+            self.config.api_id,
+            self.config.api_hash
+        )
+        
+        await self.client.start()
+        self.logger.info("Connecté à Telegram avec votre compte")
+    
+    def _load_media_stage(self) -> bool:
+        """Prépare l'étape de transformation des médias si MEDIA_TRANSFORMS est configuré."""
+        if not self.config.media_transforms:
+            return True
+        try:
+            self.media_stage = MediaTransformStage(
+                self.config.media_transforms,
+                options={
+                    'watermark_text': self.config.media_watermark_text,
+                    'max_dimension': self.config.media_max_dimension,
+                },
+                workers=self.config.media_transform_workers
+            )
+        except ValueError as e:
+            self.logger.error(f"Transformation des médias impossible: {str(e)}")
             return False
-        finally:
-            if self.client:
-                await self.client.disconnect()
-                self.logger.info("Déconnecté de Telegram")
-            if self.bot_client:
-                await self.bot_client.disconnect()
-                self.logger.info("Bot déconnecté")
+        self.media_stage.start()
+        self._media_slots = asyncio.Semaphore(self.config.media_transform_queue)
+        self.logger.info(
+            f"Transformation des médias: {', '.join(self.media_stage.transforms)} "
+            f"({self.media_stage.workers} processus, {self.config.media_transform_queue} médias préparés d'avance)"
+        )
+        return True
+    
+    def _load_rules(self) -> bool:
+        """Compile les règles de filtrage si un fichier est configuré."""
+        if not self.config.rules_file:
+            return True
+        try:
+            self.rule_engine = RuleEngine.from_file(self.config.rules_file)
+        except ValueError as e:
+            self.logger.error(f"Fichier de règles invalide: {str(e)}")
+            return False
+        self.logger.info(
+            f"Règles chargées: {len(self.rule_engine.rules)} règles, "
+            f"{len(self.rule_engine.substitution_names)} substitutions"
+        )
+        return True
+    
+    async def _connect_bot_client(self):
+        """Démarre le client bot si l'envoi par bot est configuré."""
+        if not self.config.use_bot_for_sending:
+            return
+        self.bot_client = TelegramClient(
+            f"{self.config.session_name}_bot",
+            self.config.api_id,
+            self.config.api_hash
+        )
+        await self.bot_client.start(bot_token=self.config.bot_token)
+        self.logger.info("Bot connecté pour l'envoi des messages")
     
     async def _get_entity(self, channel_identifier: str):
         """Obtient l'entité Telegram pour un canal (supporte username et ID)."""
@@ -180,7 +1532,14 @@ class TelegramCloner:
             self.logger.error(f"Erreur lors de l'obtention de l'entité pour {channel_identifier}: {str(e)}")
         return None
     
-    async def _get_messages(self, source_entity, message_limit: Optional[int]) -> List[Message]:
+    async def _get_source_entity(self, source_channel: str):
+        """Obtient l'entité source et prépare la relecture des références de fichiers expirées."""
+        entity = await self._get_entity(source_channel)
+        if entity:
+            self.file_refs = FileReferenceRefresher(self.client, entity)
+        return entity
+    
+    async def _get_messages(self, source_entity, message_limit: Optional[int]) -> List[MessageRecord]:
         """Get messages from source channel."""
         try:
             if not self.client:
@@ -192,12 +1551,13 @@ class TelegramCloner:
             
             self.logger.info("Fetching messages from source channel...")
             
-            async for message in self.client.iter_messages(
+            async for message in self._iter_records(
                 source_entity,
-                reverse=True,
                 min_id=last_message_id,
                 limit=message_limit or None
             ):
+                if self.shutdown_requested:
+                    break
                 if message.id <= last_message_id:
                     continue
                 messages.append(message)
@@ -207,14 +1567,69 @@ class TelegramCloner:
             self.logger.error(f"Error fetching messages: {str(e)}")
             return []
     
+    def _get_archived_messages(self, reader: ArchiveReader, message_limit: Optional[int]) -> List[ArchivedMessage]:
+        """Lit d'un bloc les messages d'une archive locale (analyse du mode test uniquement)."""
+        try:
+            last_message_id = self.progress_data.get('last_message_id', 0)
+            self.logger.info(f"Lecture de l'archive ({len(reader)} messages archivés)...")
+            return list(reader.iter_messages(min_id=last_message_id, limit=message_limit or None))
+        except Exception as e:
+            self.logger.error(f"Erreur de lecture de l'archive: {str(e)}")
+            return []
+    
     async def _clone_messages_batch(
+        self,
+        messages: List[Message],
+        target_entity,
+        total_messages: int,
+        start_time: datetime,
+        drain_retries: bool = True
+    ) -> bool:
+        """
+        Clone messages in batches with rate limiting.
+        
+        Args:
+            drain_retries: Wait for pending retries at the end (False when more batches follow)
+        """
+        if self.config.coalesce_enabled:
+            messages = self._coalesce(messages)
+            total_messages = len(messages)
+        self.progress.add_total(len(messages), sum(get_message_size(message) for message in messages))
+        if self.file_refs:
+            self.file_refs.track(messages)
+        
+        # Sans file propre (cibles d'une diffusion), le média est préparé une fois à l'envoi
+        prefetch = asyncio.ensure_future(self._prefetch_media(messages)) if self._media_slots else None
+        try:
+            if self.config.scheduler_mode in ('unordered', 'window'):
+                success = await self._clone_messages_scheduled(messages, target_entity, total_messages, start_time)
+            else:
+                success = await self._clone_messages_sequential(messages, target_entity, total_messages, start_time)
+            if success and drain_retries:
+                await self._drain_retries(target_entity)
+        except JobAbortedError as e:
+            self._abort_job(e)
+            return False
+        finally:
+            if prefetch:
+                prefetch.cancel()
+                for message_id in list(self._prepared_media):
+                    self._release_prepared(message_id)
+                self._media_taken.clear()
+            if self.file_refs:
+                for message in messages:
+                    self.file_refs.discard(message.id)
+        
+        return success and not self.shutdown_requested
+    
+    async def _clone_messages_sequential(
         self,
         messages: List[Message],
         target_entity,
         total_messages: int,
         start_time: datetime
     ) -> bool:
-        """Clone messages in batches with rate limiting."""
+        """Clone messages in order, batch after batch."""
         batch_messages = []
         
         for i, message in enumerate(messages, 1):
@@ -222,9 +1637,7 @@ class TelegramCloner:
             
             # Process batch when full or at end
             if len(batch_messages) >= self.config.batch_size or i == total_messages:
-                success = await self._process_message_batch(
-                    batch_messages, target_entity, i, total_messages, start_time
-                )
+                success = await self._process_message_batch(batch_messages, target_entity)
                 
                 if not success:
                     return False
@@ -233,67 +1646,522 @@ class TelegramCloner:
                 
                 # Rate limiting delay between batches
                 if i < total_messages and self.config.rate_limit_delay > 0:
-                    await asyncio.sleep(self.config.rate_limit_delay)
+                    await self._interruptible_sleep(self.config.rate_limit_delay)
         
         return True
     
-    async def _process_message_batch(
+    async def _clone_in_rounds(
         self,
-        messages: List[Message],
+        source_entity,
+        archive_reader: Optional[ArchiveReader],
         target_entity,
-        current_index: int,
-        total_messages: int,
+        message_limit: Optional[int],
         start_time: datetime
     ) -> bool:
+        """
+        Récupère et envoie les messages par tranches pour rester sous le budget mémoire.
+        
+        La récupération d'une tranche s'interrompt dès que le budget est dépassé ;
+        la taille des tranches est alors divisée par deux, puis regagne du terrain
+        quand la mémoire redescend sous la moitié du budget. Les relances d'une
+        tranche partent pendant la récupération de la suivante, et les IDs copiés
+        sous le point de reprise sont oubliés à chaque tranche.
+        """
+        chunk_size = self.config.memory_chunk_size
+        cursor = self.progress_data.get('last_message_id', 0)
+        remaining = message_limit or None
+        try:
+            while not self.shutdown_requested:
+                limit = chunk_size if remaining is None else min(chunk_size, remaining)
+                if limit <= 0:
+                    break
+                
+                messages = await self._fetch_round(source_entity, archive_reader, target_entity, cursor, limit)
+                if not messages:
+                    break
+                
+                cursor = messages[-1].id
+                if remaining is not None:
+                    remaining -= len(messages)
+                self.logger.info(f"Tranche de {len(messages)} messages récupérée (jusqu'à l'ID {cursor})")
+                
+                if self.rule_engine:
+                    messages = self.rule_engine.filter(messages)
+                # Relances laissées en file : envoyées pendant la récupération de la tranche suivante
+                if messages and not await self._clone_messages_batch(
+                    messages, target_entity, len(messages), start_time, drain_retries=False
+                ):
+                    return False
+                
+                del messages
+                self._trim_copied_messages()
+                self._checkpoint()
+                gc.collect()
+                chunk_size = self._adapt_chunk_size(chunk_size)
+            else:
+                return False
+            
+            await self._drain_retries(target_entity)
+            return not self.shutdown_requested
+        except JobAbortedError as e:
+            self._abort_job(e)
+            return False
+        finally:
+            if archive_reader is not None:
+                archive_reader.close()
+    
+    async def _fetch_round(
+        self,
+        source_entity,
+        archive_reader: Optional[ArchiveReader],
+        target_entity,
+        min_id: int,
+        limit: int
+    ) -> List[Message]:
+        """Récupère une tranche ; les relances échues sont envoyées pendant la lecture."""
+        async def fetch():
+            messages = []
+            async for message in self._iter_source(source_entity, archive_reader, min_id, limit):
+                messages.append(message)
+                if len(messages) % MEMORY_CHECK_INTERVAL == 0 and self.memory_monitor.over_budget():
+                    # Pause de la récupération : on envoie d'abord ce qui est en mémoire
+                    break
+            return messages
+        
+        task = asyncio.ensure_future(fetch())
+        try:
+            while self.retry_engine.pending and not task.done() and not self.shutdown_requested:
+                await asyncio.wait({task}, timeout=self.retry_engine.next_due_in())
+                await self._send_due_retries(target_entity)
+            return await task
+        finally:
+            task.cancel()
+    
+    def _trim_copied_messages(self):
+        """Oublie les IDs copiés sous le point de reprise : ils ne seront plus jamais relus."""
+        watermark = self.progress_data.get('last_message_id', 0)
+        self.copied_messages = {message_id for message_id in self.copied_messages if message_id > watermark}
+    
+    async def _iter_source(self, source_entity, archive_reader: Optional[ArchiveReader], min_id: int, limit: int):
+        """Parcourt les messages source après min_id, depuis Telegram ou une archive."""
+        if archive_reader is not None:
+            for message in archive_reader.iter_messages(min_id=min_id, limit=limit):
+                yield message
+            return
+        async for message in self._iter_records(source_entity, min_id=min_id, limit=limit):
+            yield message
+    
+    async def _iter_records(self, entity, selected: bool = True, **kwargs):
+        """
+        Parcourt un canal du plus ancien au plus récent, en enregistrements compacts.
+        
+        Les messages Telethon sont convertis dès leur réception : files d'envoi,
+        relances et fenêtres de comparaison ne retiennent que des MessageRecord.
+        """
+        async for message in self._iter_history(entity, selected, **kwargs):
+            yield MessageRecord.from_message(message)
+    
+    def _iter_history(self, entity, selected: bool = True, **kwargs):
+        """
+        Messages Telethon d'un canal, du plus ancien au plus récent.
+        
+        Args:
+            entity: Channel to read
+            selected: Restrict the read to the message selection (source channels only)
+            **kwargs: iter_messages arguments (min_id, max_id, limit)
+        """
+        client = self._history_client()
+        
+        def open_stream(**query):
+            return self.read_meter.iterate(client.iter_messages(entity, reverse=True, **query))
+        
+        if selected and self.selection.active:
+            return self.selection.iterate(open_stream, **kwargs)
+        return open_stream(**kwargs)
+    
+    def _log_selection(self):
+        if self.selection.active:
+            self.logger.info(f"Sélection côté serveur: {self.selection.describe()}")
+    
+    def _history_client(self):
+        """Client de lecture de l'historique : la session takeout si elle est ouverte."""
+        return self.takeout.reader if self.takeout and self.takeout.active else self.client
+    
+    def _read_mode(self) -> str:
+        return MODE_TAKEOUT if self.takeout and self.takeout.active else MODE_NORMAL
+    
+    async def _start_takeout(self):
+        """Ouvre la session takeout si USE_TAKEOUT est activé (repli silencieux sur la session normale)."""
+        if not self.config.use_takeout:
+            return
+        self.takeout = TakeoutSession(
+            self.client, self.logger, self.config.takeout_max_wait, files=self.config.download_media
+        )
+        await self.takeout.open()
+    
+    async def _finish_takeout(self):
+        if self.takeout:
+            await self.takeout.finish(success=not self.shutdown_requested)
+    
+    def _adapt_chunk_size(self, chunk_size: int) -> int:
+        """Réduit les tranches sous pression mémoire, les rétablit quand elle retombe."""
+        if self.memory_monitor.over_budget():
+            reduced = max(MIN_MEMORY_CHUNK, chunk_size // 2)
+            self.logger.warning(
+                f"Pression mémoire (RSS {format_file_size(self.memory_monitor.usage())} / budget "
+                f"{format_file_size(self.memory_monitor.budget)}): tranches réduites à {reduced} messages"
+            )
+            return reduced
+        if chunk_size < self.config.memory_chunk_size and self.memory_monitor.usage() < self.memory_monitor.budget / 2:
+            return min(self.config.memory_chunk_size, chunk_size * 2)
+        return chunk_size
+    
+    async def _prefetch_media(self, messages: List[Message]):
+        """Télécharge et transforme les médias en avance, dans la limite de la file bornée."""
+        for message in messages:
+            if not self.media_stage.applies_to(message) or message.id in self.copied_messages:
+                continue
+            await self._media_slots.acquire()
+            if message.id in self._media_taken:
+                # Déjà préparé directement par l'envoi, qui a rattrapé la préparation
+                self._media_taken.discard(message.id)
+                self._media_slots.release()
+                continue
+            self._prepared_media[message.id] = asyncio.ensure_future(self._prepare_media(message))
+    
+    async def _prepare_media(self, message) -> str:
+        """Télécharge le média (sauf s'il est déjà local) et le transforme dans le pool."""
+        if isinstance(message.media, str):
+            return await self.media_stage.transform(message.media)
+        
+        path = self.media_stage.new_path()
+        stale_media = message.media
+        try:
+            downloaded = await self._download_to(message.media, path)
+        except Exception as e:
+            if not (is_file_reference_error(e) and self.file_refs):
+                raise
+            if await self.file_refs.refresh(message, stale_media) is None:
+                raise
+            downloaded = await self._download_to(message.media, path)
+        if not downloaded:
+            raise IOError(f"Téléchargement du média du message {message.id} impossible")
+        try:
+            return await self.media_stage.transform(downloaded)
+        finally:
+            os.remove(downloaded)
+    
+    async def _download_to(self, media, path: str) -> Optional[str]:
+        return await asyncio.wait_for(
+            self.client.download_media(media, file=path, progress_callback=self.bandwidth.download_callback()),
+            timeout=self.config.media_timeout
+        )
+    
+    async def _outgoing_media(self, message):
+        """
+        Média à envoyer : l'original, ou le fichier transformé si l'étape s'applique.
+        
+        Returns:
+            (media, temporary file to delete after sending or None)
+        """
+        if not (self.media_stage and self.config.download_media and self.media_stage.applies_to(message)):
+            return message.media, None
+        future = self._prepared_media.pop(message.id, None)
+        if future is None:
+            self._media_taken.add(message.id)
+            path = await self._prepare_media(message)
+        else:
+            try:
+                path = await future
+            finally:
+                self._media_slots.release()
+        return path, path
+    
+    def _release_prepared(self, message_id: int):
+        """Libère la place d'un média préparé qui ne sera pas envoyé (doublon, déjà copié, arrêt)."""
+        future = self._prepared_media.pop(message_id, None)
+        if future is None:
+            return
+        future.add_done_callback(_remove_prepared_file)
+        future.cancel()
+        self._media_slots.release()
+    
+    def _coalesce(self, messages: List[Message]) -> List[Message]:
+        """Fusionne les rafales de messages texte courts en envois uniques."""
+        merged = coalesce_messages(
+            messages,
+            max_gap=self.config.coalesce_max_gap,
+            max_length=self.config.coalesce_max_length,
+            separator=self.config.coalesce_separator
+        )
+        saved = len(messages) - len(merged)
+        if saved:
+            self.messages_coalesced += saved
+            self.logger.info(f"Regroupement: {len(messages)} messages en {len(merged)} envois ({saved} envois économisés)")
+        return merged
+    
+    async def _process_message_batch(self, messages: List[Message], target_entity) -> bool:
         """Process a batch of messages."""
         for message in messages:
-            success = await self._clone_single_message(message, target_entity)
+            # Arrêt demandé : ne plus démarrer de nouvel envoi
+            if self.shutdown_requested:
+                return False
             
-            self.messages_processed += 1
-            if success:
-                self.messages_sent += 1
-            else:
-                self.messages_failed += 1
+            await self._send_due_retries(target_entity)
+            
+            success = await self._process_single_message(message, target_entity)
+            if success is False and self.shutdown_requested:
+                # Envoi interrompu : le point de reprise reste avant ce message
+                return False
             
             # Update progress
+            self._save_progress_data(self._resume_watermark(message.id))
             if self.messages_processed % self.config.save_progress_interval == 0:
-                self._save_progress_data(message.id)
-            
-            # Log progress
-            if self.messages_processed % 10 == 0:
-                self._log_progress(current_index, total_messages, start_time)
+                self._checkpoint()
         
         return True
     
-    async def _clone_single_message(self, message: Message, target_entity) -> bool:
-        """Clone un seul message avec logique de retry et vérification des doublons."""
+    async def _clone_messages_scheduled(
+        self,
+        messages: List[Message],
+        target_entity,
+        total_messages: int,
+        start_time: datetime
+    ) -> bool:
+        """Clone messages through priority lanes so large media never blocks text."""
+        window = self.config.reorder_window if self.config.scheduler_mode == 'window' else None
+        
+        rate_limiter = RateLimiter(self._lane_send_interval())
+        self._send_rate_limiter = rate_limiter
+        
+        def on_done(position: int, message, success: bool):
+            # Seul le préfixe contigu de messages terminés est sûr pour la reprise
+            if scheduler.reorder.prefix:
+                self._save_progress_data(self._resume_watermark(messages[scheduler.reorder.prefix - 1].id))
+            if self.messages_processed % self.config.save_progress_interval == 0:
+                self._checkpoint()
+        
+        async def send(message):
+            try:
+                await self._send_due_retries(target_entity)
+                return await self._process_single_message(message, target_entity)
+            except JobAbortedError as e:
+                self._abort_job(e)
+                scheduler.stop()
+                return False
+        
+        scheduler = LaneScheduler(
+            send=send,
+            classify=self._classify_lane,
+            rate_limiter=rate_limiter,
+            small_concurrency=self.config.small_lane_concurrency,
+            large_concurrency=self.config.large_lane_concurrency,
+            window=window,
+            on_done=on_done
+        )
+        
+        self.logger.info(
+            f"Voies prioritaires activées ({'fenêtre de ' + str(window) if window else 'sans ordre'}): "
+            f"{scheduler.concurrency[SMALL_LANE]} envois texte/petits, "
+            f"{scheduler.concurrency[LARGE_LANE]} envois gros médias"
+        )
+        self._lane_scheduler = scheduler
+        if self.shutdown_requested:
+            scheduler.stop()
+        try:
+            await scheduler.run(messages)
+        finally:
+            self._lane_scheduler = None
+        
+        if scheduler.reorder.prefix:
+            self._save_progress_data(self._resume_watermark(messages[scheduler.reorder.prefix - 1].id))
+        for lane, stats in scheduler.stats.items():
+            self.logger.info(f"Lane '{lane}': {int(stats['messages'])} messages, {stats['busy_time']:.1f}s busy")
+        
+        return not self.shutdown_requested and not self.job_aborted
+    
+    def _lane_send_interval(self) -> float:
+        """Même débit moyen que le mode par lots : batch_size messages par rate_limit_delay."""
+        return self.config.rate_limit_delay / max(1, self.config.batch_size)
+    
+    async def _start_runtime_control(self):
+        """Active le réglage à chaud des paramètres (SIGHUP et socket de contrôle)."""
+        self.runtime_controller = RuntimeController(
+            self.config,
+            self.logger,
+            processed_count=lambda: self.messages_processed + sum(f.messages_processed for f in self._followers),
+            on_change=self._on_runtime_change,
+            env_file=self.config.env_file,
+            socket_path=self.config.control_socket
+        )
+        try:
+            await self.runtime_controller.start()
+        except Exception as e:
+            self.logger.warning(f"Réglage à chaud indisponible: {str(e)}")
+            self.runtime_controller = None
+    
+    async def _stop_runtime_control(self):
+        """Désactive le réglage à chaud."""
+        if self.runtime_controller:
+            await self.runtime_controller.stop()
+            self.runtime_controller = None
+    
+    def _on_runtime_change(self, name: str, value):
+        """Propage un paramètre modifié à chaud aux composants qui l'ont mis en cache."""
+        if name == 'upload_rate_limit':
+            self.bandwidth.set_upload_rate(value)
+        elif name == 'client_upload_rate_limit':
+            self.bandwidth.set_client_upload_rate(value)
+        elif name == 'download_rate_limit':
+            self.bandwidth.set_download_rate(value)
+        elif name == 'max_retries':
+            self.retry_engine.max_retries = value
+        elif name == 'retry_delay':
+            self.retry_engine.base_delay = value
+        elif name in ('rate_limit_delay', 'batch_size') and self._send_rate_limiter:
+            self._send_rate_limiter.interval = self._lane_send_interval()
+        # Diffusion, fusion : chaque paire a sa file de relance et son limiteur
+        if name not in ('upload_rate_limit', 'client_upload_rate_limit', 'download_rate_limit'):
+            for follower in self._followers:
+                follower._on_runtime_change(name, value)
+    
+    def _classify_lane(self, message) -> str:
+        """Route les gros médias vers leur propre voie."""
+        if getattr(message, 'media', None) and get_message_size(message) >= self.config.large_media_threshold:
+            return LARGE_LANE
+        return SMALL_LANE
+    
+    async def _process_single_message(self, message: Message, target_entity) -> bool:
+        """Applique la déduplication par contenu, envoie le message et met à jour les compteurs."""
+        fingerprint = content_fingerprint(message) if self.dedup_filter is not None else None
+        
+        if fingerprint is not None and fingerprint in self.dedup_filter:
+            self.logger.debug(f"Message {message.id} au contenu déjà vu, ignoré")
+            self.messages_processed += 1
+            self.messages_skipped_duplicate += 1
+            self.progress.add(1, get_message_size(message))
+            self._release_prepared(message.id)
+            return True
+        
+        success = await self._clone_single_message(message, target_entity)
+        self._release_prepared(message.id)
+        if success is None:
+            # Relance programmée : le message sera compté quand elle aboutira
+            return None
+        
+        self.messages_processed += 1
+        self.progress.add(1, get_message_size(message))
+        if success:
+            self.messages_sent += 1
+            if fingerprint is not None:
+                self.dedup_filter.add(fingerprint)
+                self._check_dedup_capacity()
+        else:
+            self.messages_failed += 1
+        return success
+    
+    async def _clone_single_message(self, message: Message, target_entity) -> Optional[bool]:
+        """
+        Tente d'envoyer un message ; un échec relançable est reprogrammé sur la file de relance.
+        
+        Returns:
+            True if sent (or already copied), False if given up, None if a retry was scheduled
+            
+        Raises:
+            JobAbortedError: If the error makes every remaining send pointless
+        """
+        # Un message regroupé couvre plusieurs messages source
+        source_ids = getattr(message, 'source_ids', None) or [message.id]
+        
         # Vérifie si le message a déjà été copié
-        if message.id in self.copied_messages:
+        if all(source_id in self.copied_messages for source_id in source_ids):
             self.logger.debug(f"Message {message.id} déjà copié, ignoré")
             return True
         
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                await self._send_message(message, target_entity)
-                # Marque le message comme copié après succès
-                self.copied_messages.add(message.id)
-                return True
-            except errors.FloodWaitError as e:
-                wait_time = e.seconds
-                self.logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                await asyncio.sleep(wait_time)
-            except Exception as e:
-                self.logger.error(f"Attempt {attempt + 1} failed for message {message.id}: {str(e)}")
-                if attempt < self.config.max_retries:
-                    await asyncio.sleep(self.config.retry_delay)
-                else:
-                    self.logger.error(f"Failed to send message {message.id} after {self.config.max_retries + 1} attempts")
-                    return False
+        await self._wait_flood_pause()
+        if self.shutdown_requested:
+            return False
+        if self._lease is not None:
+            await self._check_lease()
         
-        return False
+        try:
+            sent = await self._send_message(message, target_entity)
+        except Exception as e:
+            log_telegram_error(self.logger, e, message.id)
+            attempts = self.retry_engine.attempts(message) + 1
+            decision = self.retry_engine.record_failure(message, e)
+            if decision == ABORT_JOB:
+                raise JobAbortedError(e)
+            if decision == RETRY_SCHEDULED:
+                self.logger.debug(f"Message {message.id} reprogrammé (tentative {attempts + 1})")
+                return None
+            self.logger.error(f"Abandon de l'envoi du message {message.id} après {attempts} tentative(s) ({type(e).__name__})")
+            for source_id in source_ids:
+                self.dead_letters.add(self.progress_key, source_id, e, attempts)
+            return False
+        
+        self.retry_engine.record_success(message)
+        if self.file_refs:
+            self.file_refs.discard(message.id)
+        # Marque le message comme copié après succès
+        self.copied_messages.update(source_ids)
+        if len(source_ids) > 1 and sent is not None:
+            self.coalesced_map[str(sent.id)] = source_ids
+        return True
+    
+    async def _wait_flood_pause(self):
+        """Attend la fin d'une pause anti-flood en cours (interrompue par un arrêt)."""
+        remaining = self.retry_engine.pause_remaining()
+        if remaining > 0:
+            self.logger.warning(f"Rate limited. Waiting {remaining:.0f} seconds...")
+            await self._interruptible_sleep(remaining)
+    
+    async def _send_due_retries(self, target_entity):
+        """Envoie les relances dont le délai est écoulé, avant les nouveaux messages."""
+        while not self.shutdown_requested:
+            await self._wait_flood_pause()
+            message = self.retry_engine.pop_due()
+            if message is None:
+                return
+            result = await self._process_single_message(message, target_entity)
+            if result is not None and not self.shutdown_requested:
+                # Envoyé, ignoré (doublon, déjà copié) ou abandonné : plus en attente
+                self.retry_engine.release(message)
+    
+    async def _drain_retries(self, target_entity):
+        """Attend et envoie les relances restantes en fin de clonage."""
+        if self.retry_engine.pending:
+            self.logger.info(f"{self.retry_engine.pending} relance(s) en attente")
+        while self.retry_engine.pending and not self.shutdown_requested:
+            await self._interruptible_sleep(self.retry_engine.next_due_in())
+            await self._send_due_retries(target_entity)
+    
+    def _resume_watermark(self, message_id: int) -> int:
+        """Point de reprise sûr : jamais au-delà d'un message en attente de relance."""
+        pending = self.retry_engine.pending_min_id()
+        return message_id if pending is None else min(message_id, pending - 1)
+    
+    def _abort_job(self, error: JobAbortedError):
+        """Arrête le clonage sur une erreur qui rend tous les envois suivants inutiles."""
+        if not self.job_aborted:
+            self.job_aborted = True
+            self.logger.error(f"Erreur bloquante pour tout le clonage, arrêt immédiat: {error}")
+    
+    @staticmethod
+    def _outgoing_entities(message) -> Optional[List[Any]]:
+        """
+        Entités de mise en forme à transmettre telles quelles (sans re-parsing HTML).
+        
+        Les mentions par ID utilisateur sont retirées : Telegram exige leur forme
+        « input » et le texte mentionné reste présent.
+        """
+        entities = getattr(message, 'entities', None)
+        if not entities:
+            return None
+        return [entity for entity in entities if not isinstance(entity, MessageEntityMentionName)] or None
     
     async def _send_message(self, message: Message, target_entity):
-        """Envoie un message unique vers le canal cible."""
+        """Envoie un message unique vers le canal cible et retourne le message envoyé (ou None)."""
         # Choisir le client approprié pour l'envoi
         send_client = self.bot_client if self.config.use_bot_for_sending else self.client
         
@@ -302,35 +2170,55 @@ class TelegramCloner:
             
         # Obtenir le texte du message de manière sécurisée
         message_text = getattr(message, 'message', '') or getattr(message, 'text', '')
+        entities = self._outgoing_entities(message)
+        sent = None
+        
+        # Média transformé éventuel (fichier temporaire supprimé après l'envoi)
+        media, temp_file = message.media, None
+        if message.media and self.config.download_media:
+            if self.shared_uploads is not None:
+                media = await self.shared_uploads.get(message.id, lambda: self._upload_once(message, send_client))
+            else:
+                media, temp_file = await self._outgoing_media(message)
         
         try:
             if message_text and not message.media:
                 # Message texte uniquement
-                await send_client.send_message(target_entity, message_text)
+                sent = await send_client.send_message(target_entity, message_text, formatting_entities=entities, parse_mode=None)
                 self.logger.debug(f"Message texte envoyé via {'bot' if self.config.use_bot_for_sending else 'compte utilisateur'}")
                 
             elif message.media:
                 # Message avec média
                 if self.config.download_media:
                     try:
-                        await send_client.send_file(
+                        sent = await send_client.send_file(
                             target_entity,
-                            message.media,
+                            media,
                             caption=message_text or "",
-                            parse_mode='html'
+                            formatting_entities=entities,
+                            parse_mode=None,
+                            progress_callback=self.bandwidth.upload_callback(
+                                'bot' if self.config.use_bot_for_sending else 'user'
+                            )
                         )
                         self.logger.debug(f"Message média envoyé via {'bot' if self.config.use_bot_for_sending else 'compte utilisateur'}")
                         
                     except Exception as e:
-                        self.logger.warning(f"Échec envoi média pour message {message.id}: {str(e)}")
-                        # Fallback vers texte uniquement si média échoue
-                        if message_text:
-                            await send_client.send_message(target_entity, message_text)
-                            self.logger.debug("Fallback: texte envoyé sans média")
+                        if is_file_reference_error(e) and self.file_refs and not isinstance(media, str):
+                            # Jamais de repli sur le texte seul : le média est relu puis renvoyé
+                            sent = await self._send_with_fresh_media(
+                                send_client, message, target_entity, media, message_text, entities, e
+                            )
+                        else:
+                            self.logger.warning(f"Échec envoi média pour message {message.id}: {str(e)}")
+                            # Fallback vers texte uniquement si média échoue
+                            if message_text:
+                                sent = await send_client.send_message(target_entity, message_text, formatting_entities=entities, parse_mode=None)
+                                self.logger.debug("Fallback: texte envoyé sans média")
                 else:
                     # Envoyer uniquement le texte si téléchargement média désactivé
                     if message_text:
-                        await send_client.send_message(target_entity, message_text)
+                        sent = await send_client.send_message(target_entity, message_text, formatting_entities=entities, parse_mode=None)
                         self.logger.debug("Texte envoyé (média ignoré)")
             else:
                 # Ignorer les messages vides
@@ -340,25 +2228,72 @@ class TelegramCloner:
             # Si le bot échoue, essayer avec le compte utilisateur en fallback
             if self.config.use_bot_for_sending and self.client:
                 self.logger.warning(f"Bot échoué, tentative avec compte utilisateur: {str(e)}")
-                await self._send_message_with_user_client(message, target_entity, message_text)
-            else:
-                raise e
+                # Un fichier téléversé par le bot n'est pas utilisable par le compte utilisateur ;
+                # un média Telegram est repris du message (référence éventuellement rafraîchie)
+                fallback_media = media if isinstance(media, str) else None
+                return await self._send_message_with_user_client(
+                    message, target_entity, message_text, entities, fallback_media
+                )
+            raise e
+        finally:
+            if temp_file and os.path.exists(temp_file):
+                os.remove(temp_file)
+        
+        return sent
+    
+    async def _send_with_fresh_media(
+        self, send_client, message, target_entity, stale_media, message_text: str, entities, error: Exception
+    ):
+        """Relit le média expiré (en lot avec les autres échecs) puis renvoie le message."""
+        fresh = await self.file_refs.refresh(message, stale_media)
+        if fresh is None:
+            self.logger.warning(f"Média du message {message.id} introuvable dans la source, référence non rafraîchie")
+            raise error
+        self.logger.debug(f"Référence de fichier rafraîchie pour le message {message.id}")
+        return await send_client.send_file(
+            target_entity,
+            fresh,
+            caption=message_text or "",
+            formatting_entities=entities,
+            parse_mode=None,
+            progress_callback=self.bandwidth.upload_callback(
+                'bot' if self.config.use_bot_for_sending else 'user'
+            )
+        )
+    
+    async def _upload_once(self, message, send_client):
+        """Prépare le média puis téléverse un fichier local, pour réutilisation par chaque cible."""
+        media, temp_file = await self._outgoing_media(message)
+        if isinstance(media, str):
+            media = await send_client.upload_file(
+                media,
+                progress_callback=self.bandwidth.upload_callback(
+                    'bot' if self.config.use_bot_for_sending else 'user'
+                )
+            )
+        return media, temp_file
     
-    async def _send_message_with_user_client(self, message: Message, target_entity, message_text: str):
+    async def _send_message_with_user_client(
+        self, message: Message, target_entity, message_text: str, entities=None, media=None
+    ):
         """Méthode de fallback pour envoyer avec le compte utilisateur."""
+        sent = None
         try:
             if message_text and not message.media:
-                await self.client.send_message(target_entity, message_text)
+                sent = await self.client.send_message(target_entity, message_text, formatting_entities=entities, parse_mode=None)
             elif message.media and self.config.download_media:
-                await self.client.send_file(
+                sent = await self.client.send_file(
                     target_entity,
-                    message.media,
+                    media or message.media,
                     caption=message_text or "",
-                    parse_mode='html'
+                    formatting_entities=entities,
+                    parse_mode=None,
+                    progress_callback=self.bandwidth.upload_callback('user')
                 )
             elif message_text:
-                await self.client.send_message(target_entity, message_text)
+                sent = await self.client.send_message(target_entity, message_text, formatting_entities=entities, parse_mode=None)
             self.logger.debug("Message envoyé avec succès via compte utilisateur (fallback)")
+            return sent
         except Exception as e:
             self.logger.error(f"Échec fallback compte utilisateur: {str(e)}")
             raise e
@@ -384,12 +2319,77 @@ class TelegramCloner:
         self.logger.info(f"  Empty messages: {empty_count}")
         self.logger.info(f"  Total messages: {len(messages)}")
     
-    def _load_progress(self, source_channel: str, target_channel: str):
-        """Charge la progression depuis le fichier."""
-        # Génère une clé unique pour cette paire de canaux
+    def _install_shutdown_handlers(self):
+        """Installe les gestionnaires SIGTERM/SIGINT pour un arrêt propre."""
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, self.request_stop, signal.Signals(signum).name)
+                self._signals_installed.append(signum)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass
+    
+    def _remove_shutdown_handlers(self):
+        """Retire les gestionnaires de signaux installés."""
+        if not self._signals_installed:
+            return
+        loop = asyncio.get_running_loop()
+        for signum in self._signals_installed:
+            loop.remove_signal_handler(signum)
+        self._signals_installed = []
+    
+    def request_stop(self, reason: str = "arrêt demandé"):
+        """
+        Demande un arrêt propre : plus de nouvel envoi, vidage des envois en cours
+        dans la limite de SHUTDOWN_TIMEOUT, puis point de reprise exact.
+        
+        Un second signal annule immédiatement les envois en cours.
+        """
+        if self.shutdown_requested:
+            self.logger.warning(f"{reason} reçu à nouveau, annulation immédiate des envois en cours")
+            self._cancel_in_flight()
+            return
+        
+        self.shutdown_requested = True
+        self._shutdown_started = time.monotonic()
+        self.logger.warning(
+            f"{reason} reçu: arrêt des envois, vidage des envois en cours "
+            f"(échéance {self.config.shutdown_timeout:.0f}s)"
+        )
+        if self._stop_event:
+            self._stop_event.set()
+        if self._lane_scheduler:
+            self._lane_scheduler.stop()
+        for follower in self._followers:
+            follower.request_stop(reason)
+        asyncio.get_running_loop().call_later(self.config.shutdown_timeout, self._cancel_in_flight)
+    
+    def _cancel_in_flight(self):
+        """Annule les envois encore en cours à l'échéance de l'arrêt."""
+        if self._clone_task and not self._clone_task.done():
+            self.logger.warning("Échéance d'arrêt atteinte, annulation des envois en cours")
+            self._clone_task.cancel()
+    
+    async def _interruptible_sleep(self, seconds: float):
+        """Attend le délai demandé, ou moins si un arrêt est demandé."""
+        if self._stop_event is None:
+            await asyncio.sleep(seconds)
+            return
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _make_progress_key(self, source_channel: str, target_channel: str) -> str:
+        """Génère une clé unique pour cette paire de canaux."""
         source_clean = str(source_channel).replace('@', '').replace('/', '_').replace('-', '_')
         target_clean = str(target_channel).replace('@', '').replace('/', '_').replace('-', '_')
-        self.progress_key = f"{source_clean}_to_{target_clean}"
+        return f"{source_clean}_to_{target_clean}"
+    
+    def _load_progress(self, source_channel: str, target_channel: str):
+        """Charge la progression depuis le fichier."""
+        self.progress_key = self._make_progress_key(source_channel, target_channel)
         
         if os.path.exists(self.config.progress_file):
             try:
@@ -400,6 +2400,7 @@ class TelegramCloner:
                     self.progress_data = data[self.progress_key]
                     # Charge les messages déjà copiés
                     self.copied_messages = set(self.progress_data.get('copied_messages', []))
+                    self.coalesced_map = self.progress_data.get('coalesced_messages', {})
                     self.logger.info(f"Reprise depuis le message ID: {self.progress_data.get('last_message_id', 0)}")
                     self.logger.info(f"Messages déjà copiés: {len(self.copied_messages)}")
             except Exception as e:
@@ -407,6 +2408,20 @@ class TelegramCloner:
     
     def _save_progress(self, source_channel: str, target_channel: str, completed: bool = False):
         """Sauvegarde la progression dans le fichier."""
+        self._write_progress(completed)
+        self._save_dedup_filter()
+    
+    def _checkpoint(self):
+        """Point de reprise intermédiaire : progression puis filtre de déduplication."""
+        if self.external_checkpoints:
+            # Modes répartis : le curseur de la tranche est enregistré par le coordinateur ou le parent
+            return
+        self._write_progress(completed=False)
+        # Sans le filtre, une reprise après arrêt brutal renverrait les doublons vus depuis la dernière fin de clonage
+        self._save_dedup_filter()
+    
+    def _write_progress(self, completed: bool):
+        """Écrit la progression de façon atomique et durable."""
         try:
             data = {}
             if os.path.exists(self.config.progress_file):
@@ -420,30 +2435,63 @@ class TelegramCloner:
                 'messages_processed': self.messages_processed,
                 'messages_sent': self.messages_sent,
                 'messages_failed': self.messages_failed,
-                'copied_messages': list(self.copied_messages)
+                'copied_messages': list(self.copied_messages),
+                'coalesced_messages': self.coalesced_map
             }
             
-            with open(self.config.progress_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            if not save_json(data, self.config.progress_file):
+                raise IOError(f"écriture de {self.config.progress_file} impossible")
         except Exception as e:
             self.logger.warning(f"Impossible de sauvegarder la progression: {str(e)}")
     
+    def _dedup_file_for(self, key: str) -> str:
+        """Filtre propre à une paire source/cible : DEDUP_FILE suffixé par la clé de la paire."""
+        base, ext = os.path.splitext(self.config.dedup_file)
+        return f"{base}.{key}{ext}"
+    
+    def _load_dedup_filter(self, key: Optional[str] = None):
+        """Charge (ou crée) le filtre de déduplication par contenu de la paire courante."""
+        self.dedup_path = self._dedup_file_for(key or self.progress_key)
+        try:
+            self.dedup_filter = BloomFilter.open(
+                self.dedup_path,
+                self.config.dedup_capacity,
+                self.config.dedup_fp_rate
+            )
+            self.logger.info(
+                f"Déduplication par contenu activée: {self.dedup_filter.count} empreintes connues "
+                f"({self.dedup_filter.size_bytes / (1024 * 1024):.1f} MB)"
+            )
+        except Exception as e:
+            self.logger.warning(f"Impossible de charger le filtre de déduplication: {str(e)}")
+            self.dedup_filter = BloomFilter(self.config.dedup_capacity, self.config.dedup_fp_rate)
+        self.dedup_saturated = False
+        self._check_dedup_capacity()
+    
+    def _check_dedup_capacity(self):
+        """Avertit (une fois) quand le filtre dépasse sa capacité : les faux positifs dépassent alors DEDUP_FP_RATE."""
+        if self.dedup_saturated or self.dedup_filter.count <= self.dedup_filter.capacity:
+            return
+        self.dedup_saturated = True
+        self.logger.warning(
+            f"Filtre de déduplication saturé: {self.dedup_filter.count} empreintes pour une capacité de "
+            f"{self.dedup_filter.capacity}, des messages nouveaux risquent d'être ignorés "
+            f"(augmentez DEDUP_CAPACITY et supprimez {self.dedup_path})"
+        )
+    
+    def _save_dedup_filter(self):
+        """Sauvegarde le filtre de déduplication sur disque."""
+        if self.dedup_filter is None or not self.dedup_path:
+            return
+        try:
+            self.dedup_filter.save(self.dedup_path)
+        except Exception as e:
+            self.logger.warning(f"Impossible de sauvegarder le filtre de déduplication: {str(e)}")
+    
     def _save_progress_data(self, last_message_id: int):
         """Update progress data."""
         self.progress_data['last_message_id'] = last_message_id
     
-    def _log_progress(self, current: int, total: int, start_time: datetime):
-        """Log current progress."""
-        percentage = (current / total) * 100
-        elapsed = datetime.now() - start_time
-        eta = calculate_eta(current, total, elapsed)
-        
-        self.logger.info(
-            f"Progress: {current}/{total} ({percentage:.1f}%) - "
-            f"Sent: {self.messages_sent}, Failed: {self.messages_failed} - "
-            f"ETA: {eta}"
-        )
-    
     def _print_summary(self, start_time: datetime):
         """Print cloning summary."""
         duration = datetime.now() - start_time
@@ -452,6 +2500,12 @@ class TelegramCloner:
         self.logger.info(f"Messages Processed: {self.messages_processed}")
         self.logger.info(f"Messages Sent: {self.messages_sent}")
         self.logger.info(f"Messages Failed: {self.messages_failed}")
+        if self.messages_failed:
+            self.logger.info(f"Failed messages recorded in {self.config.dead_letter_file} (replay with --retry-failed)")
+        if self.dedup_filter is not None:
+            self.logger.info(f"Messages Skipped (duplicate content): {self.messages_skipped_duplicate}")
+        if self.config.coalesce_enabled:
+            self.logger.info(f"Sends Saved (coalesced text): {self.messages_coalesced}")
         
         if self.messages_processed > 0:
             success_rate = (self.messages_sent / self.messages_processed) * 100
@@ -460,3 +2514,17 @@ class TelegramCloner:
             if duration.total_seconds() > 0:
                 rate = self.messages_processed / duration.total_seconds()
                 self.logger.info(f"Processing Rate: {rate:.2f} messages/second")
+        
+        self.retry_engine.log_stats(self.logger)
+        self.memory_monitor.log_stats()
+        if self.media_stage:
+            self.media_stage.log_stats(self.logger)
+        self.bandwidth.log_stats(self.logger)
+        self.read_meter.log_stats(self.logger, self._read_mode(), self.progress_data.get('read_rates'))
+        if self.selection.skipped:
+            self.logger.info(f"Selection: {self.selection.skipped} messages filtered client-side (no server filter)")
+        if self.file_refs:
+            self.file_refs.log_stats(self.logger)
+        
+        if self.rule_engine:
+            self.rule_engine.log_stats(self.logger)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tests de l'archive locale : écriture, reprise et stockage des médias par contenu
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from types import SimpleNamespace
+import telegram_cloner
+from archive import ArchiveWriter, ArchiveReader, INDEX_ENTRY
+from outils_tests import config_de_test
+
+def make_record(message_id, text="texte"):
+    """Construit un enregistrement d'archive minimal."""
+    return {'id': message_id, 'date': None, 'text': text, 'entities': None,
+            'grouped_id': None, 'type': 'text', 'size': 0, 'media': None}
+
+def test_ecriture_et_reprise():
+    """Test de la reprise après une écriture interrompue."""
+    print("🔍 Test de l'écriture et de la reprise")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ArchiveWriter(tmp, source="@source")
+        writer.open()
+        for message_id in (1, 2, 3):
+            writer.append(make_record(message_id))
+        writer.close()
+        
+        # Simule une interruption : trame orpheline et entrée d'index partielle
+        with open(writer.segment_path(0), 'ab') as f:
+            f.write(b'\x00' * 7)
+        with open(writer.index_path, 'ab') as f:
+            f.write(b'\x01' * 5)
+        
+        writer = ArchiveWriter(tmp)
+        writer.open()
+        assert writer.last_message_id == 3
+        assert writer.message_count == 3
+        assert os.path.getsize(writer.index_path) == 3 * INDEX_ENTRY.size
+        
+        writer.append(make_record(2))  # déjà archivé, ignoré
+        writer.append(make_record(4))
+        writer.close()
+        assert writer.message_count == 4
+        
+        # Interruption juste après une rotation : segment suivant orphelin, absent de l'index
+        with open(writer.segment_path(1), 'wb') as f:
+            f.write(b'\xff' * 50)
+        writer = ArchiveWriter(tmp, segment_max_bytes=os.path.getsize(writer.segment_path(0)))
+        writer.open()
+        writer.append(make_record(5))
+        writer.close()
+        reader = ArchiveReader(tmp)
+        reader.open()
+        assert [record['id'] for record in reader.iter_records()] == [1, 2, 3, 4, 5]
+        reader.close()
+    
+    print("✅ Test de l'écriture et de la reprise réussi")
+
+def test_medias_par_contenu():
+    """Test du stockage unique des médias identiques."""
+    print("🔍 Test du stockage des médias par contenu")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ArchiveWriter(tmp)
+        writer.open()
+        
+        infos = []
+        for name in ('a.jpg', 'b.jpg'):
+            path = os.path.join(writer.temp_dir, name)
+            with open(path, 'wb') as f:
+                f.write(b'meme contenu')
+            infos.append(writer.store_media(path, identity=f"photo:{name}", mime_type="image/jpeg"))
+        
+        assert infos[0]['sha256'] == infos[1]['sha256']
+        assert writer.media_stored == 1
+        assert writer.media_deduplicated == 1
+        assert writer.lookup_media("photo:a.jpg")['path'] == infos[0]['path']
+        assert writer.lookup_media("photo:inconnue") is None
+        
+        # Média sans identité propre (aperçu de lien, contact) : jamais réutilisé
+        path = os.path.join(writer.temp_dir, 'apercu.jpg')
+        with open(path, 'wb') as f:
+            f.write(b'apercu')
+        writer.store_media(path, identity=None)
+        assert writer.lookup_media(None) is None
+        writer.close()
+    
+    print("✅ Test du stockage des médias réussi")
+
+def test_relecture_archive():
+    """Test de la relecture séquentielle d'une archive."""
+    print("🔍 Test de la relecture de l'archive")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ArchiveWriter(tmp, source="@source", segment_max_bytes=64)
+        writer.open()
+        for message_id in range(1, 11):
+            record = make_record(message_id, text=f"message {message_id}")
+            record['entities'] = [{'_': 'MessageEntityBold', 'offset': 0, 'length': 7}]
+            writer.append(record)
+        writer.close()
+        assert os.path.exists(writer.segment_path(1)), "Plusieurs segments attendus"
+        
+        reader = ArchiveReader(tmp)
+        reader.open()
+        assert len(reader) == 10
+        assert reader.manifest['source'] == "@source"
+        
+        ids = [record['id'] for record in reader.iter_records(min_id=4, limit=3)]
+        assert ids == [5, 6, 7]
+        
+        messages = list(reader.iter_messages(min_id=8))
+        assert [m.id for m in messages] == [9, 10]
+        assert messages[0].message == "message 9"
+        assert messages[0].media is None
+        assert type(messages[0].entities[0]).__name__ == 'MessageEntityBold'
+        reader.close()
+    
+    print("✅ Test de la relecture réussi")
+
+class TracedReader(ArchiveReader):
+    """Lecteur d'archive qui note ses lectures et sa fermeture."""
+    instances = []
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = []
+        self.closed = False
+        TracedReader.instances.append(self)
+
+    def iter_messages(self, min_id=0, limit=None):
+        self.reads.append(min_id)
+        return super().iter_messages(min_id=min_id, limit=limit)
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+def test_rejeu_par_tranches():
+    """Test : l'archive est rejouée par tranches et toujours refermée."""
+    print("🔍 Test du rejeu de l'archive par tranches")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        archive_dir = os.path.join(tmp, 'archive')
+        writer = ArchiveWriter(archive_dir, source="@source")
+        writer.open()
+        for message_id in range(1, 11):
+            writer.append(make_record(message_id, text=f"m{message_id}"))
+        writer.close()
+        
+        config = config_de_test(tmp, api_id=1, api_hash='hash', memory_chunk_size=4)
+        sent = []
+        
+        async def send_message(entity, text, **kwargs):
+            sent.append(text)
+            return SimpleNamespace(id=len(sent))
+        
+        async def disconnect():
+            pass
+        
+        def make_cloner(target):
+            cloner = telegram_cloner.TelegramCloner(config, logging.getLogger('test_archive'))
+            
+            async def connect():
+                cloner.client = SimpleNamespace(send_message=send_message, disconnect=disconnect)
+            
+            async def get_entity(identifier):
+                return target
+            
+            async def no_bot():
+                pass
+            
+            cloner._connect_user_client = connect
+            cloner._connect_bot_client = no_bot
+            cloner._get_entity = get_entity
+            return cloner
+        
+        original = telegram_cloner.ArchiveReader
+        telegram_cloner.ArchiveReader = TracedReader
+        try:
+            assert asyncio.run(make_cloner(SimpleNamespace(id=2, title='cible')).clone_channel(
+                'archive', 'cible', from_archive=archive_dir))
+            reader = TracedReader.instances[-1]
+            assert sent == [f"m{i}" for i in range(1, 11)]
+            assert reader.reads == [0, 4, 8, 10], f"Archive lue par tranches : {reader.reads}"
+            assert reader.closed
+            
+            # Cible introuvable : le lecteur est refermé quand même
+            assert not asyncio.run(make_cloner(None).clone_channel('archive', 'inconnue', from_archive=archive_dir))
+            assert TracedReader.instances[-1].closed
+        finally:
+            telegram_cloner.ArchiveReader = original
+    
+    print("✅ Test du rejeu par tranches réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de l'Archive Locale")
+    print("=" * 50)
+    
+    try:
+        test_ecriture_et_reprise()
+        test_medias_par_contenu()
+        test_relecture_archive()
+        test_rejeu_par_tranches()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
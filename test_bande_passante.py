@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests de la limitation de bande passante des médias
+"""
+
+import asyncio
+from bandwidth import ByteRateLimiter, BandwidthShaper
+
+def test_debit_limite():
+    """Test : le seau à jetons ralentit au débit configuré."""
+    print("🔍 Test du débit limité")
+    
+    # Horloge simulée : l'attente avance le temps, sans dépendre de la charge de la machine
+    now = [0.0]
+    
+    async def sleep(seconds):
+        now[0] += seconds
+    
+    async def transfer():
+        limiter = ByteRateLimiter(rate=20000, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            await limiter.consume(10000)
+        return now[0], limiter
+    
+    elapsed, limiter = asyncio.run(transfer())
+    # 20 000 octets de rafale initiale, puis 20 000 octets à 20 000 o/s
+    assert abs(elapsed - 1.0) < 1e-9, f"Durée inattendue : {elapsed:.2f}s"
+    assert limiter.bytes_total == 40000
+    
+    print("✅ Test du débit limité réussi")
+
+def test_callbacks_et_ajustement():
+    """Test des callbacks de progression et du réglage à chaud."""
+    print("🔍 Test des callbacks de progression")
+    
+    async def transfer():
+        shaper = BandwidthShaper()
+        callback = shaper.upload_callback('bot')
+        for current in (1000, 3000, 6000):
+            await callback(current, 6000)
+        shaper.set_upload_rate(5000)
+        shaper.set_client_upload_rate(2000)
+        return shaper
+    
+    shaper = asyncio.run(transfer())
+    assert shaper.upload.bytes_total == 6000, "Seul le delta de chaque bloc doit être compté"
+    assert shaper.clients['bot'].bytes_total == 6000
+    assert shaper.upload.rate == 5000
+    assert shaper.clients['bot'].rate == 2000
+    
+    print("✅ Test des callbacks réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Bande Passante")
+    print("=" * 50)
+    
+    try:
+        test_debit_limite()
+        test_callbacks_et_ajustement()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
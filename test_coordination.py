@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Tests de la coordination multi-nœuds (tranches attribuées par bail)
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+from outils_tests import config_de_test
+from coordinator import (
+    LeaseCoordinator, LeaseLostError, MODE_ORDERED, MODE_UNORDERED, PHASE_STAGE, PHASE_PUBLISH
+)
+from archive import ArchiveReader
+from telegram_cloner import TelegramCloner
+
+def _source(count):
+    return [SimpleNamespace(id=i, message=f"m{i}", text="", media=None, entities=None, date=None, grouped_id=None)
+            for i in range(1, count + 1)]
+
+def _worker(path, name, source, sent, clock=None):
+    """Worker de test : historique source en mémoire, envois enregistrés dans sent."""
+    config = config_de_test(retry_delay=0, coordinator_db=path)
+    cloner = TelegramCloner(config, logging.getLogger(f'test_coordination.{name}'))
+    cloner.progress_key = 'job'
+
+    async def iter_messages(entity, reverse, min_id, max_id):
+        for message in source:
+            if min_id < message.id < max_id:
+                yield message
+
+    async def send_message(entity, text, **kwargs):
+        sent.append(text)
+        await asyncio.sleep(0)
+        return SimpleNamespace(id=len(sent))
+
+    cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message)
+    kwargs = {'clock': clock} if clock else {}
+    return cloner, LeaseCoordinator(path, 'job', name, **kwargs)
+
+def test_baux_et_reattribution():
+    """Test : tranches distinctes par worker, bail expiré réattribué depuis son curseur."""
+    print("🔍 Test des baux et de la réattribution")
+
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, 'coordination.db')
+    now = [1000.0]
+    worker_a = LeaseCoordinator(path, 'job', 'a', lease_seconds=60, clock=lambda: now[0])
+    worker_b = LeaseCoordinator(path, 'job', 'b', lease_seconds=60, clock=lambda: now[0])
+
+    assert worker_a.plan(1, 250, 100)
+    assert not worker_b.plan(1, 999, 10), "Le premier plan fait foi"
+
+    lease_a = worker_a.acquire()
+    lease_b = worker_b.acquire()
+    assert (lease_a.start_id, lease_a.end_id) == (1, 100)
+    assert (lease_b.start_id, lease_b.end_id) == (101, 200)
+
+    # a progresse puis se tait ; b termine et reprend la tranche de a à l'expiration
+    worker_a.heartbeat(lease_a, cursor=42)
+    worker_b.complete(lease_b)
+    now[0] += 30
+    assert worker_b.acquire().start_id == 201
+    now[0] += 61
+    taken = worker_b.acquire()
+    assert taken.start_id == 1 and taken.cursor == 42, "Reprise au curseur enregistré"
+
+    try:
+        worker_a.heartbeat(lease_a, cursor=80)
+        assert False, "Le bail expiré et réattribué doit être perdu"
+    except LeaseLostError:
+        pass
+
+    worker_a.close()
+    worker_b.close()
+    tmp.cleanup()
+
+    print("✅ Test des baux et de la réattribution réussi")
+
+def test_publication_ordonnee():
+    """Test : en mode ordonné, une seule publication à la fois, dans l'ordre des tranches."""
+    print("🔍 Test de la publication ordonnée")
+
+    tmp = tempfile.TemporaryDirectory()
+    coordinator = LeaseCoordinator(os.path.join(tmp.name, 'coordination.db'), 'job', 'w', clock=lambda: 0.0)
+    coordinator.plan(1, 300, 100, MODE_ORDERED)
+
+    first, second, third = coordinator.acquire(), coordinator.acquire(), coordinator.acquire()
+    assert [lease.phase for lease in (first, second, third)] == [PHASE_STAGE] * 3
+
+    # La tranche 2 est prête avant la 1 : elle attend
+    coordinator.complete(second)
+    assert coordinator.acquire() is None
+    coordinator.complete(first)
+    publish = coordinator.acquire()
+    assert (publish.phase, publish.start_id) == (PHASE_PUBLISH, 1)
+    assert coordinator.acquire() is None, "Une seule publication active"
+    coordinator.complete(publish)
+    assert coordinator.acquire().start_id == 101
+
+    coordinator.close()
+    tmp.cleanup()
+
+    print("✅ Test de la publication ordonnée réussi")
+
+def test_workers_concurrents():
+    """Test : deux workers se partagent la source, chaque message est envoyé une fois."""
+    print("🔍 Test de deux workers concurrents")
+
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, 'coordination.db')
+    source = _source(500)
+    sent = []
+    make_worker = lambda name: _worker(path, name, source, sent)
+
+    async def work(cloner, coordinator):
+        done = 0
+        while True:
+            lease = coordinator.acquire()
+            if lease is None:
+                return done
+            await cloner._run_lease(coordinator, lease, SimpleNamespace(id=1), 'cible', datetime.now())
+            done += 1
+
+    workers = [make_worker('a'), make_worker('b')]
+    workers[0][1].plan(1, 500, 50, MODE_UNORDERED)
+
+    async def scenario():
+        return await asyncio.gather(*(work(cloner, coordinator) for cloner, coordinator in workers))
+
+    done = asyncio.run(scenario())
+    assert sorted(sent, key=lambda text: int(text[1:])) == [f"m{i}" for i in range(1, 501)]
+    assert len(sent) == 500, "Aucun doublon"
+    assert sum(done) == 10 and min(done) > 0, f"Tranches réparties : {done}"
+    assert workers[0][1].finished()
+    for _, coordinator in workers:
+        coordinator.close()
+    tmp.cleanup()
+
+    print("✅ Test de deux workers concurrents réussi")
+
+def test_bail_perdu_sans_ecriture():
+    """Test : un worker dont le bail a été réattribué n'envoie ni n'archive plus rien dans la tranche."""
+    print("🔍 Test d'un bail perdu sans écriture")
+
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, 'coordination.db')
+    now = [1000.0]
+    source = _source(20)
+    sent = []
+    stale, coordinator_a = _worker(path, 'a', source, sent, clock=lambda: now[0])
+    fresh, coordinator_b = _worker(path, 'b', source, sent, clock=lambda: now[0])
+
+    # Envoi direct : le bail expiré de a est repris par b avant que a n'envoie
+    coordinator_a.plan(1, 20, 20, MODE_UNORDERED)
+    lease_a = coordinator_a.acquire()
+    now[0] += 61
+    lease_b = coordinator_b.acquire()
+    assert not asyncio.run(stale._run_lease(coordinator_a, lease_a, SimpleNamespace(id=1), 'cible', datetime.now()))
+    assert sent == [], "Aucun envoi sous un bail perdu"
+    assert asyncio.run(fresh._run_lease(coordinator_b, lease_b, SimpleNamespace(id=1), 'cible', datetime.now()))
+    assert sent == [f"m{i}" for i in range(1, 21)]
+
+    # Préparation : chaque bail archive dans son propre répertoire, seul le bail valide est publié
+    ordered_path = os.path.join(tmp.name, 'ordonne.db')
+    stale, coordinator_a = _worker(ordered_path, 'a', source, sent, clock=lambda: now[0])
+    fresh, coordinator_b = _worker(ordered_path, 'b', source, sent, clock=lambda: now[0])
+    coordinator_a.plan(1, 20, 20, MODE_ORDERED)
+    lease_a = coordinator_a.acquire()
+    now[0] += 61
+    lease_b = coordinator_b.acquire()
+    assert lease_b.phase == PHASE_STAGE and lease_b.token != lease_a.token
+
+    async def both():
+        return await asyncio.gather(
+            fresh._run_lease(coordinator_b, lease_b, SimpleNamespace(id=1), 'cible', datetime.now()),
+            stale._run_lease(coordinator_a, lease_a, SimpleNamespace(id=1), 'cible', datetime.now())
+        )
+
+    assert asyncio.run(both()) == [True, False]
+    reader = ArchiveReader(fresh._staging_path(lease_b))
+    reader.open()
+    assert [message.id for message in reader.iter_messages()] == list(range(1, 21)), "Chaque message archivé une fois"
+    reader.close()
+
+    for coordinator in (coordinator_a, coordinator_b):
+        coordinator.close()
+    tmp.cleanup()
+
+    print("✅ Test d'un bail perdu sans écriture réussi")
+
+def test_preparation_reprise():
+    """Test : une préparation interrompue est reprise par le bail suivant, puis publiée."""
+    print("🔍 Test de la reprise d'une préparation")
+
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, 'coordination.db')
+    source = _source(30)
+    sent = []
+    cloner, coordinator = _worker(path, 'a', source, sent)
+    coordinator.plan(1, 30, 30, MODE_ORDERED)
+
+    original = cloner.client.iter_messages
+
+    async def interrupted(entity, reverse, min_id, max_id):
+        async for message in original(entity, reverse, min_id, max_id):
+            if message.id == 11:
+                cloner.shutdown_requested = True
+            yield message
+
+    cloner.client.iter_messages = interrupted
+    lease = coordinator.acquire()
+    assert not asyncio.run(cloner._run_lease(coordinator, lease, SimpleNamespace(id=1), 'cible', datetime.now()))
+    assert os.path.isdir(cloner._staging_path(lease, '.partial'))
+
+    reads = []
+
+    async def resumed(entity, reverse, min_id, max_id):
+        async for message in original(entity, reverse, min_id, max_id):
+            reads.append(message.id)
+            yield message
+
+    cloner.shutdown_requested = False
+    cloner.client.iter_messages = resumed
+    lease = coordinator.acquire()
+    assert asyncio.run(cloner._run_lease(coordinator, lease, SimpleNamespace(id=1), 'cible', datetime.now()))
+    assert reads[0] == 11, "Reprise après le dernier message archivé"
+    publish = coordinator.acquire()
+    assert publish.phase == PHASE_PUBLISH
+    assert asyncio.run(cloner._run_lease(coordinator, publish, SimpleNamespace(id=1), 'cible', datetime.now()))
+    assert sent == [f"m{i}" for i in range(1, 31)]
+    assert os.listdir(os.path.dirname(cloner._staging_path(lease))) == [], "Archives supprimées après publication"
+
+    coordinator.close()
+    tmp.cleanup()
+
+    print("✅ Test de la reprise d'une préparation réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Coordination Multi-Nœuds")
+    print("=" * 50)
+
+    try:
+        test_baux_et_reattribution()
+        test_publication_ordonnee()
+        test_workers_concurrents()
+        test_bail_perdu_sans_ecriture()
+        test_preparation_reprise()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests de la déduplication par contenu : filtre de Bloom et empreintes
+"""
+
+import logging
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from outils_tests import config_de_test
+from dedup import BloomFilter, content_fingerprint
+from telegram_cloner import TelegramCloner
+
+def test_bloom_filter_basique():
+    """Test d'insertion et de recherche dans le filtre."""
+    print("🔍 Test du filtre de Bloom")
+    
+    bloom = BloomFilter(capacity=1000, fp_rate=0.01)
+    assert bloom.add(b"message-1") == False, "Une nouvelle clé ne doit pas être présente"
+    assert bloom.add(b"message-1") == True, "Une clé ajoutée doit être présente"
+    assert b"message-1" in bloom
+    assert bloom.count == 1
+    
+    print("✅ Test du filtre de Bloom réussi")
+
+def test_bloom_filter_taux_faux_positifs():
+    """Test du taux de faux positifs à pleine capacité."""
+    print("🔍 Test du taux de faux positifs")
+    
+    bloom = BloomFilter(capacity=5000, fp_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"vu-{i}".encode())
+    
+    faux_positifs = sum(1 for i in range(5000) if f"nouveau-{i}".encode() in bloom)
+    assert faux_positifs / 5000 < 0.03, f"Trop de faux positifs: {faux_positifs}"
+    
+    print("✅ Test du taux de faux positifs réussi")
+
+def test_bloom_filter_persistance():
+    """Test de sauvegarde et rechargement du filtre."""
+    print("🔍 Test de persistance du filtre")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, 'filtre.bin')
+        bloom = BloomFilter.open(filepath, capacity=100, fp_rate=0.01)
+        bloom.add(b"persistant")
+        bloom.save(filepath)
+        
+        recharge = BloomFilter.open(filepath, capacity=100, fp_rate=0.01)
+        assert b"persistant" in recharge
+        assert recharge.count == 1
+        assert recharge.size_bytes == bloom.size_bytes
+    
+    print("✅ Test de persistance réussi")
+
+def test_content_fingerprint():
+    """Test de l'empreinte de contenu normalisée."""
+    print("🔍 Test des empreintes de contenu")
+    
+    message_a = MagicMock(message="Bonjour   le monde \n", media=None)
+    message_b = MagicMock(message="Bonjour le monde", media=None)
+    message_vide = MagicMock(message="", media=None)
+    
+    assert content_fingerprint(message_a) == content_fingerprint(message_b)
+    assert content_fingerprint(message_vide) is None
+    
+    photo_1 = MagicMock(message="", media=MagicMock(photo=MagicMock(id=1)))
+    photo_2 = MagicMock(message="", media=MagicMock(photo=MagicMock(id=2)))
+    assert content_fingerprint(photo_1) != content_fingerprint(photo_2)
+    
+    # Sondages, positions, contacts : pas d'identité propre, jamais dédupliqués
+    sondage = MagicMock(message="", media=SimpleNamespace(poll=SimpleNamespace(id=7)))
+    assert content_fingerprint(sondage) is None
+    
+    print("✅ Test des empreintes réussi")
+
+def test_filtre_par_paire():
+    """Test : chaque paire source/cible a son propre filtre."""
+    print("🔍 Test du filtre par paire de canaux")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config = config_de_test(dedup_file=os.path.join(tmp, 'filtre.bin'))
+        message = SimpleNamespace(id=1, message="Dépêche", media=None)
+        
+        first = TelegramCloner(config, logging.getLogger('test_deduplication'))
+        first.progress_key = first._make_progress_key('@source', '@cible1')
+        first._load_dedup_filter()
+        first.dedup_filter.add(content_fingerprint(message))
+        first._save_dedup_filter()
+        
+        second = TelegramCloner(config, logging.getLogger('test_deduplication'))
+        second.progress_key = second._make_progress_key('@source', '@cible2')
+        second._load_dedup_filter()
+        assert content_fingerprint(message) not in second.dedup_filter, "Une autre cible ne doit rien ignorer"
+        assert first.dedup_path == os.path.join(tmp, 'filtre.source_to_cible1.bin')
+        assert os.path.exists(first.dedup_path)
+    
+    print("✅ Test du filtre par paire réussi")
+
+def test_filtre_sauvegarde_au_point_de_reprise():
+    """Test : le filtre suit chaque point de reprise et signale sa saturation une seule fois."""
+    print("🔍 Test du filtre aux points de reprise")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config = config_de_test(tmp, dedup_file=os.path.join(tmp, 'filtre.bin'), dedup_capacity=2)
+        logger = MagicMock()
+        cloner = TelegramCloner(config, logger)
+        cloner.progress_key = cloner._make_progress_key('@source', '@cible')
+        cloner._load_dedup_filter()
+        for i in range(4):
+            cloner.dedup_filter.add(f"dépêche-{i}".encode())
+            cloner._check_dedup_capacity()
+        cloner._checkpoint()
+        
+        recharge = BloomFilter.open(cloner.dedup_path, capacity=2, fp_rate=0.001)
+        assert recharge.count == 4, "Le point de reprise doit sauvegarder le filtre"
+        saturations = [c for c in logger.warning.call_args_list if 'saturé' in c.args[0]]
+        assert len(saturations) == 1, f"Saturation signalée {len(saturations)} fois"
+    
+    print("✅ Test du filtre aux points de reprise réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Déduplication par Contenu")
+    print("=" * 50)
+    
+    try:
+        test_bloom_filter_basique()
+        test_bloom_filter_taux_faux_positifs()
+        test_bloom_filter_persistance()
+        test_content_fingerprint()
+        test_filtre_par_paire()
+        test_filtre_sauvegarde_au_point_de_reprise()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests de démarrage rapide : imports différés et mode --check sans réseau
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Modules lourds qui ne doivent pas être chargés par le point d'entrée CLI
+MODULES_LOURDS = ['telethon', 'telegram_cloner', 'asyncio', 'dotenv', 'logging']
+
+def run_python(code, env=None):
+    """Exécute du code Python dans un processus neuf."""
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT, capture_output=True, text=True, env=env
+    )
+
+def measure_import(module, runs=3):
+    """Mesure le meilleur temps d'import d'un module dans un processus neuf."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    return min(float(run_python(code).stdout) for _ in range(runs))
+
+def test_import_main_sans_modules_lourds():
+    """Test : importer main ne charge ni Telethon ni asyncio."""
+    print("🔍 Test des imports différés")
+    
+    code = "import sys, main; print(','.join(m for m in %r if m in sys.modules))" % (MODULES_LOURDS,)
+    result = run_python(code)
+    assert result.returncode == 0, result.stderr
+    charges = result.stdout.strip()
+    assert charges == "", f"Modules chargés à l'import de main : {charges}"
+    
+    print("✅ Test des imports différés réussi")
+
+def test_benchmark_import_main():
+    """Benchmark de régression : main s'importe bien plus vite que Telethon."""
+    print("🔍 Benchmark du temps d'import")
+    
+    temps_main = measure_import('main')
+    temps_telethon = measure_import('telethon')
+    print(f"   import main     : {temps_main * 1000:.1f} ms")
+    print(f"   import telethon : {temps_telethon * 1000:.1f} ms")
+    
+    assert temps_main < temps_telethon / 2, "Le point d'entrée CLI ne doit pas payer l'import de Telethon"
+    
+    print("✅ Benchmark du temps d'import réussi")
+
+def test_mode_check():
+    """Test du mode --check sans connexion réseau."""
+    print("🔍 Test du mode --check")
+    
+    env = {**os.environ, 'TELEGRAM_API_ID': '12345', 'TELEGRAM_API_HASH': 'abcdef'}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, 'main.py', '--check', '--source', '@chaine_source', '--target', '-1001234567890'],
+        cwd=ROOT, capture_output=True, text=True, env=env
+    )
+    duree = time.perf_counter() - start
+    assert result.returncode == 0, result.stdout + result.stderr
+    print(f"   python main.py --check : {duree * 1000:.0f} ms")
+    
+    result = subprocess.run(
+        [sys.executable, 'main.py', '--check', '--source', 'x!'],
+        cwd=ROOT, capture_output=True, text=True, env=env
+    )
+    assert result.returncode == 1, "Un identifiant invalide doit faire échouer --check"
+    
+    print("✅ Test du mode --check réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests du Démarrage Rapide")
+    print("=" * 50)
+    
+    try:
+        test_import_main_sans_modules_lourds()
+        test_benchmark_import_main()
+        test_mode_check()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
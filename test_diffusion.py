@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests de la diffusion vers plusieurs cibles (lecture unique, médias partagés)
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from types import SimpleNamespace
+from telethon import errors
+from outils_tests import config_de_test
+from fanout import SharedUploads
+from telegram_cloner import TelegramCloner
+
+def test_televersement_partage():
+    """Test : un seul téléversement par média, fichier temporaire supprimé après le dernier envoi."""
+    print("🔍 Test du téléversement partagé")
+
+    tmp = tempfile.TemporaryDirectory()
+    temp_path = os.path.join(tmp.name, 'transforme.jpg')
+    open(temp_path, 'wb').close()
+    shared = SharedUploads(consumers=3)
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'descripteur', temp_path
+
+    async def scenario():
+        first = await asyncio.gather(*(shared.get(7, produce) for _ in range(2)))
+        assert os.path.exists(temp_path), "Une cible n'a pas encore envoyé"
+        last = await shared.get(7, produce)
+        return first + [last]
+
+    assert asyncio.run(scenario()) == ['descripteur'] * 3
+    assert len(calls) == 1
+    assert (shared.uploads, shared.reuses) == (1, 2)
+    assert not os.path.exists(temp_path), "Fichier supprimé après le dernier envoi"
+    tmp.cleanup()
+
+    print("✅ Test du téléversement partagé réussi")
+
+def test_diffusion_trois_cibles():
+    """Test : la source est lue une fois, chaque cible reçoit tout, chaque média est téléversé une fois."""
+    print("🔍 Test de la diffusion vers trois cibles")
+
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, api_id=1, api_hash='hash', memory_chunk_size=4)
+    cloner = TelegramCloner(config, logging.getLogger('test_diffusion'))
+
+    source = []
+    for i in range(1, 11):
+        media = None
+        if i % 3 == 0:
+            media = os.path.join(tmp.name, f'photo{i}.jpg')
+            open(media, 'wb').close()
+        source.append(SimpleNamespace(id=i, message=f"m{i}", text="", media=media, entities=None))
+
+    reads = []
+    uploads = []
+    sent = {'a': [], 'b': [], 'c': []}
+
+    async def iter_messages(entity, reverse, min_id, limit):
+        reads.append(min_id)
+        for message in [message for message in source if message.id > min_id][:limit]:
+            yield message
+
+    async def upload_file(path, **kwargs):
+        uploads.append(path)
+        return f"fichier:{os.path.basename(path)}"
+
+    async def send_message(entity, text, **kwargs):
+        sent[entity].append(text)
+        await asyncio.sleep(0)
+        return SimpleNamespace(id=len(sent[entity]))
+
+    async def send_file(entity, file, caption, **kwargs):
+        assert file.startswith('fichier:'), "Le descripteur téléversé est réutilisé"
+        sent[entity].append(caption)
+        return SimpleNamespace(id=len(sent[entity]))
+
+    async def disconnect():
+        pass
+
+    async def connect():
+        cloner.client = SimpleNamespace(
+            iter_messages=iter_messages, upload_file=upload_file,
+            send_message=send_message, send_file=send_file, disconnect=disconnect
+        )
+
+    async def no_bot():
+        pass
+
+    async def get_entity(identifier):
+        return identifier
+
+    cloner._connect_user_client = connect
+    cloner._connect_bot_client = no_bot
+    cloner._get_entity = get_entity
+
+    assert asyncio.run(cloner.fan_out_channel('source', ['a', 'b', 'c']))
+    expected = [f"m{i}" for i in range(1, 11)]
+    assert all(texts == expected for texts in sent.values()), sent
+    assert reads == [0, 4, 8, 10], f"Source lue une seule fois, par tranches : {reads}"
+    assert sorted(uploads) == sorted(message.media for message in source if message.media)
+    assert cloner.shared_uploads.reuses == 2 * len(uploads)
+    tmp.cleanup()
+
+    print("✅ Test de la diffusion vers trois cibles réussi")
+
+def test_diffusion_toutes_cibles_abandonnees():
+    """Test : quand toutes les cibles sont abandonnées, la source n'est plus parcourue."""
+    print("🔍 Test de la diffusion sans cible restante")
+
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, api_id=1, api_hash='hash', memory_chunk_size=4)
+    cloner = TelegramCloner(config, logging.getLogger('test_diffusion'))
+    source = [SimpleNamespace(id=i, message=f"m{i}", text="", media=None, entities=None) for i in range(1, 101)]
+    reads = []
+    started = []
+
+    async def iter_messages(entity, reverse, min_id, limit):
+        reads.append(min_id)
+        for message in [message for message in source if message.id > min_id][:limit]:
+            yield message
+
+    async def send_message(entity, text, **kwargs):
+        raise errors.ChatWriteForbiddenError(None)
+
+    async def disconnect():
+        pass
+
+    async def connect():
+        cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message, disconnect=disconnect)
+
+    async def no_bot():
+        pass
+
+    async def get_entity(identifier):
+        return identifier
+
+    async def start_runtime_control():
+        started.append(True)
+
+    cloner._connect_user_client = connect
+    cloner._connect_bot_client = no_bot
+    cloner._get_entity = get_entity
+    cloner._start_runtime_control = start_runtime_control
+
+    assert not asyncio.run(cloner.fan_out_channel('source', ['a', 'b']))
+    assert all(target.job_aborted for target in cloner._followers)
+    assert reads == [0], f"La source ne doit plus être lue : {reads}"
+    assert started == [True], "Le réglage à chaud doit être actif pendant la diffusion"
+    tmp.cleanup()
+
+    print("✅ Test de la diffusion sans cible restante réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Diffusion Multi-Cibles")
+    print("=" * 50)
+
+    try:
+        test_televersement_partage()
+        test_diffusion_trois_cibles()
+        test_diffusion_toutes_cibles_abandonnees()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
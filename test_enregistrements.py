@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests des enregistrements compacts de messages, avec benchmark mémoire
+"""
+
+import asyncio
+import gc
+import logging
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from telethon import TelegramClient
+from telethon.sessions import MemorySession
+from telethon.tl import types
+from outils_tests import config_de_test
+from records import MessageRecord
+from telegram_cloner import TelegramCloner
+
+def telethon_message(message_id, **fields):
+    """Message Telethon avec photo et entités de mise en forme."""
+    photo = types.Photo(
+        id=message_id, access_hash=message_id, file_reference=b'\x01' * 20,
+        date=datetime.now(timezone.utc), dc_id=2,
+        sizes=[types.PhotoSize(type='m', w=320, h=240, size=20000),
+               types.PhotoSize(type='y', w=1280, h=960, size=150000)]
+    )
+    return types.Message(
+        id=message_id, peer_id=types.PeerChannel(1), date=datetime.now(timezone.utc),
+        message=f"Dépêche {message_id} : " + "texte " * 10, grouped_id=None,
+        media=types.MessageMediaPhoto(photo=photo), entities=[types.MessageEntityBold(offset=0, length=7)],
+        **fields
+    )
+
+def fetched_page(client, first_id, count=100):
+    """
+    Page de messages telle que rendue par iter_messages : chaque réponse porte ses
+    propres entités (chaîne, auteur signé), liées aux messages par _finish_init.
+    """
+    channel = types.Channel(id=1, title="Chaîne source", photo=types.ChatPhotoEmpty(),
+                            date=datetime.now(timezone.utc), access_hash=99, username='source', broadcast=True)
+    author = types.User(id=7, first_name="Auteur", last_name="Signé", access_hash=77, username='auteur')
+    entities = {-1000000000001: channel, 7: author}
+    page = []
+    for message_id in range(first_id, first_id + count):
+        message = telethon_message(
+            message_id, from_id=types.PeerUser(7), post_author="Auteur Signé", views=1000, forwards=3,
+            replies=types.MessageReplies(replies=2, replies_pts=10)
+        )
+        message._finish_init(client, entities, types.InputPeerChannel(1, 99))
+        page.append(message)
+    return page
+
+def test_enregistrement_compact():
+    """Test : champs conservés, pas de dictionnaire d'instance, envoi du média par référence."""
+    print("🔍 Test de l'enregistrement compact")
+
+    message = telethon_message(42)
+    record = MessageRecord.from_message(message)
+    assert (record.id, record.type, record.size) == (42, 'photo', 150000)
+    assert record.text == record.message == message.message
+    assert record.media is message.media and record.entities == message.entities
+    assert not hasattr(record, '__dict__'), "__slots__ uniquement"
+
+    service = types.MessageService(id=7, peer_id=types.PeerChannel(1), date=datetime.now(timezone.utc),
+                                   action=types.MessageActionPinMessage())
+    assert MessageRecord.from_message(service).type == 'empty'
+
+    cloner = TelegramCloner(config_de_test(), logging.getLogger('test_enregistrements'))
+    calls = []
+
+    async def send_file(entity, file, **kwargs):
+        calls.append((file, kwargs['caption']))
+        return SimpleNamespace(id=1)
+
+    cloner.client = SimpleNamespace(send_file=send_file)
+    asyncio.run(cloner._send_message(record, 'cible'))
+    assert calls == [(message.media, message.message)]
+
+    print("✅ Test de l'enregistrement compact réussi")
+
+def test_benchmark_memoire():
+    """Benchmark : mémoire retenue par message et coût de construction, Message brut contre enregistrement."""
+    print("🔍 Benchmark mémoire des enregistrements")
+
+    count = 2000
+    client = TelegramClient(MemorySession(), 12345, 'hash')
+    sample = fetched_page(client, 1, 1)[0]
+    assert sample.sender.username == 'auteur' and sample.chat.username == 'source' and sample._client is client
+    del sample
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        messages = [message for first_id in range(1, count, 100) for message in fetched_page(client, first_id)]
+        raw = (tracemalloc.get_traced_memory()[0] - baseline) / count
+
+        start = time.perf_counter()
+        records = [MessageRecord.from_message(message) for message in messages]
+        build_cost = (time.perf_counter() - start) / count
+
+        del messages
+        gc.collect()
+        compact = (tracemalloc.get_traced_memory()[0] - baseline) / count
+    finally:
+        tracemalloc.stop()
+
+    print(f"   Message Telethon : {raw:.0f} o/message, enregistrement : {compact:.0f} o/message "
+          f"(média inclus), construction : {build_cost * 1e6:.1f} µs/message")
+    assert len(records) == count
+    assert compact < raw / 2, "L'enregistrement doit retenir nettement moins de mémoire"
+
+    print("✅ Benchmark mémoire des enregistrements réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests des Enregistrements de Messages")
+    print("=" * 50)
+
+    try:
+        test_enregistrement_compact()
+        test_benchmark_memoire()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests de la transmission directe des entités de mise en forme, avec micro-benchmark
+"""
+
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+from telethon.extensions import html
+from telethon.tl.types import MessageEntityBold, MessageEntityItalic, MessageEntityTextUrl, MessageEntityMentionName
+from outils_tests import config_de_test
+from telegram_cloner import TelegramCloner
+
+class FakeClient:
+    """Client d'envoi factice qui enregistre les appels."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def send_message(self, entity, message, **kwargs):
+        self.calls.append(('send_message', message, kwargs))
+        return SimpleNamespace(id=len(self.calls))
+    
+    async def send_file(self, entity, file, **kwargs):
+        self.calls.append(('send_file', kwargs.get('caption'), kwargs))
+        return SimpleNamespace(id=len(self.calls))
+
+def make_cloner():
+    """Crée un cloneur branché sur le client factice."""
+    cloner = TelegramCloner(config_de_test(), logging.getLogger('test_entites'))
+    cloner.client = FakeClient()
+    return cloner
+
+def entity_heavy_message(message_id=1):
+    """Message riche en entités, avec des caractères qui cassent le HTML."""
+    words = [f"mot{i} < 5 & co" for i in range(40)]
+    text = " ".join(words)
+    entities, offset = [], 0
+    for i, word in enumerate(words):
+        kind = MessageEntityBold if i % 2 else MessageEntityItalic
+        entities.append(kind(offset=offset, length=len(word)))
+        offset += len(word) + 1
+    entities.append(MessageEntityTextUrl(offset=0, length=4, url="https://example.com"))
+    return SimpleNamespace(id=message_id, message=text, text=text, media=None, entities=entities)
+
+def test_entites_transmises_sans_parsing():
+    """Test : texte et légendes partent avec leurs entités d'origine, sans parse_mode."""
+    print("🔍 Test de la transmission des entités")
+    
+    cloner = make_cloner()
+    message = entity_heavy_message()
+    message.entities.append(MessageEntityMentionName(offset=0, length=4, user_id=42))
+    asyncio.run(cloner._send_message(message, 'cible'))
+    
+    kind, text, kwargs = cloner.client.calls[0]
+    assert kind == 'send_message'
+    assert text == message.message, "Le texte doit être envoyé tel quel"
+    assert kwargs['parse_mode'] is None
+    assert len(kwargs['formatting_entities']) == 41, "Les mentions par ID sont retirées"
+    
+    caption = SimpleNamespace(id=2, message="<b>pas du HTML</b> & co", text="", media='photo.jpg',
+                              entities=[MessageEntityBold(offset=0, length=3)])
+    asyncio.run(cloner._send_message(caption, 'cible'))
+    kind, text, kwargs = cloner.client.calls[1]
+    assert kind == 'send_file'
+    assert text == caption.message
+    assert kwargs['formatting_entities'] == caption.entities and kwargs['parse_mode'] is None
+    
+    print("✅ Test de la transmission des entités réussi")
+
+def test_benchmark_parsing_html():
+    """Micro-benchmark : coût CPU du re-parsing HTML évité par message."""
+    print("🔍 Benchmark du re-parsing HTML")
+    
+    message = entity_heavy_message()
+    rendered = html.unparse(message.message, message.entities)
+    iterations = 2000
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        html.parse(rendered)
+    parse_cost = (time.perf_counter() - start) / iterations
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        TelegramCloner._outgoing_entities(message)
+    passthrough_cost = (time.perf_counter() - start) / iterations
+    
+    print(f"   parsing HTML : {parse_cost * 1e6:.1f} µs/message, "
+          f"transmission directe : {passthrough_cost * 1e6:.1f} µs/message")
+    assert passthrough_cost < parse_cost
+    
+    # Le texte brut n'est pas du HTML : le re-parser corrompt « < » et « & »
+    corrupted, _ = html.parse("1 &lt; 2 &amp; 3")
+    assert corrupted != "1 &lt; 2 &amp; 3"
+    
+    print("✅ Benchmark du re-parsing HTML réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests des Entités de Mise en Forme")
+    print("=" * 50)
+    
+    try:
+        test_entites_transmises_sans_parsing()
+        test_benchmark_parsing_html()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
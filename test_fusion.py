@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests de la fusion de plusieurs sources par date (tas k-voies, filigranes par source)
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from outils_tests import config_de_test
+from fanin import merge_by_date
+from telegram_cloner import TelegramCloner
+from utils import load_json
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def _source(name, minutes):
+    """Messages d'une source : IDs 1..n, publiés aux minutes données."""
+    return [
+        SimpleNamespace(id=i, date=START + timedelta(minutes=minute), message=f"{name}{i}", text="",
+                        media=None, entities=None)
+        for i, minute in enumerate(minutes, 1)
+    ]
+
+def test_fusion_paresseuse():
+    """Test : ordre chronologique, un seul message en attente par source."""
+    print("🔍 Test de la fusion k-voies paresseuse")
+
+    sources = [_source('a', [0, 5, 9]), _source('b', [1, 2, 10]), _source('c', [3])]
+    pulled = [0, 0, 0]
+
+    async def stream(index):
+        for message in sources[index]:
+            pulled[index] += 1
+            yield message
+
+    async def scenario():
+        merged = []
+        async for index, message in merge_by_date([stream(i) for i in range(3)]):
+            merged.append(message.message)
+            if message.message == 'b2':
+                # b2 en cours d'envoi : seuls a2 et c1 attendent, b3 n'est lu qu'ensuite
+                assert pulled == [2, 2, 1], pulled
+        return merged
+
+    assert asyncio.run(scenario()) == ['a1', 'b1', 'b2', 'c1', 'a2', 'a3', 'b3']
+
+    print("✅ Test de la fusion k-voies paresseuse réussi")
+
+def test_fusion_et_reprise():
+    """Test : une cible, ordre des dates, reprise de chaque source à son filigrane."""
+    print("🔍 Test de la fusion avec reprise")
+
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, api_id=1, api_hash='hash')
+
+    channels = {'@a': _source('a', [0, 4, 8]), '@b': _source('b', [1, 2, 3, 9]), '@c': _source('c', [5, 6])}
+    sent = []
+
+    def make_cloner():
+        cloner = TelegramCloner(config, logging.getLogger('test_fusion'))
+
+        async def iter_messages(entity, reverse, min_id):
+            for message in channels[entity]:
+                if message.id > min_id:
+                    yield message
+
+        async def send_message(entity, text, **kwargs):
+            assert entity == '@digest'
+            sent.append(text)
+            return SimpleNamespace(id=len(sent))
+
+        async def disconnect():
+            pass
+
+        async def connect():
+            cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message, disconnect=disconnect)
+
+        async def no_bot():
+            pass
+
+        async def get_entity(identifier):
+            return identifier
+
+        cloner._connect_user_client = connect
+        cloner._connect_bot_client = no_bot
+        cloner._get_entity = get_entity
+        return cloner
+
+    assert asyncio.run(make_cloner().merge_channels(['@a', '@b', '@c'], '@digest', message_limit=4))
+    assert sent == ['a1', 'b1', 'b2', 'b3']
+    progress = load_json(config.progress_file)
+    assert progress['a_to_digest']['last_message_id'] == 1
+    assert progress['b_to_digest']['last_message_id'] == 3
+    assert progress['c_to_digest'].get('last_message_id', 0) == 0
+
+    assert asyncio.run(make_cloner().merge_channels(['@a', '@b', '@c'], '@digest', resume=True))
+    assert sent == ['a1', 'b1', 'b2', 'b3', 'a2', 'c1', 'c2', 'a3', 'b4'], sent
+    tmp.cleanup()
+
+    print("✅ Test de la fusion avec reprise réussi")
+
+def test_fusion_reglage_a_chaud():
+    """Test : le réglage à chaud est actif pendant la fusion et atteint chaque source."""
+    print("🔍 Test du réglage à chaud pendant la fusion")
+
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, api_id=1, api_hash='hash', control_socket=os.path.join(tmp.name, 'controle.sock'))
+    channels = {'@a': _source('a', [0, 2]), '@b': _source('b', [1, 3])}
+    cloner = TelegramCloner(config, logging.getLogger('test_fusion'))
+    active = []
+
+    async def iter_messages(entity, reverse, min_id):
+        for message in channels[entity]:
+            if message.id > min_id:
+                yield message
+
+    async def send_message(entity, text, **kwargs):
+        active.append(cloner.runtime_controller is not None)
+        if len(active) == 1:
+            cloner._on_runtime_change('max_retries', 9)
+        return SimpleNamespace(id=len(active))
+
+    async def disconnect():
+        pass
+
+    async def connect():
+        cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message, disconnect=disconnect)
+
+    async def no_bot():
+        pass
+
+    async def get_entity(identifier):
+        return identifier
+
+    cloner._connect_user_client = connect
+    cloner._connect_bot_client = no_bot
+    cloner._get_entity = get_entity
+
+    assert asyncio.run(cloner.merge_channels(['@a', '@b'], '@digest'))
+    assert active == [True] * 4, active
+    assert all(source.retry_engine.max_retries == 9 for source in cloner._followers)
+    assert cloner.runtime_controller is None, "Le réglage à chaud doit être arrêté en fin de fusion"
+    assert not os.path.exists(config.control_socket)
+    tmp.cleanup()
+
+    print("✅ Test du réglage à chaud pendant la fusion réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Fusion Multi-Sources")
+    print("=" * 50)
+
+    try:
+        test_fusion_paresseuse()
+        test_fusion_et_reprise()
+        test_fusion_reglage_a_chaud()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
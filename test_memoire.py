@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests du budget mémoire (récupération par tranches) et du traçage des allocations
+"""
+
+import asyncio
+import logging
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+from outils_tests import config_de_test
+from memory import MemoryMonitor, rss_bytes
+from telegram_cloner import TelegramCloner
+
+class ListHandler(logging.Handler):
+    """Collecte les messages journalisés."""
+    
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+    
+    def emit(self, record):
+        self.lines.append(record.getMessage())
+
+def test_tracage_des_allocations():
+    """Test : l'échantillon désigne le site d'allocation qui grossit."""
+    print("🔍 Test du traçage des allocations")
+    
+    logger = logging.getLogger('test_memoire.tracage')
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    
+    async def scenario():
+        monitor = MemoryMonitor(logger, trace_interval=3600, top=3)
+        monitor.start()
+        retained = [bytearray(1024) for _ in range(2000)]
+        stats = monitor.sample()
+        await monitor.stop()
+        return stats, retained
+    
+    stats, _ = asyncio.run(scenario())
+    
+    assert stats[0].traceback[0].filename.endswith('test_memoire.py')
+    assert stats[0].size_diff >= 2000 * 1024
+    assert any('depuis le début' in line for line in handler.lines)
+    assert rss_bytes() > 0
+    
+    print("✅ Test du traçage des allocations réussi")
+
+def test_tranches_sous_pression():
+    """Test : sous pression, la récupération s'interrompt et les tranches rétrécissent sans perte."""
+    print("🔍 Test de la récupération par tranches")
+    
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, memory_chunk_size=1000, memory_budget=1)  # Budget toujours dépassé
+    cloner = TelegramCloner(config, logging.getLogger('test_memoire.tranches'))
+    
+    source = [SimpleNamespace(id=i, message=f"m{i}", text="", media=None, entities=None) for i in range(1, 1001)]
+    fetched_limits = []
+    sent = []
+    
+    async def iter_messages(entity, reverse, min_id, limit):
+        fetched_limits.append(limit)
+        for message in [m for m in source if m.id > min_id][:limit]:
+            yield message
+    
+    async def send_message(entity, message, **kwargs):
+        sent.append(message)
+        return SimpleNamespace(id=len(sent))
+    
+    cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message)
+    success = asyncio.run(cloner._clone_in_rounds(SimpleNamespace(id=1), None, 'cible', None, datetime.now()))
+    
+    assert success
+    assert sent == [f"m{i}" for i in range(1, 1001)], "Chaque message envoyé une seule fois, dans l'ordre"
+    assert fetched_limits[:3] == [1000, 500, 250], f"Tranches inattendues : {fetched_limits}"
+    assert min(fetched_limits) == 100
+    assert cloner.memory_monitor.pressure_events > 0
+    tmp.cleanup()
+    
+    print("✅ Test de la récupération par tranches réussi")
+
+def test_relances_entre_les_tranches():
+    """Test : les relances partent pendant la récupération suivante, les IDs copiés restent bornés."""
+    print("🔍 Test des relances entre les tranches")
+    
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, memory_chunk_size=100, retry_delay=0.05, retry_jitter=0)
+    cloner = TelegramCloner(config, logging.getLogger('test_memoire.relances'))
+    
+    source = [SimpleNamespace(id=i, message=f"m{i}", text="", media=None, entities=None) for i in range(1, 301)]
+    events = []
+    copied_sizes = []
+    failures = [50]
+    
+    async def iter_messages(entity, reverse, min_id, limit):
+        events.append(('fetch', min_id))
+        copied_sizes.append(len(cloner.copied_messages))
+        await asyncio.sleep(0.2)  # Lecture lente : la relance échue part pendant ce temps
+        for message in [m for m in source if m.id > min_id][:limit]:
+            yield message
+    
+    async def send_message(entity, message, **kwargs):
+        if message == 'm50' and failures:
+            failures.pop()
+            raise ConnectionError("réseau")
+        events.append(('send', message))
+        return SimpleNamespace(id=len(events))
+    
+    cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message)
+    assert asyncio.run(cloner._clone_in_rounds(SimpleNamespace(id=1), None, 'cible', None, datetime.now()))
+    
+    sends = [message for kind, message in events if kind == 'send']
+    assert sorted(sends, key=lambda text: int(text[1:])) == [f"m{i}" for i in range(1, 301)]
+    assert events.index(('fetch', 100)) < events.index(('send', 'm50')) < events.index(('send', 'm101')), \
+        f"La relance doit partir pendant la récupération suivante : {events[95:105]}"
+    assert copied_sizes == [0, 50, 0, 0], f"IDs copiés conservés : {copied_sizes}"
+    tmp.cleanup()
+    
+    print("✅ Test des relances entre les tranches réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests du Budget Mémoire")
+    print("=" * 50)
+    
+    try:
+        test_tracage_des_allocations()
+        test_tranches_sous_pression()
+        test_relances_entre_les_tranches()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests de la file des messages en échec et du renvoi ciblé (--retry-failed)
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from telethon import errors
+from outils_tests import config_de_test
+from deadletter import DeadLetterQueue
+from telegram_cloner import TelegramCloner
+
+def test_file_persistante():
+    """Test : inscriptions, résolutions et compactage survivent à un rechargement."""
+    print("🔍 Test de la file persistante")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'echecs.jsonl')
+        queue = DeadLetterQueue(path)
+        queue.add('a_to_b', 7, errors.MediaEmptyError(None), 1)
+        queue.add('a_to_b', 3, ConnectionError("réseau"), 4)
+        queue.add('c_to_d', 3, ConnectionError("réseau"), 4)
+        queue.resolve('a_to_b', 7)
+        
+        reloaded = DeadLetterQueue(path)
+        entries = reloaded.entries('a_to_b')
+        assert [entry['id'] for entry in entries] == [3]
+        assert entries[0]['error'] == 'ConnectionError' and entries[0]['attempts'] == 4
+        
+        # Ligne tronquée par un arrêt brutal : ignorée
+        with open(path, 'a') as f:
+            f.write('{"key": "a_to_b", "id"')
+        reloaded = DeadLetterQueue(path)
+        reloaded.compact()
+        with open(path) as f:
+            assert len(f.readlines()) == 2
+        assert len(DeadLetterQueue(path).entries('c_to_d')) == 1
+    
+    print("✅ Test de la file persistante réussi")
+
+def test_renvoi_par_lots_d_ids():
+    """Test : seuls les IDs en échec sont relus, par lots de 100, puis renvoyés."""
+    print("🔍 Test du renvoi ciblé")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config = config_de_test(
+            tmp, dead_letter_file=os.path.join(tmp, 'echecs.jsonl'), rules_file=None, api_id=12345, api_hash='hash'
+        )
+        
+        cloner = TelegramCloner(config, logging.getLogger('test_messages_echoues'))
+        key = cloner._make_progress_key('@source', '@cible')
+        failed_ids = list(range(1000, 1250))
+        for message_id in failed_ids:
+            cloner.dead_letters.add(key, message_id, ConnectionError(), 4)
+        
+        fetch_calls = []
+        sent = []
+        
+        async def get_messages(entity, ids):
+            fetch_calls.append(len(ids))
+            # Le message 1100 a été supprimé de la source
+            return [None if i == 1100 else SimpleNamespace(id=i, message=f"m{i}", text="", media=None, entities=None)
+                    for i in ids]
+        
+        async def send_message(entity, message, **kwargs):
+            sent.append(message)
+            return SimpleNamespace(id=len(sent))
+        
+        client = SimpleNamespace(get_messages=get_messages, send_message=send_message, disconnect=AsyncMock())
+        cloner._connect_user_client = AsyncMock(side_effect=lambda: setattr(cloner, 'client', client))
+        cloner._connect_bot_client = AsyncMock()
+        cloner._get_entity = AsyncMock(return_value=SimpleNamespace(id=1))
+        
+        success = asyncio.run(cloner.retry_failed('@source', '@cible'))
+        
+        assert success
+        assert fetch_calls == [100, 100, 50]
+        assert len(sent) == 249
+        assert DeadLetterQueue(config.dead_letter_file).entries(key) == []
+    
+    print("✅ Test du renvoi ciblé réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests des Messages en Échec")
+    print("=" * 50)
+    
+    try:
+        test_file_persistante()
+        test_renvoi_par_lots_d_ids()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests de la répartition multi-processus (protocole des pipes, reprise des tranches)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from config import Config
+from outils_tests import config_de_test
+from sharding import ShardLauncher
+from telegram_cloner import TelegramCloner
+
+def test_processus_d_envoi():
+    """Test : le processus d'envoi traite les tranches reçues et rend ses compteurs."""
+    print("🔍 Test du protocole du processus d'envoi")
+
+    tmp = tempfile.TemporaryDirectory()
+    cloner = TelegramCloner(config_de_test(tmp.name), logging.getLogger('test_multi_processus.envoi'))
+    source = [SimpleNamespace(id=i, message=f"m{i}", text="", media=None, entities=None) for i in range(1, 301)]
+    sent = []
+
+    async def iter_messages(entity, reverse, min_id, max_id):
+        for message in source:
+            if min_id < message.id < max_id:
+                yield message
+
+    async def get_messages(entity, limit):
+        return source[-limit:]
+
+    async def send_message(entity, text, **kwargs):
+        sent.append(text)
+        return SimpleNamespace(id=len(sent))
+
+    async def disconnect():
+        pass
+
+    async def connect():
+        cloner.client = SimpleNamespace(
+            iter_messages=iter_messages, get_messages=get_messages,
+            send_message=send_message, disconnect=disconnect
+        )
+
+    async def get_entity(identifier):
+        return SimpleNamespace(id=identifier)
+
+    async def no_bot():
+        pass
+
+    cloner._connect_user_client = connect
+    cloner._connect_bot_client = no_bot
+    cloner._get_entity = get_entity
+
+    parent, child = multiprocessing.Pipe()
+    replies = []
+
+    def parent_side():
+        replies.append(parent.recv())
+        parent.send(('chunk', 101, 150, 200))
+        replies.append(parent.recv())
+        parent.send(('chunk', 1, 0, 100))
+        replies.append(parent.recv())
+        parent.send(('stop',))
+
+    thread = threading.Thread(target=parent_side)
+    thread.start()
+    assert asyncio.run(cloner.run_shard(child, 'source', 'cible', report_interval=0))
+    thread.join()
+
+    assert replies[0] == ('ready', 300)
+    assert replies[1][:3] == ('done', 101, 200)
+    assert replies[2] == ('done', 1, 100, {'processed': 150, 'sent': 150, 'failed': 0, 'skipped_duplicate': 0})
+    assert sent == [f"m{i}" for i in range(151, 201)] + [f"m{i}" for i in range(1, 101)]
+    assert not os.path.exists(cloner.config.progress_file), "Le parent tient le point de reprise"
+    tmp.cleanup()
+
+    print("✅ Test du protocole du processus d'envoi réussi")
+
+def test_reprise_des_tranches():
+    """Test : seules les tranches inachevées sont redistribuées, depuis leur curseur."""
+    print("🔍 Test de la reprise des tranches")
+
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name)
+    logger = logging.getLogger('test_multi_processus.reprise')
+    launcher = ShardLauncher(config, logger, ['a', 'b'], 'source_to_cible')
+    launcher.cursors = {1: 100, 101: 142}
+    launcher._save_state(100, 350)
+
+    resumed = ShardLauncher(config, logger, ['a', 'b'], 'source_to_cible')
+    resumed._load_state(100)
+    assert list(resumed._plan(350, 100)) == [(101, 142, 200), (201, 200, 300), (301, 300, 350)]
+
+    # Une autre taille de tranche invalide les curseurs
+    other = ShardLauncher(config, logger, ['a'], 'source_to_cible')
+    other._load_state(50)
+    assert len(other._plan(350, 50)) == 7
+
+    resumed._update_counters('a', {'processed': 10, 'sent': 9, 'failed': 1, 'skipped_duplicate': 0})
+    resumed._update_counters('b', {'processed': 5, 'sent': 5, 'failed': 0, 'skipped_duplicate': 0})
+    resumed._update_counters('a', {'processed': 12, 'sent': 11, 'failed': 1, 'skipped_duplicate': 0})
+    assert resumed.total('processed') == 17 and resumed.progress.current == 17
+    tmp.cleanup()
+
+    print("✅ Test de la reprise des tranches réussi")
+
+def test_sessions_et_bot_incompatibles():
+    """Test : les processus d'envoi ne peuvent pas partager un même jeton de bot."""
+    print("🔍 Test des sessions d'envoi avec un bot")
+
+    config = Config()
+    config.api_id, config.api_hash = 12345, 'hash'
+    config.sender_sessions = ['a', 'b']
+    config.use_bot_for_sending, config.bot_token = True, '123:abc'
+    assert not config.validate(), "--senders et USE_BOT_FOR_SENDING sont incompatibles"
+    config.use_bot_for_sending = False
+    assert config.validate()
+
+    print("✅ Test des sessions d'envoi avec un bot réussi")
+
+def test_sessions_sans_reglage_a_chaud():
+    """Test : les processus d'envoi refusent le socket de contrôle, qu'ils ne suivraient pas."""
+    print("🔍 Test des sessions d'envoi avec le réglage à chaud")
+
+    config = Config()
+    config.api_id, config.api_hash = 12345, 'hash'
+    config.sender_sessions = ['a', 'b']
+    config.control_socket = '/tmp/controle.sock'
+    assert not config.validate(), "--senders et CONTROL_SOCKET sont incompatibles"
+    config.control_socket = None
+    assert config.validate()
+
+    print("✅ Test des sessions d'envoi avec le réglage à chaud réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Répartition Multi-Processus")
+    print("=" * 50)
+
+    try:
+        test_processus_d_envoi()
+        test_reprise_des_tranches()
+        test_sessions_et_bot_incompatibles()
+        test_sessions_sans_reglage_a_chaud()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
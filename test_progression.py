@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests du rapport de progression (débits lissés, ETA, rapports à intervalle fixe)
+"""
+
+import asyncio
+import logging
+from logger_setup import ProgressLogger
+
+class ListHandler(logging.Handler):
+    """Collecte les messages journalisés."""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(record.getMessage())
+
+def _progress_logger(name, **kwargs):
+    logger = logging.getLogger(f'test_progression.{name}')
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return ProgressLogger(logger, **kwargs), handler
+
+def test_debit_lisse_apres_pause():
+    """Test : une pause anti-flood fait baisser le débit sans l'effondrer."""
+    print("🔍 Test du débit lissé")
+
+    now = [0.0]
+    progress, handler = _progress_logger('lissage', half_life=30, clock=lambda: now[0])
+    progress.add_total(1000)
+
+    for _ in range(6):
+        now[0] += 10
+        progress.add(50)
+        progress.update()
+    assert abs(progress.message_rate - 5.0) < 1e-9
+
+    # 10 secondes sans envoi : un tiers de demi-vie, le débit perd environ 20 %
+    now[0] += 10
+    progress.update()
+    assert 3.5 < progress.message_rate < 4.5, progress.message_rate
+    assert progress.eta() > 0
+    assert len(handler.lines) == 7
+    assert "ETA" in handler.lines[-1]
+
+    print("✅ Test du débit lissé réussi")
+
+def test_eta_avec_medias_restants():
+    """Test : les octets de média restants dominent l'ETA quand ils sont le goulot."""
+    print("🔍 Test de l'ETA avec médias")
+
+    now = [0.0]
+    progress, _ = _progress_logger('eta', clock=lambda: now[0])
+    progress.add_total(100, media_bytes=100 * 1024 * 1024)
+
+    # 90 messages texte rapides et 10 Mo de média en 10 secondes
+    now[0] += 10
+    progress.add(90, 10 * 1024 * 1024)
+    progress.update()
+
+    # 10 messages au débit des messages : 1 s ; 90 Mo au débit des octets : 90 s
+    assert abs(progress.eta() - 90) < 1e-6
+
+    progress.add(10, 90 * 1024 * 1024)
+    assert progress.eta() == 0
+
+    print("✅ Test de l'ETA avec médias réussi")
+
+def test_rapports_a_intervalle_fixe():
+    """Test : les rapports suivent l'horloge, pas le nombre de messages."""
+    print("🔍 Test des rapports à intervalle fixe")
+
+    progress, handler = _progress_logger('intervalle', interval=0.05)
+    progress.add_total(10000)
+
+    async def scenario():
+        progress.start()
+        for _ in range(10000):
+            progress.add()
+        await asyncio.sleep(0.12)
+        await progress.stop()
+
+    asyncio.run(scenario())
+    assert 1 <= len(handler.lines) <= 3, handler.lines
+    assert "10000/10000" in handler.lines[0]
+
+    print("✅ Test des rapports à intervalle fixe réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests du Rapport de Progression")
+    print("=" * 50)
+
+    try:
+        test_debit_lisse_apres_pause()
+        test_eta_avec_medias_restants()
+        test_rapports_a_intervalle_fixe()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests de la réconciliation source/cible : empreintes et alignement en mémoire bornée
+"""
+
+import asyncio
+from types import SimpleNamespace
+from coalesce import CoalescedMessage
+from reconcile import CoalescedSends, SequenceAligner, iter_missing, message_fingerprint, normalize_text
+
+def make_message(message_id, text):
+    """Construit un message texte minimal."""
+    return SimpleNamespace(id=message_id, message=text, text=text, media=None)
+
+async def stream(messages):
+    for message in messages:
+        yield message
+
+def find_missing(source, target, window=10, lookahead=None, coalesced=None):
+    """Exécute la réconciliation et retourne les IDs manquants et l'aligneur."""
+    aligner = SequenceAligner(window, lookahead)
+    sends = CoalescedSends(coalesced)
+    
+    async def collect():
+        return [message.id async for message in
+                iter_missing(stream(source), stream(target), aligner, sends.source, sends.target)]
+    
+    return asyncio.run(collect()), aligner
+
+def test_empreinte_normalisee():
+    """Test : le balisage et les espaces ne changent pas l'empreinte."""
+    print("🔍 Test de l'empreinte normalisée")
+    
+    assert normalize_text("  **Bonjour**\n\n<b>le monde</b> ") == "bonjour le monde"
+    assert message_fingerprint(make_message(1, "Bonjour  le monde")) == \
+        message_fingerprint(make_message(2, "<i>bonjour</i> le monde"))
+    assert message_fingerprint(make_message(1, "Bonjour")) != message_fingerprint(make_message(2, "Bonsoir"))
+    assert message_fingerprint(make_message(1, "")) is None
+    
+    print("✅ Test de l'empreinte normalisée réussi")
+
+def test_trous_et_messages_en_trop():
+    """Test : trous isolés, message cible sans source et fin manquante."""
+    print("🔍 Test des trous et messages en trop")
+    
+    source = [make_message(i, f"message {i}") for i in range(1, 21)]
+    present = [m for m in source if m.id not in (3, 7, 8, 19, 20)]
+    target = [make_message(100 + i, m.message) for i, m in enumerate(present)]
+    target.insert(5, make_message(999, "annonce ajoutée à la main"))
+    
+    missing, aligner = find_missing(source, target)
+    
+    assert missing == [3, 7, 8, 19, 20], f"Manquants inattendus : {missing}"
+    assert aligner.matched == 15
+    assert aligner.extra == 1
+    
+    print("✅ Test des trous et messages en trop réussi")
+
+def test_trou_plus_long_que_la_fenetre():
+    """Test : un trou plus long que la fenêtre est retrouvé sans tout charger."""
+    print("🔍 Test d'un long trou")
+    
+    source = [make_message(i, f"message {i}") for i in range(1, 501)]
+    target = [make_message(1000 + i, m.message) for i, m in enumerate(source) if not 100 <= m.id < 300]
+    
+    missing, aligner = find_missing(source, target, window=16)
+    
+    assert missing == list(range(100, 300))
+    assert aligner.matched == 300
+    assert aligner.extra == 0
+    
+    print("✅ Test d'un long trou réussi")
+
+def test_long_ajout_dans_la_cible():
+    """Test : des messages ajoutés à la cible au-delà de la fenêtre ne font pas renvoyer la source."""
+    print("🔍 Test d'un long ajout dans la cible")
+    
+    source = [make_message(i, f"message {i}") for i in range(1, 101)]
+    target = [make_message(1000 + i, m.message) for i, m in enumerate(source) if m.id != 2]
+    for k in range(30):
+        target.insert(1, make_message(5000 + k, f"annonce {k}"))
+    
+    missing, aligner = find_missing(source, target, window=8)
+    assert missing == [2], f"Manquants inattendus : {missing}"
+    assert aligner.matched == 99 and aligner.extra == 30
+    
+    # Fenêtre cible trop courte : la tête source glisse un message à la fois
+    missing, aligner = find_missing(source, target, window=8, lookahead=16)
+    assert missing[0] == 2 and aligner.matched + aligner.missing == 100
+    assert aligner.matched > 0, "L'alignement doit reprendre après le glissement"
+    
+    print("✅ Test d'un long ajout dans la cible réussi")
+
+def test_messages_regroupes():
+    """Test : un envoi regroupant plusieurs messages source les couvre tous."""
+    print("🔍 Test des messages regroupés")
+    
+    source = [make_message(i, f"message {i}") for i in range(1, 11)]
+    for message in source:
+        message.date, message.grouped_id, message.entities = None, None, None
+    merged = CoalescedMessage(source[2:6], "\n")
+    target = [make_message(100 + i, m.message) for i, m in enumerate(source[:2])]
+    target.append(make_message(200, merged.message))
+    target += [make_message(300 + i, m.message) for i, m in enumerate(source[6:]) if m.id != 9]
+    
+    missing, aligner = find_missing(source, target, coalesced={'200': merged.source_ids})
+    assert missing == [9], f"Manquants inattendus : {missing}"
+    assert aligner.matched == 9 and aligner.extra == 0
+    
+    # Sans la table des envois regroupés, les messages fusionnés semblent manquer
+    missing, _ = find_missing(source, target)
+    assert missing == [3, 4, 5, 6, 9]
+    
+    print("✅ Test des messages regroupés réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Réconciliation")
+    print("=" * 50)
+    
+    try:
+        test_empreinte_normalisee()
+        test_trous_et_messages_en_trop()
+        test_trou_plus_long_que_la_fenetre()
+        test_long_ajout_dans_la_cible()
+        test_messages_regroupes()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+    
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests du rafraîchissement groupé des références de fichiers expirées
+"""
+
+import asyncio
+import logging
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+from telethon import errors
+from outils_tests import config_de_test
+from filerefs import FileReferenceRefresher
+from records import MessageRecord
+from telegram_cloner import TelegramCloner
+
+def _records(count):
+    return [MessageRecord(i, message=f"légende {i}", media=('périmé', i), type='photo') for i in range(1, count + 1)]
+
+def _fake_source(calls):
+    async def get_messages(entity, ids):
+        calls.append(list(ids))
+        await asyncio.sleep(0)
+        # Le message 13 a été supprimé de la source
+        return [None if i == 13 else SimpleNamespace(id=i, media=('frais', i)) for i in ids]
+    return get_messages
+
+def test_echecs_simultanes_regroupes():
+    """Test : des échecs simultanés partagent une requête, complétée par les messages suivis."""
+    print("🔍 Test du regroupement des rafraîchissements")
+
+    calls = []
+    messages = _records(250)
+    refresher = FileReferenceRefresher(SimpleNamespace(get_messages=_fake_source(calls)), 'source')
+    refresher.track(messages)
+
+    async def scenario():
+        failing = [messages[4], messages[9], messages[12]]
+        return await asyncio.gather(*(refresher.refresh(message, message.media) for message in failing))
+
+    assert asyncio.run(scenario()) == [('frais', 5), ('frais', 10), None]
+    assert len(calls) == 1 and len(calls[0]) == 100, "Une seule requête de 100 IDs"
+    assert calls[0][:3] == [5, 10, 13]
+    assert all(message.media[0] == 'frais' for message in messages[:100] if message.id != 13)
+    assert messages[150].media[0] == 'périmé', "Au-delà de 100 IDs : requête suivante au besoin"
+    assert (refresher.refreshed, refresher.missing) == (99, 1)
+
+    # Déjà rafraîchi par le lot : aucune nouvelle requête
+    stale = ('périmé', 20)
+    assert asyncio.run(refresher.refresh(messages[19], stale)) == ('frais', 20)
+    assert len(calls) == 1
+
+    print("✅ Test du regroupement des rafraîchissements réussi")
+
+def test_envoi_sans_perte_de_media():
+    """Test : chaque message expiré est renvoyé avec son média, sans une requête par message."""
+    print("🔍 Test de l'envoi après expiration des références")
+
+    tmp = tempfile.TemporaryDirectory()
+    cloner = TelegramCloner(config_de_test(tmp.name), logging.getLogger('test_references_fichiers'))
+
+    calls = []
+    sent = []
+
+    async def send_file(entity, file, caption, **kwargs):
+        if file[0] == 'périmé':
+            raise errors.FileReferenceExpiredError(request=None)
+        sent.append((file, caption))
+        return SimpleNamespace(id=len(sent))
+
+    async def send_message(entity, text, **kwargs):
+        raise AssertionError("Le média ne doit jamais être remplacé par le texte seul")
+
+    cloner.client = SimpleNamespace(get_messages=_fake_source(calls), send_file=send_file, send_message=send_message)
+    cloner.file_refs = FileReferenceRefresher(cloner.client, 'source')
+
+    messages = [message for message in _records(150) if message.id != 13]
+    assert asyncio.run(cloner._clone_messages_batch(messages, 'cible', len(messages), datetime.now()))
+    assert [file for file, _ in sent] == [('frais', message.id) for message in messages]
+    assert len(calls) == 2, f"Une requête par lot de 100 messages, pas par message : {len(calls)}"
+    assert cloner.messages_failed == 0
+    tmp.cleanup()
+
+    print("✅ Test de l'envoi après expiration des références réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests des Références de Fichiers")
+    print("=" * 50)
+
+    try:
+        test_echecs_simultanes_regroupes()
+        test_envoi_sans_perte_de_media()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests du réglage à chaud des paramètres de débit et de concurrence
+"""
+
+import json
+import os
+import tempfile
+from unittest.mock import MagicMock
+from config import Config
+from runtime_control import RuntimeController
+
+def make_controller(env_file='.env'):
+    """Construit un contrôleur sur une configuration par défaut."""
+    config = Config(env_file='inexistant.env')
+    changes = []
+    controller = RuntimeController(
+        config, MagicMock(), processed_count=lambda: 0,
+        on_change=lambda name, value: changes.append((name, value)),
+        env_file=env_file
+    )
+    return config, controller, changes
+
+def test_modification_et_validation():
+    """Test de la modification et de la validation des valeurs."""
+    print("🔍 Test de la modification des paramètres")
+    
+    config, controller, changes = make_controller()
+    assert controller.handle_command("set rate_limit_delay 0.25") == "ok rate_limit_delay=0.25"
+    assert config.rate_limit_delay == 0.25
+    assert changes == [('rate_limit_delay', 0.25)]
+    
+    assert controller.handle_command("set batch_size 0").startswith("error")
+    assert controller.handle_command("set session_name x").startswith("error")
+    assert json.loads(controller.handle_command("get"))['rate_limit_delay'] == 0.25
+    
+    print("✅ Test de la modification des paramètres réussi")
+
+def test_rechargement_env():
+    """Test du rechargement depuis le fichier .env (SIGHUP)."""
+    print("🔍 Test du rechargement du fichier .env")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        env_file = os.path.join(tmp, '.env')
+        with open(env_file, 'w') as f:
+            f.write("BATCH_SIZE=25\nMAX_RETRIES=7\nRETRY_DELAY=abc\n")
+        
+        config, controller, changes = make_controller(env_file)
+        controller.reload()
+        assert config.batch_size == 25
+        assert config.max_retries == 7
+        assert config.retry_delay == 5.0, "Une valeur invalide doit être ignorée"
+    
+    print("✅ Test du rechargement réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests du Réglage à Chaud")
+    print("=" * 50)
+    
+    try:
+        test_modification_et_validation()
+        test_rechargement_env()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests du moteur de règles : filtrage, réécriture et compteurs
+"""
+
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from telethon.tl.types import MessageEntityBold, MessageEntityItalic, MessageEntityTextUrl, MessageEntityMention
+from rules import RuleEngine
+
+def make_message(text="", media=None, date=None, entities=None):
+    """Construit un faux message Telegram."""
+    return SimpleNamespace(
+        id=1,
+        message=text,
+        text=text,
+        media=media,
+        entities=entities,
+        date=date or datetime(2024, 6, 1, tzinfo=timezone.utc)
+    )
+
+def test_exclusion_par_motif():
+    """Test de l'exclusion par expression régulière."""
+    print("🔍 Test de l'exclusion par motif")
+    
+    engine = RuleEngine({"rules": [
+        {"name": "pub", "action": "exclude", "pattern": "promo", "ignore_case": True},
+        {"name": "spam", "action": "exclude", "pattern": "gratuit"}
+    ]})
+    
+    assert engine.apply(make_message("Grosse PROMO aujourd'hui")) == False
+    assert engine.apply(make_message("Message normal")) == True
+    assert engine.apply(make_message("promo gratuit")) == False
+    assert engine.rule_hits == {"pub": 2, "spam": 1}
+    assert engine.messages_excluded == 2
+    
+    print("✅ Test de l'exclusion par motif réussi")
+
+def test_inclusion_par_type_et_date():
+    """Test des règles d'inclusion par type et par date."""
+    print("🔍 Test de l'inclusion par type et date")
+    
+    engine = RuleEngine({"rules": [
+        {"name": "texte_recent", "action": "include", "types": ["text"], "since": "2024-01-01"}
+    ]})
+    
+    assert engine.apply(make_message("récent")) == True
+    assert engine.apply(make_message("ancien", date=datetime(2023, 1, 1, tzinfo=timezone.utc))) == False
+    photo = SimpleNamespace(photo=SimpleNamespace(sizes=[]))
+    assert engine.apply(make_message("", media=photo)) == False
+    
+    print("✅ Test de l'inclusion réussi")
+
+def test_substitutions():
+    """Test de la réécriture du texte."""
+    print("🔍 Test des substitutions")
+    
+    engine = RuleEngine({"substitutions": [
+        {"name": "liens", "pattern": r"https?://\S+", "replace": "[lien]"},
+        {"name": "handle", "pattern": "@ancien", "replace": "@nouveau"}
+    ]})
+    
+    message = make_message("Voir https://exemple.com et @ancien")
+    assert engine.apply(message) == True
+    assert message.message == "Voir [lien] et @nouveau"
+    assert engine.substitution_hits == {"liens": 1, "handle": 1}
+    assert engine.messages_rewritten == 1
+    
+    print("✅ Test des substitutions réussi")
+
+def test_substitutions_entites():
+    """Test : les entités sont recalées sur le texte réécrit (décalages UTF-16)."""
+    print("🔍 Test des entités après substitution")
+    
+    engine = RuleEngine({"substitutions": [
+        {"name": "liens", "pattern": r"https?://\S+", "replace": "[lien]"},
+        {"name": "handle", "pattern": "@ancien", "replace": "@nouveau"}
+    ]})
+    
+    # « 📰 » compte pour deux unités UTF-16
+    text = "📰 Voir https://exemple.com/a et @ancien ici"
+    entities = [
+        MessageEntityBold(offset=0, length=7),           # « 📰 Voir », avant tout remplacement
+        MessageEntityTextUrl(offset=3, length=10, url="https://exemple.com"),  # chevauche le lien en partie
+        MessageEntityItalic(offset=8, length=36),        # contient les deux remplacements
+        MessageEntityMention(offset=33, length=7),       # exactement « @ancien »
+        MessageEntityBold(offset=41, length=3)           # « ici », après les remplacements
+    ]
+    message = make_message(text, entities=entities)
+    assert engine.apply(message) == True
+    
+    new_text = message.message
+    assert new_text == "📰 Voir [lien] et @nouveau ici"
+    utf16 = new_text.encode('utf-16-le')
+    spans = [(type(e).__name__, utf16[2 * e.offset:2 * (e.offset + e.length)].decode('utf-16-le'))
+             for e in message.entities]
+    assert spans == [
+        ('MessageEntityBold', '📰 Voir'),
+        ('MessageEntityItalic', '[lien] et @nouveau ici'),
+        ('MessageEntityMention', '@nouveau'),
+        ('MessageEntityBold', 'ici')
+    ], spans
+    assert entities[4].offset == 41, "Les entités d'origine ne doivent pas être modifiées"
+    
+    print("✅ Test des entités après substitution réussi")
+
+def test_regle_invalide():
+    """Test du rejet d'une règle invalide."""
+    print("🔍 Test des règles invalides")
+    
+    try:
+        RuleEngine({"rules": [{"name": "cassee", "pattern": "("}]})
+        assert False, "Une expression invalide doit lever ValueError"
+    except ValueError:
+        pass
+    
+    # Motifs non combinables dans l'alternance unique : ValueError, pas re.error
+    for rules in (
+        [{"pattern": "(?P<x>a)"}, {"pattern": "(?P<x>b)"}],
+        [{"pattern": "(a)\\1"}],
+    ):
+        try:
+            RuleEngine({"rules": rules})
+            assert False, f"Motifs non combinables acceptés : {rules}"
+        except ValueError:
+            pass
+    
+    print("✅ Test des règles invalides réussi")
+
+def test_regles_chevauchantes():
+    """Test : une correspondance qui en chevauche une autre ne masque pas sa règle."""
+    print("🔍 Test des règles chevauchantes")
+    
+    engine = RuleEngine({"rules": [
+        {"name": "promo", "action": "exclude", "pattern": "promotion"},
+        {"name": "motion", "action": "exclude", "pattern": "motion"},
+        {"name": "tion", "action": "exclude", "pattern": "tion"},
+        {"name": "absente", "action": "exclude", "pattern": "introuvable"}
+    ]})
+    
+    assert engine.apply(make_message("grande promotion")) == False
+    assert engine.rule_hits == {"promo": 1, "motion": 1, "tion": 1, "absente": 0}
+    
+    print("✅ Test des règles chevauchantes réussi")
+
+def test_cout_evaluation():
+    """Benchmark : coût par message, sans correspondance et avec vérification des chevauchements."""
+    print("🔍 Benchmark du coût d'évaluation")
+    
+    motifs = ["promo|publicité", "gratuit", "concours|tirage", r"https?://\S+", r"@\w+bot",
+              "casino", "crypto|bitcoin", "abonnez-vous", "lien en bio", "réduction"]
+    engine = RuleEngine({"rules": [
+        {"name": f"r{i}", "action": "exclude", "pattern": motif, "ignore_case": True}
+        for i, motif in enumerate(motifs)
+    ]})
+    texte = "Voici les nouvelles du jour avec plusieurs informations importantes pour nos lecteurs. " * 3
+    
+    couts = {}
+    for cas, message in (("sans correspondance", texte), ("avec correspondance", texte + " promo gratuite")):
+        start = time.perf_counter()
+        for _ in range(1000):
+            engine._matching_rules(message, 'text', None, 0)
+        couts[cas] = (time.perf_counter() - start) / 1000 * 1e6
+    print("   " + ", ".join(f"{cas} : {cout:.1f} µs/message" for cas, cout in couts.items()))
+    
+    touchees = engine._matching_rules(texte + " promo gratuite", 'text', None, 0)
+    assert [rule.name for rule in touchees] == ["r0", "r1"]
+    
+    print("✅ Benchmark du coût d'évaluation réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests du Moteur de Règles")
+    print("=" * 50)
+    
+    try:
+        test_exclusion_par_motif()
+        test_inclusion_par_type_et_date()
+        test_substitutions()
+        test_substitutions_entites()
+        test_regle_invalide()
+        test_regles_chevauchantes()
+        test_cout_evaluation()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests du regroupement des rafales de messages texte
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from telethon.tl.types import MessageEntityBold
+from coalesce import CoalescedMessage, coalesce_messages, utf16_length
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+def make_message(message_id, text, seconds, media=None, entities=None):
+    """Construit un message minimal."""
+    return SimpleNamespace(id=message_id, message=text, date=START + timedelta(seconds=seconds),
+                           media=media, entities=entities, grouped_id=None)
+
+def test_rafale_regroupee():
+    """Test : les messages texte proches sont fusionnés, médias et écarts coupent la rafale."""
+    print("🔍 Test du regroupement d'une rafale")
+    
+    messages = [
+        make_message(1, "BTC 42000", 0),
+        make_message(2, "ETH 2500", 5),
+        make_message(3, "SOL 90", 10),
+        make_message(4, "", 12, media=object()),
+        make_message(5, "DOGE 0.08", 15),
+        make_message(6, "ADA 0.5", 20),
+        make_message(7, "XRP 0.6", 500),
+    ]
+    result = coalesce_messages(messages, max_gap=60, separator="\n")
+    
+    assert [type(m).__name__ for m in result] == ['CoalescedMessage', 'SimpleNamespace', 'CoalescedMessage', 'SimpleNamespace']
+    assert result[0].message == "BTC 42000\nETH 2500\nSOL 90"
+    assert result[0].source_ids == [1, 2, 3]
+    assert result[0].id == 3, "Le point de reprise est le dernier message du groupe"
+    assert result[2].source_ids == [5, 6]
+    assert result[3].id == 7
+    
+    print("✅ Test du regroupement d'une rafale réussi")
+
+def test_longueur_maximale():
+    """Test : aucun message fusionné ne dépasse la longueur maximale."""
+    print("🔍 Test de la longueur maximale")
+    
+    messages = [make_message(i, "x" * 1000, i) for i in range(1, 11)]
+    result = coalesce_messages(messages, max_length=4096, separator="\n")
+    
+    assert all(utf16_length(m.message) <= 4096 for m in result)
+    assert sum(len(getattr(m, 'source_ids', [m.id])) for m in result) == 10
+    assert len(result) == 3
+    
+    print("✅ Test de la longueur maximale réussi")
+
+def test_decalage_des_entites():
+    """Test : les entités sont décalées en unités UTF-16."""
+    print("🔍 Test du décalage des entités")
+    
+    first = make_message(1, "🚀 go", 0, entities=[MessageEntityBold(offset=3, length=2)])
+    second = make_message(2, "top", 1, entities=[MessageEntityBold(offset=0, length=3)])
+    merged = CoalescedMessage([first, second], " | ")
+    
+    assert merged.message == "🚀 go | top"
+    assert merged.entities[1].offset == utf16_length("🚀 go | ")
+    assert first.entities[0].offset == 3, "Les entités source ne doivent pas être modifiées"
+    
+    print("✅ Test du décalage des entités réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests du Regroupement")
+    print("=" * 50)
+    
+    try:
+        test_rafale_regroupee()
+        test_longueur_maximale()
+        test_decalage_des_entites()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
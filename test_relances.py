@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests de la politique de relance : classification, délai exponentiel et file temporisée
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+from telethon import errors
+from outils_tests import config_de_test
+from retry import RetryEngine, RETRY_SCHEDULED, GIVE_UP, ABORT_JOB
+from telegram_cloner import TelegramCloner
+
+class FakeClock:
+    """Horloge manuelle."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def make_message(message_id):
+    """Construit un message texte minimal."""
+    return SimpleNamespace(id=message_id, message=f"message {message_id}", text="", media=None, entities=None)
+
+def test_decisions_et_delais():
+    """Test : décision par catégorie d'erreur et délai exponentiel borné avec gigue."""
+    print("🔍 Test des décisions de relance")
+    
+    clock = FakeClock()
+    engine = RetryEngine(max_retries=2, base_delay=1, max_delay=3, jitter=0.5, clock=clock, rng=lambda: 1.0)
+    
+    assert engine.record_failure(make_message(1), errors.ChatWriteForbiddenError(None)) == ABORT_JOB
+    assert engine.record_failure(make_message(2), errors.MessageTooLongError(None)) == GIVE_UP
+    
+    message = make_message(3)
+    assert engine.record_failure(message, ConnectionError()) == RETRY_SCHEDULED
+    assert engine.next_due_in() == 0.5, "1s avec 50 % de gigue au maximum"
+    assert engine.pop_due() is None, "Relance pas encore échue"
+    clock.now = 0.5
+    assert engine.pop_due() is message
+    assert engine.pending_min_id() == 3, "Une relance en cours borne encore le point de reprise"
+    assert engine.record_failure(message, ConnectionError()) == RETRY_SCHEDULED
+    assert engine.next_due_in() == 1.0
+    clock.now = 10
+    engine.pop_due()
+    assert engine.record_failure(message, ConnectionError()) == GIVE_UP
+    assert engine.pending_min_id() is None
+    
+    assert RetryEngine(base_delay=1, max_delay=3, jitter=0).backoff(10) == 3, "Délai plafonné"
+    
+    flood = errors.FloodWaitError(None, capture=30)
+    assert engine.record_failure(make_message(4), flood) == RETRY_SCHEDULED
+    assert engine.pause_remaining() == 30
+    assert engine.attempts(make_message(4)) == 0, "Une pause anti-flood ne consomme pas de tentative"
+    
+    print("✅ Test des décisions de relance réussi")
+
+class FlakyClient:
+    """Client d'envoi factice dont les échecs sont programmés par ID."""
+    
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+    
+    async def send_message(self, entity, message, **kwargs):
+        message_id = int(message.split()[-1])
+        self.sent.append(message_id)
+        if self.failures.get(message_id):
+            raise self.failures[message_id].pop(0)
+        return SimpleNamespace(id=len(self.sent))
+
+def run_clone(failures, count=5):
+    """Clone `count` messages avec le client factice et retourne (succès, cloneur)."""
+    cloner = TelegramCloner(config_de_test(retry_delay=0.05), logging.getLogger('test_relances'))
+    cloner.retry_engine.base_delay = 0.05
+    cloner.client = FlakyClient(failures)
+    messages = [make_message(i) for i in range(1, count + 1)]
+    success = asyncio.run(cloner._clone_messages_batch(messages, 'cible', len(messages), datetime.now()))
+    return success, cloner
+
+def test_relance_sans_bloquer():
+    """Test : un échec transitoire ne bloque pas les messages suivants."""
+    print("🔍 Test de la relance non bloquante")
+    
+    success, cloner = run_clone({2: [ConnectionError("réseau")]})
+    
+    assert success
+    assert cloner.client.sent[:5] == [1, 2, 3, 4, 5], "Les messages suivants partent pendant l'attente"
+    assert cloner.client.sent[5] == 2
+    assert cloner.messages_sent == 5 and cloner.messages_failed == 0
+    
+    print("✅ Test de la relance non bloquante réussi")
+
+def test_erreur_bloquante_arrete_le_clonage():
+    """Test : une erreur fatale pour la cible arrête tout au premier message."""
+    print("🔍 Test de l'arrêt sur erreur bloquante")
+    
+    success, cloner = run_clone({1: [errors.ChatWriteForbiddenError(None)]}, count=50)
+    
+    assert not success
+    assert cloner.job_aborted
+    assert cloner.client.sent == [1], "Aucun autre envoi ni relance après une erreur bloquante"
+    
+    print("✅ Test de l'arrêt sur erreur bloquante réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests des Relances")
+    print("=" * 50)
+    
+    try:
+        test_decisions_et_delais()
+        test_relance_sans_bloquer()
+        test_erreur_bloquante_arrete_le_clonage()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests de la sélection côté serveur des messages (dates, IDs, types, recherche)
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from telethon.tl import types
+from config import Config
+from outils_tests import config_de_test
+from selection import MessageSelection, parse_date
+from telegram_cloner import TelegramCloner
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def _media(kind):
+    if kind == 'photo':
+        return SimpleNamespace(photo=object())
+    mime = {'video': 'video/mp4', 'audio': 'audio/mpeg', 'document': 'application/pdf'}[kind]
+    return SimpleNamespace(document=SimpleNamespace(mime_type=mime, size=1000))
+
+# Un message par jour, types en rotation
+KINDS = ['text', 'photo', 'video', 'document', 'audio']
+HISTORY = [
+    SimpleNamespace(
+        id=i, date=START + timedelta(days=i), message=f"message {i}" + (" urgent" if i % 7 == 0 else ""),
+        media=None if KINDS[i % 5] == 'text' else _media(KINDS[i % 5]), grouped_id=None
+    )
+    for i in range(1, 61)
+]
+FILTER_KINDS = {
+    types.InputMessagesFilterPhotos: {'photo'},
+    types.InputMessagesFilterVideo: {'video'},
+    types.InputMessagesFilterPhotoVideo: {'photo', 'video'},
+    types.InputMessagesFilterDocument: {'document'},
+    types.InputMessagesFilterMusic: {'audio'},
+    types.InputMessagesFilterVoice: set(),
+}
+
+class FakeHistory:
+    """Historique qui applique lui-même les arguments d'iter_messages, comme le serveur."""
+
+    def __init__(self):
+        self.calls = []
+        self.returned = 0
+
+    def iter_messages(self, entity, reverse=False, min_id=0, max_id=0, offset_date=None,
+                      search=None, filter=None, limit=None):
+        self.calls.append({'min_id': min_id, 'max_id': max_id, 'offset_date': offset_date,
+                           'search': search, 'filter': type(filter).__name__ if filter else None, 'limit': limit})
+
+        async def stream():
+            count = 0
+            for message in HISTORY:
+                if message.id <= min_id or (max_id and message.id >= max_id):
+                    continue
+                if offset_date and not min_id and message.date <= offset_date:
+                    continue
+                if search and search not in message.message:
+                    continue
+                if filter and KINDS[message.id % 5] not in FILTER_KINDS[type(filter)]:
+                    continue
+                if limit and count >= limit:
+                    return
+                count += 1
+                self.returned += 1
+                yield message
+        return stream()
+
+def _cloner(**selection):
+    cloner = TelegramCloner(config_de_test(), logging.getLogger('test_selection'))
+    cloner.selection = MessageSelection(**selection)
+    cloner.client = FakeHistory()
+    return cloner
+
+async def _ids(cloner, **kwargs):
+    return [record.id async for record in cloner._iter_records('source', **kwargs)]
+
+def test_bornes_transmises_au_serveur():
+    """Test : dates, IDs et recherche sont passés à iter_messages, --until arrête la lecture."""
+    print("🔍 Test des bornes transmises au serveur")
+
+    cloner = _cloner(since=parse_date('2024-01-10'), until=parse_date('2024-01-20', end_of_day=True),
+                     search='urgent')
+    assert asyncio.run(_ids(cloner)) == [14]
+    call = cloner.client.calls[0]
+    assert call['offset_date'] == datetime(2024, 1, 10, tzinfo=timezone.utc) and call['search'] == 'urgent'
+    assert cloner.client.returned == 2, "Lecture arrêtée au premier message après --until"
+
+    cloner = _cloner(min_id=10, max_id=12)
+    assert asyncio.run(_ids(cloner)) == [10, 11, 12], "Bornes d'IDs incluses"
+    assert (cloner.client.calls[0]['min_id'], cloner.client.calls[0]['max_id']) == (9, 13)
+
+    # Reprise : le curseur de l'appelant et la sélection se combinent
+    cloner = _cloner(min_id=10, max_id=30)
+    assert asyncio.run(_ids(cloner, min_id=25, limit=3)) == [26, 27, 28]
+    assert cloner.client.calls[0]['limit'] == 3
+
+    # Cible d'une réconciliation : jamais filtrée
+    assert len(asyncio.run(_ids(cloner, selected=False))) == 60
+
+    print("✅ Test des bornes transmises au serveur réussi")
+
+def test_types_filtres_par_le_serveur():
+    """Test : --only ne lit que les messages des types demandés, sans tri local."""
+    print("🔍 Test des types filtrés par le serveur")
+
+    cloner = _cloner(only=['photo', 'video'])
+    ids = asyncio.run(_ids(cloner, limit=6))
+    assert ids == [1, 2, 6, 7, 11, 12]
+    assert [call['filter'] for call in cloner.client.calls] == ['InputMessagesFilterPhotoVideo']
+    assert cloner.client.returned == len(ids), "Aucun message exclu ne doit être lu"
+
+    # Deux filtres sans filtre commun : flux fusionnés par date
+    cloner = _cloner(only=['document', 'audio'], max_id=20)
+    assert asyncio.run(_ids(cloner)) == [3, 4, 8, 9, 13, 14, 18, 19]
+    assert sorted(call['filter'] for call in cloner.client.calls) == [
+        'InputMessagesFilterDocument', 'InputMessagesFilterMusic', 'InputMessagesFilterVoice'
+    ]
+
+    # Texte : pas de filtre serveur, tri local (les médias ne sont jamais téléchargés)
+    cloner = _cloner(only=['text'], max_id=20)
+    assert asyncio.run(_ids(cloner)) == [5, 10, 15, 20]
+    assert cloner.client.calls[0]['filter'] is None and cloner.selection.skipped == 16
+
+    print("✅ Test des types filtrés par le serveur réussi")
+
+def test_configuration_selection():
+    """Test : validation des options de sélection."""
+    print("🔍 Test de la configuration de la sélection")
+
+    config = Config()
+    config.api_id, config.api_hash = 12345, 'hash'
+    config.select_since = '2024-13-01'
+    config.select_only = ['photo', 'sticker']
+    config.select_min_id, config.select_max_id = 50, 10
+    assert not config.validate()
+
+    config.select_since = '2024-03-01T12:00'
+    config.select_only = ['photo']
+    config.select_min_id = 0
+    assert config.validate()
+    assert MessageSelection.from_config(config).active
+    assert parse_date('2024-03-01', end_of_day=True) == datetime(2024, 3, 2, tzinfo=timezone.utc)
+
+    print("✅ Test de la configuration de la sélection réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Sélection des Messages")
+    print("=" * 50)
+
+    try:
+        test_bornes_transmises_au_serveur()
+        test_types_filtres_par_le_serveur()
+        test_configuration_selection()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests de la session takeout : lecture de l'historique, délai d'initialisation et repli
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from types import SimpleNamespace
+from telethon import errors
+from outils_tests import config_de_test
+from takeout import TakeoutSession, ReadMeter, MODE_TAKEOUT, MODE_NORMAL
+from telegram_cloner import TelegramCloner
+
+class FakeTakeout:
+    """Proxy takeout : la lecture de l'historique passe par lui une fois ouvert."""
+
+    def __init__(self, client, delays):
+        self.client = client
+        self.delays = delays
+
+    async def __aenter__(self):
+        if self.delays:
+            raise errors.TakeoutInitDelayError(request=None, capture=self.delays.pop(0))
+        return SimpleNamespace(iter_messages=self.client.history('takeout'))
+
+class FakeClient:
+    def __init__(self, delays=()):
+        self.delays = list(delays)
+        self.reads = []
+        self.ended = []
+
+    def takeout(self, finalize, **kwargs):
+        assert finalize is False and kwargs['channels'] and kwargs['megagroups']
+        return FakeTakeout(self, self.delays)
+
+    async def end_takeout(self, success):
+        self.ended.append(success)
+
+    def history(self, mode):
+        async def iter_messages(entity, reverse=False, **kwargs):
+            for i in range(1, 6):
+                self.reads.append(mode)
+                yield SimpleNamespace(id=i, message=f"message {i}")
+        return iter_messages
+
+def _cloner(client, max_wait):
+    config = config_de_test(use_takeout=True, takeout_max_wait=max_wait)
+    cloner = TelegramCloner(config, logging.getLogger('test_takeout'))
+    client.iter_messages = client.history('normal')
+    cloner.client = client
+    return cloner
+
+async def _read(cloner):
+    await cloner._start_takeout()
+    ids = [record.id async for record in cloner._iter_records('source')]
+    mode = cloner._read_mode()
+    await cloner._finish_takeout()
+    return ids, mode
+
+def test_lecture_par_takeout():
+    """Test : un court délai d'initialisation est attendu, puis l'historique est lu par la session takeout."""
+    print("🔍 Test de la lecture par session takeout")
+
+    client = FakeClient(delays=[0])
+    cloner = _cloner(client, max_wait=5)
+    ids, mode = asyncio.run(_read(cloner))
+    assert ids == [1, 2, 3, 4, 5] and mode == MODE_TAKEOUT
+    assert client.reads == ['takeout'] * 5
+    assert client.ended == [True], "La session takeout doit être terminée"
+    assert cloner.read_meter.messages == 5
+
+    print("✅ Test de la lecture par session takeout réussi")
+
+def test_repli_sur_session_normale():
+    """Test : un délai d'initialisation trop long fait lire l'historique avec la session normale."""
+    print("🔍 Test du repli sur la session normale")
+
+    client = FakeClient(delays=[3600])
+    cloner = _cloner(client, max_wait=60)
+    ids, mode = asyncio.run(_read(cloner))
+    assert ids == [1, 2, 3, 4, 5] and mode == MODE_NORMAL
+    assert client.reads == ['normal'] * 5
+    assert client.ended == [], "Aucune session takeout à terminer"
+
+    # Takeout précédent non terminé : clôturé puis redemandé
+    client = FakeClient()
+    stale = [True]
+
+    def takeout(finalize, **kwargs):
+        if stale:
+            stale.pop()
+            raise ValueError("Can't send a takeout request while another takeout for the current session still not been finished yet.")
+        return FakeTakeout(client, [])
+
+    client.takeout = takeout
+    session = TakeoutSession(client, logging.getLogger('test_takeout'))
+    assert asyncio.run(session.open()) and session.active
+    assert client.ended == [False]
+
+    print("✅ Test du repli sur la session normale réussi")
+
+def test_comparaison_des_debits():
+    """Test : le débit de lecture est comparé au dernier débit mesuré dans l'autre mode."""
+    print("🔍 Test de la comparaison des débits")
+
+    records = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    logger = logging.getLogger('test_takeout.debit')
+    logger.setLevel(logging.INFO)
+    logger.addHandler(Capture())
+
+    meter = ReadMeter()
+    meter.messages, meter.seconds = 1000, 4.0
+    rates = {MODE_NORMAL: 125.0}
+    meter.record(rates, MODE_TAKEOUT)
+    meter.log_stats(logger, MODE_TAKEOUT, rates)
+    assert rates == {MODE_NORMAL: 125.0, MODE_TAKEOUT: 250.0}
+    assert records == ["History Read: 1000 messages in 4.0s (250.0 msg/s, takeout session) "
+                       "vs 125.0 msg/s in normal mode (x2.00)"]
+
+    # Débit persisté dans la progression d'un clonage
+    tmp = tempfile.TemporaryDirectory()
+    cloner = _cloner(FakeClient(), max_wait=0)
+    cloner.config.progress_file = os.path.join(tmp.name, 'progression.json')
+    cloner.config.use_takeout = False
+    asyncio.run(_read(cloner))
+    cloner.read_meter.record(cloner.progress_data.setdefault('read_rates', {}), cloner._read_mode())
+    cloner.progress_key = cloner._make_progress_key('source', 'cible')
+    cloner._save_progress('source', 'cible')
+    cloner.progress_data = {}
+    cloner._load_progress('source', 'cible')
+    assert MODE_NORMAL in cloner.progress_data['read_rates']
+    tmp.cleanup()
+
+    print("✅ Test de la comparaison des débits réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Session Takeout")
+    print("=" * 50)
+
+    try:
+        test_lecture_par_takeout()
+        test_repli_sur_session_normale()
+        test_comparaison_des_debits()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests de l'étape de transformation des médias (pool de processus, file bornée)
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+from outils_tests import config_de_test
+from media_transform import MediaTransformStage, pillow_available
+from telegram_cloner import TelegramCloner
+
+def _make_photo(path, size=(2000, 1000)):
+    """Crée une image JPEG portant des métadonnées EXIF."""
+    from PIL import Image
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = "Appareil"  # Make
+    image.save(path, format='JPEG', exif=exif.tobytes())
+
+def test_transformations_dans_le_pool():
+    """Test : EXIF supprimé, image réduite, temps mesuré par transformation."""
+    print("🔍 Test des transformations dans le pool de processus")
+    if not pillow_available():
+        print("⚠️ Pillow absent, test ignoré")
+        return
+
+    from PIL import Image
+    tmp = tempfile.TemporaryDirectory()
+    source = os.path.join(tmp.name, 'photo.jpg')
+    _make_photo(source)
+
+    stage = MediaTransformStage(['strip_exif', 'downscale'], {'max_dimension': 500}, workers=2)
+    stage.start()
+    try:
+        result = asyncio.run(stage.transform(source))
+        with Image.open(result) as image:
+            assert max(image.size) == 500
+            assert not image.getexif(), "Les métadonnées EXIF doivent être supprimées"
+        assert os.path.exists(source), "Le fichier d'origine n'est pas modifié"
+        assert os.listdir(stage.temp_dir) == [os.path.basename(result)], "Fichiers intermédiaires supprimés"
+        assert stage.stats['strip_exif']['count'] == 1
+        assert stage.stats['downscale']['cpu_time'] > 0
+    finally:
+        stage.close()
+        tmp.cleanup()
+
+    try:
+        MediaTransformStage(['inconnue'], {})
+        assert False, "Une transformation inconnue doit être refusée"
+    except ValueError:
+        pass
+
+    print("✅ Test des transformations dans le pool réussi")
+
+def test_file_bornee_avant_envoi():
+    """Test : les médias sont préparés d'avance sans dépasser la file, puis nettoyés."""
+    print("🔍 Test de la file bornée de médias préparés")
+    if not pillow_available():
+        print("⚠️ Pillow absent, test ignoré")
+        return
+
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name)
+    config.media_transforms = ['downscale']
+    config.media_max_dimension = 100
+    config.media_transform_workers = 2
+    config.media_transform_queue = 2
+    cloner = TelegramCloner(config, logging.getLogger('test_transformation_medias'))
+
+    messages = []
+    for i in range(1, 7):
+        path = os.path.join(tmp.name, f'photo{i}.jpg')
+        _make_photo(path, size=(400, 300))
+        messages.append(SimpleNamespace(id=i, message="", text="", media=path, type='photo', entities=None))
+
+    sent = []
+    waiting = []
+
+    async def send_file(entity, file, **kwargs):
+        waiting.append(len(cloner._prepared_media))
+        assert os.path.dirname(file) == cloner.media_stage.temp_dir
+        sent.append(file)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(id=len(sent))
+
+    cloner.client = SimpleNamespace(send_file=send_file)
+
+    async def scenario():
+        assert cloner._load_media_stage()
+        try:
+            return await cloner._clone_messages_batch(messages, 'cible', len(messages), datetime.now())
+        finally:
+            cloner.media_stage.close()
+
+    assert asyncio.run(scenario())
+    assert len(sent) == 6
+    assert max(waiting) <= config.media_transform_queue, f"File dépassée : {waiting}"
+    assert not any(os.path.exists(path) for path in sent), "Fichiers transformés supprimés après l'envoi"
+    assert cloner.media_stage.stats['downscale']['count'] == 6
+    tmp.cleanup()
+
+    print("✅ Test de la file bornée réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests de la Transformation des Médias")
+    print("=" * 50)
+
+    try:
+        test_transformations_dans_le_pool()
+        test_file_bornee_avant_envoi()
+
+        print("\n✅ Tous les tests sont passés avec succès !")
+
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests de l'ordonnancement par voies prioritaires et de la fenêtre de réordonnancement
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import tempfile
+from types import SimpleNamespace
+from outils_tests import config_de_test
+from telegram_cloner import TelegramCloner
+from scheduler import LaneScheduler, RateLimiter, SMALL_LANE, LARGE_LANE
+
+def run_scheduler(messages, window=None):
+    """Exécute l'ordonnanceur et retourne l'ordre de publication."""
+    published = []
+    
+    async def send(message):
+        await asyncio.sleep(0.2 if message == 'gros' else 0.001)
+        published.append(message)
+        return True
+    
+    scheduler = LaneScheduler(
+        send=send,
+        classify=lambda message: LARGE_LANE if message == 'gros' else SMALL_LANE,
+        rate_limiter=RateLimiter(0),
+        small_concurrency=2,
+        large_concurrency=1,
+        window=window
+    )
+    asyncio.run(scheduler.run(messages))
+    return published, scheduler
+
+def test_gros_media_ne_bloque_pas_le_texte():
+    """Test : les messages texte passent pendant l'envoi d'un gros média."""
+    print("🔍 Test du blocage en tête de file")
+    
+    messages = ['gros'] + [f"texte-{i}" for i in range(10)]
+    published, scheduler = run_scheduler(messages)
+    
+    assert published[-1] == 'gros', "Le gros média doit finir après les textes"
+    assert len(published) == 11
+    assert scheduler.reorder.prefix == 11
+    assert scheduler.stats[SMALL_LANE]['messages'] == 10
+    
+    print("✅ Test du blocage en tête de file réussi")
+
+def test_fenetre_de_reordonnancement():
+    """Test : aucun message publié plus de W positions en avance."""
+    print("🔍 Test de la fenêtre de réordonnancement")
+    
+    messages = ['gros'] + [f"texte-{i}" for i in range(10)]
+    published, _ = run_scheduler(messages, window=4)
+    
+    # Seules les positions 1 à 3 peuvent doubler le gros média (position 0)
+    assert published.index('gros') == 3, f"Ordre inattendu : {published}"
+    
+    print("✅ Test de la fenêtre de réordonnancement réussi")
+
+def test_arret_propre():
+    """Test : après stop(), aucun nouvel envoi et le préfixe ne dépasse pas l'envoi interrompu."""
+    print("🔍 Test de l'arrêt propre")
+    
+    started = []
+    
+    async def scenario():
+        scheduler = None
+        
+        async def send(message):
+            started.append(message)
+            if message == 'texte-2':
+                scheduler.stop()
+                return False  # Envoi interrompu par l'arrêt
+            await asyncio.sleep(0.01)
+            return True
+        
+        scheduler = LaneScheduler(
+            send=send,
+            classify=lambda message: SMALL_LANE,
+            rate_limiter=RateLimiter(0),
+            small_concurrency=1,
+            window=4
+        )
+        await scheduler.run([f"texte-{i}" for i in range(10)])
+        return scheduler
+    
+    scheduler = asyncio.run(scenario())
+    
+    assert started == ['texte-0', 'texte-1', 'texte-2'], f"Envois inattendus : {started}"
+    assert scheduler.reorder.prefix == 2, "Le point de reprise doit précéder l'envoi interrompu"
+    
+    print("✅ Test de l'arrêt propre réussi")
+
+def test_arret_pendant_la_recuperation():
+    """Test : SIGTERM pendant la récupération l'interrompt sans tuer le processus ni rien envoyer."""
+    print("🔍 Test de l'arrêt pendant la récupération")
+    
+    tmp = tempfile.TemporaryDirectory()
+    config = config_de_test(tmp.name, api_id=1, api_hash='hash')
+    cloner = TelegramCloner(config, logging.getLogger('test_voies_prioritaires'))
+    fetched = []
+    
+    async def iter_messages(entity, reverse, **kwargs):
+        for i in range(1, 1001):
+            if i == 5:
+                os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0)
+            fetched.append(i)
+            yield SimpleNamespace(id=i, message=f"m{i}", media=None)
+    
+    async def send_message(entity, text, **kwargs):
+        raise AssertionError("Aucun envoi après l'arrêt")
+    
+    async def disconnect():
+        pass
+    
+    async def connect():
+        cloner.client = SimpleNamespace(iter_messages=iter_messages, send_message=send_message, disconnect=disconnect)
+    
+    async def no_bot():
+        pass
+    
+    async def get_entity(identifier):
+        return SimpleNamespace(id=1, title=identifier)
+    
+    cloner._connect_user_client = connect
+    cloner._connect_bot_client = no_bot
+    cloner._get_entity = get_entity
+    
+    assert not asyncio.run(cloner.clone_channel('source', 'cible'))
+    assert cloner.shutdown_requested
+    assert len(fetched) < 10, f"Récupération poursuivie après le signal : {len(fetched)} messages"
+    assert os.path.exists(config.progress_file), "Point de reprise écrit"
+    tmp.cleanup()
+    
+    print("✅ Test de l'arrêt pendant la récupération réussi")
+
+def main():
+    """Lance tous les tests."""
+    print("🧪 Tests des Voies Prioritaires")
+    print("=" * 50)
+    
+    try:
+        test_gros_media_ne_bloque_pas_le_texte()
+        test_fenetre_de_reordonnancement()
+        test_arret_propre()
+        test_arret_pendant_la_recuperation()
+        
+        print("\n✅ Tous les tests sont passés avec succès !")
+        
+    except Exception as e:
+        print(f"❌ Erreur dans les tests : {e}")
+        return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
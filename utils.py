@@ -58,33 +58,6 @@ def format_duration(duration: timedelta) -> str:
         return f"{seconds}s"
 
 
-def calculate_eta(current: int, total: int, elapsed: timedelta) -> str:
-    """
-    Calculate estimated time of arrival.
-    
-    Args:
-        current: Current progress
-        total: Total items
-        elapsed: Time elapsed so far
-        
-    Returns:
-        ETA as formatted string
-    """
-    if current <= 0 or elapsed.total_seconds() <= 0:
-        return "Unknown"
-    
-    rate = current / elapsed.total_seconds()
-    remaining = total - current
-    
-    if rate <= 0:
-        return "Unknown"
-    
-    eta_seconds = remaining / rate
-    eta_duration = timedelta(seconds=int(eta_seconds))
-    
-    return format_duration(eta_duration)
-
-
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size as human-readable string.
@@ -173,6 +146,8 @@ def save_json(data: Dict[Any, Any], filepath: str, indent: int = 2) -> bool:
         temp_filepath = f"{filepath}.tmp"
         with open(temp_filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=indent, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
         
         # Move temporary file to final location
         os.replace(temp_filepath, filepath)
@@ -217,18 +192,24 @@ def get_message_type(message) -> str:
     Returns:
         Message type as string
     """
-    if message.text and not message.media:
+    # Enregistrement compact (MessageRecord) : type déjà calculé à la récupération
+    known = getattr(message, 'type', None)
+    if isinstance(known, str):
+        return known
+    media = getattr(message, 'media', None)
+    # Texte brut : message.text ferait un rendu Markdown du texte et de ses entités
+    if (getattr(message, 'message', None) or getattr(message, 'text', None)) and not media:
         return "text"
-    elif message.media:
-        if hasattr(message.media, 'photo'):
+    elif media:
+        if hasattr(media, 'photo'):
             return "photo"
-        elif hasattr(message.media, 'document'):
-            if message.media.document.mime_type:
-                if message.media.document.mime_type.startswith('video/'):
+        elif hasattr(media, 'document'):
+            if media.document.mime_type:
+                if media.document.mime_type.startswith('video/'):
                     return "video"
-                elif message.media.document.mime_type.startswith('audio/'):
+                elif media.document.mime_type.startswith('audio/'):
                     return "audio"
-                elif message.media.document.mime_type.startswith('image/'):
+                elif media.document.mime_type.startswith('image/'):
                     return "image"
                 else:
                     return "document"
@@ -239,6 +220,40 @@ def get_message_type(message) -> str:
         return "empty"
 
 
+def get_message_size(message) -> int:
+    """
+    Determine the size in bytes of a Telegram message's media.
+    
+    Args:
+        message: Telegram message object
+        
+    Returns:
+        Media size in bytes (0 for text-only messages)
+    """
+    known = getattr(message, 'size', None)
+    if isinstance(known, int):
+        return known
+    media = getattr(message, 'media', None)
+    if media is None:
+        return 0
+    
+    document = getattr(media, 'document', None)
+    if document is not None:
+        return getattr(document, 'size', 0) or 0
+    
+    photo = getattr(media, 'photo', None)
+    if photo is not None:
+        largest = 0
+        for photo_size in getattr(photo, 'sizes', None) or []:
+            size = getattr(photo_size, 'size', None)
+            if size is None:
+                size = max(getattr(photo_size, 'sizes', None) or [0])
+            largest = max(largest, size)
+        return largest
+    
+    return 0
+
+
 def create_backup_filename(original_path: str) -> str:
     """
     Create a backup filename with timestamp.